@@ -0,0 +1,26 @@
+"""Import time benchmark of the package, e.g. for short-lived batch jobs and process pool workers.
+
+Every import is measured in a new interpreter, the best of several runs is reported.
+"""
+# python libraries
+import subprocess
+import sys
+import time
+
+# statements to measure, each in a new interpreter
+STATEMENT_DICT = {
+    "python interpreter": "pass",
+    "import pecst": "import pecst",
+    "selection API": "import pecst; pecst.select_capacitors; pecst.SelectionSession",
+    "plotting API": "import pecst; pecst.fft; pecst.update_font_size; import matplotlib.pyplot",
+}
+NUMBER_OF_RUNS = 5
+
+if __name__ == "__main__":
+    for description, statement in STATEMENT_DICT.items():
+        run_time_list = []
+        for _ in range(NUMBER_OF_RUNS):
+            start_time = time.perf_counter()
+            subprocess.run([sys.executable, "-c", statement], check=True)
+            run_time_list.append(time.perf_counter() - start_time)
+        print(f"{description:20}: {min(run_time_list) * 1e3:7.1f} ms")
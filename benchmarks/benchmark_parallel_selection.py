@@ -0,0 +1,50 @@
+"""Scaling benchmark of the parallel batch selection over the number of worker processes.
+
+Needs the downloaded ESR files, see examples/download_esr_files.py.
+"""
+# python libraries
+import os
+import time
+
+# 3rd party libraries
+import numpy as np
+
+# own libraries
+import pecst
+
+# base requirements, same as in examples/capacitor_selection_example.py
+capacitor_requirements = pecst.CapacitorRequirements(
+    maximum_peak_to_peak_voltage_ripple=1,
+    current_waveform_for_op_max_current=np.array([[0, 1.25e-6, 2.5e-6, 3.75e-6, 5e-6], [18, 25, -18, -25, 18]]),
+    v_dc_for_op_max_voltage=700,
+    temperature_ambient=90,
+    voltage_safety_margin_percentage=10,
+    capacitor_type_list=[pecst.CapacitorType.FilmCapacitor],
+    maximum_number_series_capacitors=2,
+    capacitor_tolerance_percent=pecst.CapacitanceTolerance.TenPercent,
+    lifetime_h=30_000,
+    results_directory=""
+)
+
+if __name__ == "__main__":
+    c_requirements_list = pecst.requirements_grid(capacitor_requirements,
+                                                  v_dc_for_op_max_voltage=np.linspace(400, 900, 6).tolist(),
+                                                  temperature_ambient=np.linspace(70, 100, 7).tolist(),
+                                                  lifetime_h=[10_000, 30_000, 100_000],
+                                                  maximum_peak_to_peak_voltage_ripple=[0.5, 1, 2, 5])
+
+    number_of_workers_list = [1]
+    while number_of_workers_list[-1] * 2 <= (os.cpu_count() or 1):
+        number_of_workers_list.append(number_of_workers_list[-1] * 2)
+
+    print(f"{len(c_requirements_list)} requirements")
+    print(f"{'workers':>8} {'time / s':>10} {'speedup':>8}")
+    time_serial = np.nan
+    for number_of_workers in number_of_workers_list:
+        time_start = time.perf_counter()
+        results_df = pecst.select_capacitors_batch(c_requirements_list, number_of_workers=number_of_workers,
+                                                   chunk_size=int(np.ceil(len(c_requirements_list) / (4 * number_of_workers))))
+        time_run = time.perf_counter() - time_start
+        if number_of_workers == 1:
+            time_serial = time_run
+        print(f"{number_of_workers:>8} {time_run:>10.2f} {time_serial / time_run:>8.2f}")
@@ -0,0 +1,100 @@
+"""Benchmark of the Pareto front calculation against the previous iterative mask-shrinking algorithm.
+
+Random designs with independent objectives have small fronts, designs on a simplex (anti-correlated objectives) are all
+part of the front, which is the worst case of the mask-shrinking algorithm. Both algorithms give identical fronts.
+"""
+# python libraries
+import time
+from collections.abc import Callable
+
+# 3rd party libraries
+import numpy as np
+
+# own libraries
+from pecst.filter import _is_pareto_efficient, _non_dominated_ranks
+
+# number of costs, distribution and number of designs of each case
+CASE_LIST = [(2, "uniform", [1_000, 10_000, 100_000, 1_000_000]),
+             (2, "simplex", [1_000, 10_000, 100_000, 1_000_000]),
+             (4, "uniform", [1_000, 10_000, 100_000, 1_000_000]),
+             # all designs are efficient, so Kung's algorithm compares the full fronts of both halves
+             (4, "simplex", [1_000, 10_000])]
+# the previous algorithm compares each efficient design to all remaining designs, so it is skipped for large fronts
+REFERENCE_FRONT_SIZE_MAX = 10_000
+# the fronts are peeled off one after another for more than two costs, so the ranks are skipped for many designs
+RANKS_SIZE_MAX = 10_000
+
+def is_pareto_efficient_mask_shrinking(costs: np.ndarray) -> np.ndarray:
+    """
+    Find the pareto-efficient points by the previous iterative mask-shrinking algorithm, O(n²) in the worst case.
+
+    :param costs: An (n_points, n_costs) array
+    :type costs: np.ndarray
+    :return: True for each pareto-efficient point
+    :rtype: np.ndarray
+    """
+    is_efficient = np.arange(costs.shape[0])
+    n_points = costs.shape[0]
+    next_point_index = 0  # Next index in the is_efficient array to search for
+    while next_point_index < len(costs):
+        nondominated_point_mask: np.ndarray = np.array(np.any(costs < costs[next_point_index], axis=1))
+        nondominated_point_mask[next_point_index] = True
+        is_efficient = is_efficient[nondominated_point_mask]  # Remove dominated points
+        costs = costs[nondominated_point_mask]
+        next_point_index = np.sum(nondominated_point_mask[:next_point_index]) + 1
+    is_efficient_mask = np.zeros(n_points, dtype=bool)
+    is_efficient_mask[is_efficient] = True
+    return is_efficient_mask
+
+def random_costs(rng: np.random.Generator, size: int, number_of_costs: int, distribution: str) -> np.ndarray:
+    """
+    Create random costs.
+
+    :param rng: random number generator
+    :type rng: np.random.Generator
+    :param size: number of designs
+    :type size: int
+    :param number_of_costs: number of objectives
+    :type number_of_costs: int
+    :param distribution: 'uniform' for independent objectives, 'simplex' for designs all on the front
+    :type distribution: str
+    :return: An (size, number_of_costs) array
+    :rtype: np.ndarray
+    """
+    costs = rng.random((size, number_of_costs))
+    if distribution == "simplex":
+        costs /= np.sum(costs, axis=1, keepdims=True)
+    return costs
+
+def run_time(function: Callable[..., np.ndarray], *arguments: np.ndarray) -> tuple[float, np.ndarray]:
+    """
+    Measure the run time of a function call.
+
+    :param function: function to call
+    :type function: Callable[..., np.ndarray]
+    :param arguments: arguments of the function
+    :type arguments: np.ndarray
+    :return: run time in seconds, result of the function
+    :rtype: tuple[float, np.ndarray]
+    """
+    start_time = time.perf_counter()
+    result = function(*arguments)
+    return time.perf_counter() - start_time, result
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    print(f"{'costs':>5} {'distribution':>12} {'designs':>9} {'front':>7} {'previous / s':>13} {'front / s':>10} {'ranks / s':>10}")
+    for number_of_costs, distribution, size_list in CASE_LIST:
+        for size in size_list:
+            costs = random_costs(rng, size, number_of_costs, distribution)
+            time_front, is_efficient = run_time(_is_pareto_efficient, costs)
+            time_reference = np.nan
+            if np.count_nonzero(is_efficient) <= REFERENCE_FRONT_SIZE_MAX and size <= 100_000:
+                time_reference, is_efficient_reference = run_time(is_pareto_efficient_mask_shrinking, costs)
+                assert np.array_equal(is_efficient, is_efficient_reference)
+            time_ranks = np.nan
+            if number_of_costs <= 2 or size <= RANKS_SIZE_MAX:
+                time_ranks, _ = run_time(_non_dominated_ranks, costs)
+            print(f"{number_of_costs:>5} {distribution:>12} {size:>9} {np.count_nonzero(is_efficient):>7} {time_reference:>13.3f} "
+                  f"{time_front:>10.3f} {time_ranks:>10.3f}")
@@ -27,7 +27,8 @@ capacitor_requirements = pecst.CapacitorRequirements(
 )
 
 # capacitor pareto plane calculation
-c_name_list, c_db_list = pecst.select_capacitors(capacitor_requirements)
+with pecst.FileResultSink(capacitor_requirements.results_directory) as result_sink:
+    c_name_list, c_db_list = pecst.select_capacitors(capacitor_requirements, result_sink=result_sink)
 c_name_list[1] = c_name_list[1].replace("B3272*AGT", "B3272*A/G/T")
 color_list = [pecst.gnome_colors["black"], pecst.gnome_colors["red"], pecst.gnome_colors["blue"]]
 
@@ -9,3 +9,12 @@ import pecst
 logging.basicConfig(format='%(levelname)s:%(message)s', level=logging.INFO)
 
 pecst.download_esr_csv_files()
+
+# optional: download only ESR files changed on the server since the last download
+# pecst.download_esr_csv_files(refresh=True)
+
+# optional: check the downloaded ESR files against the download manifest, without network access
+# pecst.verify_esr_files()
+
+# optional: compile the ESR files into a single memory-mapped database for faster loading
+pecst.build_esr_database()
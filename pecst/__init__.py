@@ -1,15 +1,103 @@
-"""Initialize the package."""
-from pecst.functions import *
-from pecst.power_loss import *
-from pecst.read_capacitor_database import *
-from pecst.cst_dataclasses import *
-from pecst.selection import *
-from pecst.constants import *
-from pecst.esr_downloads import *
-from pecst.generalplotsettings import *
-from pecst.cost_models import *
-from pecst.colors import *
-from pecst.current_capability import *
-from pecst.lifetime import *
-from pecst.dvdt import *
-from pecst.filter import *
+"""
+Initialize the package.
+
+The public names are imported lazily on first access, so 'import pecst' does not import the submodules and their
+dependencies (e.g. matplotlib for plotting or requests for downloads) until they are used.
+"""
+# python libraries
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pecst.functions import (fft, fft_batch)
+    from pecst.power_loss import (capacitor_admittance, power_loss_film_capacitor, power_loss_film_capacitor_mixed,
+                                  power_loss_film_capacitor_vectorized, read_capacitor_frequency_dependent_limits,
+                                  read_capacitor_frequency_dependent_limits_at_frequencies)
+    from pecst.read_capacitor_database import (FilmCapacitorSeriesTuple, clear_catalog_cache, get_str_value_from_str, load_dc_film_capacitors)
+    from pecst.cst_dataclasses import (CalculatedRequirementsValues, CapacitanceTolerance, CapacitorRequirements, CapacitorSeriesData, CapacitorType,
+                                       DownloadResult, FrequencyDependentLimits, HarmonicTable, LifetimeDerating, SelectionConstraints)
+    from pecst.selection import (calculate_from_requirements, get_equivalent_heat_coefficient, get_equivalent_heat_coefficient_vectorized,
+                                 get_temperature_current_derating_factor, integrate, requirements_grid, select_capacitors, select_capacitors_batch,
+                                 select_capacitors_worst_case)
+    from pecst.constants import (CATALOG_CACHE_DIRECTORY, ESR_DATABASE_FILE, ESR_MANIFEST_FILE, ESR_OVER_FREQUENCY_DIRECTORY,
+                                 FOIL_CAPACITOR_DATA_DIRECTORY, FOIL_CAPACITOR_SERIES_NAME_LIST, FOIL_CAPACITOR_SERIES_VALUES, MICRO_TO_NORM,
+                                 MILLI_TO_NORM, NANO_TO_NORM, NORM_TO_MICRO, NORM_TO_MILLI, QUBIC_METER_TO_QUBIC_CENTI_METER,
+                                 QUBIC_METER_TO_QUBIC_DECI_METER, QUBIC_METER_TO_QUBIC_MILLI_METER, TEMPERATURE_105, TEMPERATURE_125, TEMPERATURE_85)
+    from pecst.esr_downloads import (download_esr_csv_files, download_files, verify_esr_files, verify_files)
+    from pecst.generalplotsettings import (global_plot_settings_font_latex, global_plot_settings_font_sansserif, update_font_size)
+    from pecst.cost_models import (COST_MODEL_DICT, cost_electrolytic_capacitor, cost_film_capacitor)
+    from pecst.colors import (color_combinations, gnome_colors, gnome_colors_list)
+    from pecst.current_capability import (current_capability_film_capacitor, current_capability_film_capacitor_vectorized)
+    from pecst.lifetime import (LifetimeDeratingSurface, get_voltage_from_semilogx_lifetime, voltage_rating_due_to_lifetime,
+                                voltage_rating_due_to_lifetime_vectorized)
+    from pecst.dvdt import (calc_parallel_capacitors_dvdt, calc_parallel_capacitors_dvdt_vectorized, get_dvdt_max_vectorized, series_in_order_number)
+    from pecst.filter import (ParetoArchive, filter_df, non_dominated_sorting, pareto_front)
+    from pecst.result_sink import (FileResultSink, MemoryResultSink, NoResultSink, ResultSink)
+    from pecst.session import (SelectionSession)
+    from pecst.bank_optimization import (select_mixed_capacitor_banks)
+    from pecst.catalog import (CapacitorCatalog, CombinedCatalog, FoilCapacitorCatalog, SortedIndex)
+    from pecst.esr_store import (EsrStore, get_esr_store, normalize_order_number)
+    from pecst.esr_database import (EsrDatabase, build_esr_database)
+
+# submodule of each public name
+_SUBMODULE_NAMES = {
+    "pecst.functions": ["fft", "fft_batch"],
+    "pecst.power_loss": ["capacitor_admittance", "power_loss_film_capacitor", "power_loss_film_capacitor_mixed", "power_loss_film_capacitor_vectorized",
+                         "read_capacitor_frequency_dependent_limits", "read_capacitor_frequency_dependent_limits_at_frequencies"],
+    "pecst.read_capacitor_database": ["FilmCapacitorSeriesTuple", "clear_catalog_cache", "get_str_value_from_str", "load_dc_film_capacitors"],
+    "pecst.cst_dataclasses": ["CalculatedRequirementsValues", "CapacitanceTolerance", "CapacitorRequirements", "CapacitorSeriesData", "CapacitorType",
+                              "DownloadResult", "FrequencyDependentLimits", "HarmonicTable", "LifetimeDerating", "SelectionConstraints"],
+    "pecst.selection": ["calculate_from_requirements", "get_equivalent_heat_coefficient", "get_equivalent_heat_coefficient_vectorized",
+                        "get_temperature_current_derating_factor", "integrate", "requirements_grid", "select_capacitors", "select_capacitors_batch",
+                        "select_capacitors_worst_case"],
+    "pecst.constants": ["CATALOG_CACHE_DIRECTORY", "ESR_DATABASE_FILE", "ESR_MANIFEST_FILE", "ESR_OVER_FREQUENCY_DIRECTORY", "FOIL_CAPACITOR_DATA_DIRECTORY",
+                        "FOIL_CAPACITOR_SERIES_NAME_LIST", "FOIL_CAPACITOR_SERIES_VALUES", "MICRO_TO_NORM", "MILLI_TO_NORM", "NANO_TO_NORM", "NORM_TO_MICRO",
+                        "NORM_TO_MILLI", "QUBIC_METER_TO_QUBIC_CENTI_METER", "QUBIC_METER_TO_QUBIC_DECI_METER", "QUBIC_METER_TO_QUBIC_MILLI_METER",
+                        "TEMPERATURE_105", "TEMPERATURE_125", "TEMPERATURE_85"],
+    "pecst.esr_downloads": ["download_esr_csv_files", "download_files", "verify_esr_files", "verify_files"],
+    "pecst.generalplotsettings": ["global_plot_settings_font_latex", "global_plot_settings_font_sansserif", "update_font_size"],
+    "pecst.cost_models": ["COST_MODEL_DICT", "cost_electrolytic_capacitor", "cost_film_capacitor"],
+    "pecst.colors": ["color_combinations", "gnome_colors", "gnome_colors_list"],
+    "pecst.current_capability": ["current_capability_film_capacitor", "current_capability_film_capacitor_vectorized"],
+    "pecst.lifetime": ["LifetimeDeratingSurface", "get_voltage_from_semilogx_lifetime", "voltage_rating_due_to_lifetime",
+                       "voltage_rating_due_to_lifetime_vectorized"],
+    "pecst.dvdt": ["calc_parallel_capacitors_dvdt", "calc_parallel_capacitors_dvdt_vectorized", "get_dvdt_max_vectorized", "series_in_order_number"],
+    "pecst.filter": ["ParetoArchive", "filter_df", "non_dominated_sorting", "pareto_front"],
+    "pecst.result_sink": ["FileResultSink", "MemoryResultSink", "NoResultSink", "ResultSink"],
+    "pecst.session": ["SelectionSession"],
+    "pecst.bank_optimization": ["select_mixed_capacitor_banks"],
+    "pecst.catalog": ["CapacitorCatalog", "CombinedCatalog", "FoilCapacitorCatalog", "SortedIndex"],
+    "pecst.esr_store": ["EsrStore", "get_esr_store", "normalize_order_number"],
+    "pecst.esr_database": ["EsrDatabase", "build_esr_database"],
+}
+_NAME_SUBMODULE = {name: submodule for submodule, name_list in _SUBMODULE_NAMES.items() for name in name_list}
+
+__all__ = list(_NAME_SUBMODULE)
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Import the submodule of a public name on first access.
+
+    :param name: public name, e.g. 'select_capacitors'
+    :type name: str
+    :return: object of the submodule
+    :rtype: Any
+    :raises AttributeError: if the name is not part of the package
+    """
+    if name not in _NAME_SUBMODULE:
+        raise AttributeError(f"module 'pecst' has no attribute '{name}'")
+    value = getattr(importlib.import_module(_NAME_SUBMODULE[name]), name)
+    # keep the object, so __getattr__ is only called once per name
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """
+    List the public names including the not yet imported ones.
+
+    :return: names of the package
+    :rtype: list[str]
+    """
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,430 @@
+"""Capacitor banks combining different capacitors of a series."""
+# python libraries
+import heapq
+import itertools
+import logging
+
+# 3rd party libraries
+import numpy as np
+import pandas as pd
+
+# own libraries
+from pecst.catalog import CapacitorCatalog, FoilCapacitorCatalog
+from pecst.cst_dataclasses import CapacitorRequirements, SelectionConstraints
+from pecst.power_loss import capacitor_admittance, power_loss_film_capacitor_mixed
+from pecst.selection import _SeriesCache, _calculate_waveform_values, _interpolate_rows, _is_within_constraints
+import pecst.constants as const
+
+logger = logging.getLogger(__name__)
+
+# result column of each objective
+_OBJECTIVE_COLUMNS = {"volume": "volume_total", "cost": "cost", "area": "area_total"}
+
+
+class _BestBanks:
+    """Best capacitor banks found so far, limited to a maximum number of banks. Ties keep the bank found first."""
+
+    def __init__(self, number_of_results: int) -> None:
+        """
+        Create an empty list of banks.
+
+        :param number_of_results: maximum number of banks to keep
+        :type number_of_results: int
+        """
+        self.number_of_results = number_of_results
+        self._heap: list[tuple[float, int, dict]] = []
+        self._counter = itertools.count()
+
+    @property
+    def bound(self) -> float:
+        """
+        Objective value a new bank must fall below to be kept.
+
+        :return: objective value of the worst kept bank, infinity in case less banks than number_of_results are kept
+        :rtype: float
+        """
+        return -self._heap[0][0] if len(self._heap) == self.number_of_results else np.inf
+
+    def add(self, objective: float, bank: dict) -> None:
+        """
+        Add a bank, in case it is better than the worst kept bank.
+
+        :param objective: objective value of the bank
+        :type objective: float
+        :param bank: bank description
+        :type bank: dict
+        """
+        if objective >= self.bound:
+            return
+        heapq.heappush(self._heap, (-objective, -next(self._counter), bank))
+        if len(self._heap) > self.number_of_results:
+            heapq.heappop(self._heap)
+
+    def sorted_banks(self) -> list[dict]:
+        """
+        Get the kept banks.
+
+        :return: bank descriptions, best objective first
+        :rtype: list[dict]
+        """
+        return [bank for _, _, bank in sorted(self._heap, key=lambda item: (-item[0], -item[1]))]
+
+
+class _BankSearch:
+    """
+    Branch-and-bound search for capacitor banks of a single capacitor series and a fixed number of series capacitors.
+
+    A bank consists of in_series_needed series stages. Each stage contains the same parallel capacitors of up to
+    maximum_part_types different types. The search works on sums over the parallel capacitors of a stage
+    (capacitance, admittance, loss weights), so adding capacitors to a partial bank is a cheap array operation.
+    All capacitor types and counts following a partial bank are evaluated at once.
+
+    Pruning:
+     - a partial bank is not extended by a capacitor type, if the missing capacitance costs more than the worst kept bank,
+       using the best objective per capacitance of the remaining types
+     - the count of a type stays below the count of the single-type bank of this type, which is always better
+     - a feasible bank is not extended, as more capacitors only raise the objective
+    """
+
+    def __init__(self, series_cache: _SeriesCache, capacitor_index: np.ndarray, in_series_needed: int, objective_per_capacitor: np.ndarray,
+                 requirement_c_min: float, tolerance_percent: float, i_max: float, frequency_list: np.ndarray,
+                 current_amplitude_list: np.ndarray, derating_factor: float, delta_temperature_max: float, maximum_part_types: int,
+                 constraints: SelectionConstraints | None, best_banks: _BestBanks) -> None:
+        """
+        Prepare the per-capacitor values of the search.
+
+        :param series_cache: per-capacitor values of the capacitor series
+        :type series_cache: _SeriesCache
+        :param capacitor_index: indices of the capacitors fulfilling the voltage, lifetime, resonance and thermal data requirements
+        :type capacitor_index: np.ndarray
+        :param in_series_needed: number of series capacitors
+        :type in_series_needed: int
+        :param objective_per_capacitor: objective value of a single capacitor, for each capacitor of the series
+        :type objective_per_capacitor: np.ndarray
+        :param requirement_c_min: minimum required capacitance in F
+        :type requirement_c_min: float
+        :param tolerance_percent: capacitor tolerance in percent
+        :type tolerance_percent: float
+        :param i_max: peak current in A
+        :type i_max: float
+        :param frequency_list: frequencies of the current spectrum in Hz
+        :type frequency_list: np.ndarray
+        :param current_amplitude_list: current amplitudes of the current spectrum in A
+        :type current_amplitude_list: np.ndarray
+        :param derating_factor: current derating factor
+        :type derating_factor: float
+        :param delta_temperature_max: maximum self-heating in K
+        :type delta_temperature_max: float
+        :param maximum_part_types: maximum number of different capacitor types per bank
+        :type maximum_part_types: int
+        :param constraints: optional user constraints, e.g. maximum volume or cost
+        :type constraints: SelectionConstraints | None
+        :param best_banks: best banks found so far, shared between all searches
+        :type best_banks: _BestBanks
+        """
+        esr_matrix, current_capability_matrix = series_cache.limits_at_frequencies(frequency_list, capacitor_index)
+        esr_matrix, current_capability_matrix = esr_matrix[capacitor_index], current_capability_matrix[capacitor_index]
+        is_complete = np.all(np.isfinite(esr_matrix), axis=1) & np.all(current_capability_matrix > 0, axis=1)
+
+        # best objective per capacitance first, to find good banks early
+        capacitance = series_cache.capacitance[capacitor_index]
+        order = np.argsort(objective_per_capacitor[capacitor_index] / capacitance, kind="stable")
+        order = order[is_complete[order]]
+
+        self.series_cache = series_cache
+        self.capacitor_index = capacitor_index[order]
+        self.in_series_needed = in_series_needed
+        self.objective = objective_per_capacitor[self.capacitor_index]
+        self.capacitance = capacitance[order]
+        self.dvdt_max = np.nan_to_num(series_cache.dvdt_max[self.capacitor_index], nan=np.inf)
+        self.g_in_w_degree_celsius = series_cache.g_in_w_degree_celsius[self.capacitor_index]
+        self.admittance = capacitor_admittance(esr_matrix[order], self.capacitance, series_cache.esl[self.capacitor_index], frequency_list)
+        # loss of a stage = sum(loss_weight) / abs(sum(admittance)) ** 2, see power_loss_film_capacitor_mixed()
+        self.loss_weight = 0.5 * np.asarray(current_amplitude_list) ** 2 * esr_matrix[order] * np.abs(self.admittance) ** 2
+        # current capability: abs(sum(admittance)) must be at least this value for each capacitor type of the bank
+        self.admittance_needed = np.asarray(current_amplitude_list) * np.abs(self.admittance) / (
+            derating_factor * np.sqrt(2) * current_capability_matrix[order])
+
+        self.stage_capacitance_min = requirement_c_min * in_series_needed / (1 - tolerance_percent / 100)
+        self.i_max = i_max
+        self.delta_temperature_max = delta_temperature_max
+        self.maximum_part_types = maximum_part_types
+        self.constraints = constraints
+        self.best_banks = best_banks
+        self.number_of_frequencies = len(frequency_list)
+        # the single-type bank of a type is better than any mixed bank using at least the same count of this type
+        self.single_type_count = np.full(len(self.capacitor_index), np.inf)
+
+    def _evaluate(self, base: dict, type_index: np.ndarray, count: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Add capacitors to a partial bank and check the resulting banks.
+
+        :param base: sums of the partial bank
+        :type base: dict
+        :param type_index: capacitor type to add, for each resulting bank
+        :type type_index: np.ndarray
+        :param count: number of parallel capacitors to add, for each resulting bank
+        :type count: np.ndarray
+        :return: True for each feasible bank, objective value of a stage for each bank
+        :rtype: tuple[np.ndarray, np.ndarray]
+        """
+        stage_capacitance = base["capacitance"] + count * self.capacitance[type_index]
+        stage_admittance = np.abs(base["admittance"] + count[:, np.newaxis] * self.admittance[type_index])
+        loss_total = self.in_series_needed * np.sum((base["loss_weight"] + count[:, np.newaxis] * self.loss_weight[type_index]) / stage_admittance ** 2,
+                                                    axis=1)
+
+        is_feasible = ~(stage_capacitance < self.stage_capacitance_min)
+        # dv/dt of a stage must not exceed the limit of any capacitor type of the bank
+        is_feasible &= ~(self.i_max / stage_capacitance > np.minimum(base["dvdt_max"], self.dvdt_max[type_index]))
+        is_feasible &= np.all(~(stage_admittance < np.maximum(base["admittance_needed"], self.admittance_needed[type_index])), axis=1)
+        is_feasible &= ~(loss_total / np.minimum(base["g_in_w_degree_celsius"], self.g_in_w_degree_celsius[type_index]) > self.delta_temperature_max)
+
+        return is_feasible, base["objective"] + count * self.objective[type_index]
+
+    def _add_bank(self, type_index_list: list[int], count_list: list[int], stage_objective: float) -> None:
+        """
+        Keep a feasible bank, in case it is within the constraints and better than the worst kept bank.
+
+        :param type_index_list: capacitor types of the bank
+        :type type_index_list: list[int]
+        :param count_list: number of parallel capacitors of a stage, for each capacitor type
+        :type count_list: list[int]
+        :param stage_objective: objective value of a stage
+        :type stage_objective: float
+        """
+        capacitor_index = self.capacitor_index[type_index_list]
+        count = np.array(count_list, dtype=float) * self.in_series_needed
+        if self.constraints is not None and not _is_within_constraints(
+                self.constraints, volume_total=np.array([np.sum(count * self.series_cache.volume[capacitor_index])]),
+                cost_total=np.array([np.sum(count * self.series_cache.cost[capacitor_index])]),
+                area_total=np.array([np.sum(count * self.series_cache.area[capacitor_index])]), number_capacitors=np.array([np.sum(count)]))[0]:
+            return
+        self.best_banks.add(stage_objective * self.in_series_needed, {
+            "series_cache": self.series_cache, "capacitor_index": capacitor_index, "in_series_needed": self.in_series_needed,
+            "in_parallel_needed": np.array(count_list, dtype=int)})
+
+    def _add_single_type_banks(self) -> None:
+        """Find the lowest feasible count of each capacitor type as single-type bank."""
+        # lower bounds of the count due to capacitance, dv/dt, current capability and self-heating
+        count = np.ceil(np.nanmax(np.stack([
+            np.full(len(self.capacitance), self.stage_capacitance_min) / self.capacitance,
+            self.i_max / self.dvdt_max / self.capacitance,
+            np.max(self.admittance_needed / np.abs(self.admittance), axis=1, initial=0),
+            self.in_series_needed * np.sum(self.loss_weight / np.abs(self.admittance) ** 2, axis=1) / (
+                self.delta_temperature_max * self.g_in_w_degree_celsius)]), axis=0))
+        count = np.maximum(count, 1)
+        type_index = np.arange(len(self.capacitance))
+        empty_base = self._empty_base()
+        # rounding of the lower bounds may miss the lowest feasible count by one
+        for _ in range(3):
+            is_open = np.isinf(self.single_type_count)
+            is_feasible, stage_objective = self._evaluate(empty_base, type_index[is_open], count[is_open])
+            feasible_type_index, feasible_count = type_index[is_open][is_feasible], count[is_open][is_feasible]
+            self.single_type_count[feasible_type_index] = feasible_count
+            for bank_type_index, bank_count, bank_objective in zip(feasible_type_index, feasible_count, stage_objective[is_feasible], strict=True):
+                self._add_bank([int(bank_type_index)], [int(bank_count)], float(bank_objective))
+            count[is_open] += 1
+
+    def _empty_base(self) -> dict:
+        """
+        Get the sums of a bank without capacitors.
+
+        :return: sums of an empty bank
+        :rtype: dict
+        """
+        return {"capacitance": 0.0, "admittance": np.zeros(self.number_of_frequencies, dtype=complex),
+                "loss_weight": np.zeros(self.number_of_frequencies), "admittance_needed": np.zeros(self.number_of_frequencies),
+                "dvdt_max": np.inf, "g_in_w_degree_celsius": np.inf, "objective": 0.0}
+
+    def _extend(self, base: dict, type_index_list: list[int], count_list: list[int]) -> None:
+        """
+        Extend a partial bank by all following capacitor types and counts (depth-first).
+
+        :param base: sums of the partial bank
+        :type base: dict
+        :param type_index_list: capacitor types of the partial bank
+        :type type_index_list: list[int]
+        :param count_list: number of parallel capacitors of a stage, for each capacitor type of the partial bank
+        :type count_list: list[int]
+        """
+        start = type_index_list[-1] + 1 if type_index_list else 0
+        stage_bound = self.best_banks.bound / self.in_series_needed
+        missing_capacitance = max(self.stage_capacitance_min - base["capacitance"], 0)
+
+        # the types are sorted by objective per capacitance, so the bound due to the missing capacitance only rises
+        type_index = np.arange(start, len(self.capacitance))
+        type_index = type_index[~(base["objective"] + missing_capacitance * self.objective[type_index] / self.capacitance[type_index] >= stage_bound)]
+        type_index = type_index[~(base["objective"] + self.objective[type_index] >= stage_bound)]
+        maximum_count = np.minimum(self.single_type_count[type_index] - 1, np.floor((stage_bound - base["objective"]) / self.objective[type_index]))
+        maximum_count = np.nan_to_num(maximum_count, posinf=0).astype(int)
+        if np.sum(maximum_count) == 0:
+            return
+
+        # all (type, count) pairs at once. Without capacitors in the partial bank, all pairs are below the single-type count.
+        pair_type_index = np.repeat(type_index, maximum_count)
+        pair_count = np.concatenate([np.arange(1, number + 1) for number in maximum_count]).astype(float)
+        if type_index_list:
+            is_feasible, stage_objective = self._evaluate(base, pair_type_index, pair_count)
+        else:
+            is_feasible, stage_objective = np.zeros(len(pair_count), dtype=bool), np.zeros(len(pair_count))
+
+        is_last_type = len(type_index_list) + 1 == self.maximum_part_types
+        for count_type, current_type_index in enumerate(type_index):
+            is_type = pair_type_index == current_type_index
+            feasible_count = pair_count[is_type][is_feasible[is_type]]
+            lowest_feasible_count = feasible_count[0] if len(feasible_count) > 0 else np.inf
+            if type_index_list and np.isfinite(lowest_feasible_count):
+                self._add_bank(type_index_list + [int(current_type_index)], count_list + [int(lowest_feasible_count)],
+                               float(stage_objective[is_type][is_feasible[is_type]][0]))
+            if is_last_type:
+                continue
+            for count in range(1, int(min(lowest_feasible_count - 1, maximum_count[count_type])) + 1):
+                self._extend({
+                    "capacitance": base["capacitance"] + count * self.capacitance[current_type_index],
+                    "admittance": base["admittance"] + count * self.admittance[current_type_index],
+                    "loss_weight": base["loss_weight"] + count * self.loss_weight[current_type_index],
+                    "admittance_needed": np.maximum(base["admittance_needed"], self.admittance_needed[current_type_index]),
+                    "dvdt_max": min(base["dvdt_max"], self.dvdt_max[current_type_index]),
+                    "g_in_w_degree_celsius": min(base["g_in_w_degree_celsius"], self.g_in_w_degree_celsius[current_type_index]),
+                    "objective": base["objective"] + count * self.objective[current_type_index]},
+                    type_index_list + [int(current_type_index)], count_list + [count])
+
+    def run(self) -> None:
+        """Search the banks of up to maximum_part_types capacitor types."""
+        if len(self.capacitor_index) == 0:
+            return
+        self._add_single_type_banks()
+        if self.maximum_part_types > 1:
+            self._extend(self._empty_base(), [], [])
+
+
+def _bank_result(bank: dict, frequency_list: np.ndarray, current_amplitude_list: np.ndarray) -> dict:
+    """
+    Calculate the result values of a capacitor bank.
+
+    :param bank: bank description
+    :type bank: dict
+    :param frequency_list: frequencies of the current spectrum in Hz
+    :type frequency_list: np.ndarray
+    :param current_amplitude_list: current amplitudes of the current spectrum in A
+    :type current_amplitude_list: np.ndarray
+    :return: result values of the bank
+    :rtype: dict
+    """
+    series_cache = bank["series_cache"]
+    capacitor_index = bank["capacitor_index"]
+    in_parallel_needed = bank["in_parallel_needed"]
+    in_series_needed = bank["in_series_needed"]
+    number_capacitors = in_parallel_needed * in_series_needed
+
+    esr_matrix, _ = series_cache.limits_at_frequencies(frequency_list, capacitor_index)
+    power_loss_per_capacitor, _ = power_loss_film_capacitor_mixed(esr_matrix[capacitor_index], series_cache.capacitance[capacitor_index],
+                                                                  series_cache.esl[capacitor_index], in_parallel_needed, frequency_list,
+                                                                  current_amplitude_list)
+    power_loss_total = float(np.sum(power_loss_per_capacitor * number_capacitors))
+
+    return {
+        "series": series_cache.series_data.capacitor_series_name,
+        "number_part_types": len(capacitor_index),
+        "ordering code": tuple(series_cache.ordering_code[capacitor_index]),
+        "in_series_needed": in_series_needed,
+        "in_parallel_needed": tuple(int(count) for count in in_parallel_needed),
+        "capacitance_total": float(np.sum(in_parallel_needed * series_cache.capacitance[capacitor_index]) / in_series_needed),
+        "volume_total": float(np.sum(number_capacitors * series_cache.volume[capacitor_index])),
+        "cost": float(np.sum(number_capacitors * series_cache.cost[capacitor_index])),
+        "area_total": float(np.sum(number_capacitors * series_cache.area[capacitor_index])),
+        "power_loss_total": power_loss_total,
+        "delta_temperature": power_loss_total / float(np.min(series_cache.g_in_w_degree_celsius[capacitor_index]))}
+
+def _select_mixed_capacitor_banks(series_cache_list: list[_SeriesCache], c_requirements: CapacitorRequirements,
+                                  waveform_values: tuple[np.ndarray, float, np.ndarray, np.ndarray], maximum_part_types: int, objective: str,
+                                  number_of_results: int, constraints: SelectionConstraints | None) -> pd.DataFrame:
+    """
+    Search the best capacitor banks of all capacitor series, see select_mixed_capacitor_banks().
+
+    :param series_cache_list: per-capacitor values of each capacitor series
+    :type series_cache_list: list[_SeriesCache]
+    :param c_requirements: capacitor requirements
+    :type c_requirements: CapacitorRequirements
+    :param waveform_values: result of _calculate_waveform_values() for the requirements
+    :type waveform_values: tuple[np.ndarray, float, np.ndarray, np.ndarray]
+    :param maximum_part_types: maximum number of different capacitor types per bank
+    :type maximum_part_types: int
+    :param objective: 'volume', 'cost' or 'area'
+    :type objective: str
+    :param number_of_results: number of banks to return
+    :type number_of_results: int
+    :param constraints: optional user constraints, e.g. maximum volume or cost
+    :type constraints: SelectionConstraints | None
+    :return: best capacitor banks
+    :rtype: pd.DataFrame
+    """
+    if objective not in _OBJECTIVE_COLUMNS:
+        raise ValueError(f"objective '{objective}' not available: Must be one of {list(_OBJECTIVE_COLUMNS.keys())}")
+    if maximum_part_types < 1 or number_of_results < 1:
+        raise ValueError("maximum_part_types and number_of_results must be at least 1.")
+
+    requirement_c_min, i_max, frequency_list, current_amplitude_list = waveform_values
+    best_banks = _BestBanks(number_of_results)
+
+    for series_cache in series_cache_list:
+        logger.info(f"Capacitor series: {series_cache.series_data.capacitor_series_name}")
+        objective_per_capacitor = {"volume": series_cache.volume, "cost": series_cache.cost, "area": series_cache.area}[objective]
+
+        # voltage and lifetime, see _select_capacitor_series_vectorized()
+        derating_factor = series_cache.derating_factor(float(c_requirements.temperature_ambient))
+        delta_temperature_max = derating_factor ** 2 * series_cache.series_data.delta_t_jc_max
+        virtual_inner_max_temperature = c_requirements.temperature_ambient + delta_temperature_max
+        v_op_max_virt = _interpolate_rows(np.array([virtual_inner_max_temperature], dtype=float),
+                                          [const.TEMPERATURE_85, const.TEMPERATURE_105, const.TEMPERATURE_125], series_cache.voltage_points)[0]
+        voltage_lifetime = series_cache.voltage_lifetime(float(c_requirements.lifetime_h), float(virtual_inner_max_temperature))
+        in_series_needed = np.ceil(c_requirements.v_dc_for_op_max_voltage / (
+            v_op_max_virt * voltage_lifetime / series_cache.voltage_rating * (1 + c_requirements.voltage_safety_margin_percentage / 100)))
+        is_valid = ~np.isnan(voltage_lifetime) & ~(series_cache.f_res < frequency_list[0]) & ~np.isnan(series_cache.g_in_w_degree_celsius)
+
+        # a capacitor can be used with more series capacitors than needed
+        for number_series in range(1, int(c_requirements.maximum_number_series_capacitors) + 1):
+            capacitor_index = np.nonzero(is_valid & ~(in_series_needed > number_series))[0]
+            _BankSearch(series_cache, capacitor_index, number_series, objective_per_capacitor, float(requirement_c_min[0]),
+                        float(c_requirements.capacitor_tolerance_percent), i_max, frequency_list, current_amplitude_list, derating_factor,
+                        delta_temperature_max, maximum_part_types, constraints, best_banks).run()
+
+    result_df = pd.DataFrame([_bank_result(bank, frequency_list, current_amplitude_list) for bank in best_banks.sorted_banks()],
+                             columns=["series", "number_part_types", "ordering code", "in_series_needed", "in_parallel_needed", "capacitance_total",
+                                      "volume_total", "cost", "area_total", "power_loss_total", "delta_temperature"])
+    return result_df
+
+def select_mixed_capacitor_banks(c_requirements: CapacitorRequirements, maximum_part_types: int = 2, objective: str = "volume",
+                                 number_of_results: int = 10, constraints: SelectionConstraints | None = None,
+                                 catalog: CapacitorCatalog | None = None) -> pd.DataFrame:
+    """
+    Search the best capacitor banks combining different capacitors of a series, e.g. a few large and some small high-current capacitors.
+
+    select_capacitors() only considers banks of in_series_needed x in_parallel_needed same capacitors. Here, each series stage
+    of a bank contains up to maximum_part_types different capacitor types of the same series. The current of each harmonic
+    is shared according to the admittance of the capacitors, see power_loss_film_capacitor_mixed(). A bank is feasible,
+    if it fulfills the capacitance, dv/dt, current capability (for each capacitor) and self-heating requirements.
+
+    A branch-and-bound search returns the banks with the lowest objective value. Banks of a single capacitor type are included,
+    so the result shows whether mixing capacitor types pays off. The search effort grows fast with maximum_part_types,
+    2 or 3 are recommended.
+
+    :param c_requirements: capacitor requirements
+    :type c_requirements: CapacitorRequirements
+    :param maximum_part_types: maximum number of different capacitor types per bank. Defaults to 2.
+    :type maximum_part_types: int
+    :param objective: 'volume'[default], 'cost' or 'area' to minimize
+    :type objective: str
+    :param number_of_results: number of banks to return. Defaults to 10.
+    :type number_of_results: int
+    :param constraints: optional user limits for maximum volume in m³, cost in euro, PCB area in m² and number of capacitors
+    :type constraints: SelectionConstraints | None
+    :param catalog: catalog of the capacitor series, defaults to the TDK foil capacitor series of the package
+    :type catalog: CapacitorCatalog | None
+    :return: best capacitor banks, best objective first. 'ordering code' and 'in_parallel_needed' contain a value for each capacitor type.
+    :rtype: pd.DataFrame
+    """
+    catalog = FoilCapacitorCatalog() if catalog is None else catalog
+    return _select_mixed_capacitor_banks([_SeriesCache(catalog.load_series(capacitor_series_name)) for capacitor_series_name in catalog.series_name_list()],
+                                         c_requirements, _calculate_waveform_values([c_requirements]), maximum_part_types, objective,
+                                         number_of_results, constraints)
@@ -0,0 +1,238 @@
+"""Capacitor catalogs and sorted indexes for range queries on the catalog values."""
+
+# python libraries
+import abc
+import dataclasses
+import pathlib
+
+# 3rd party libraries
+import numpy as np
+import pandas as pd
+
+# own libraries
+from pecst.cst_dataclasses import CapacitorSeriesData
+from pecst.read_capacitor_database import load_dc_film_capacitors
+import pecst.constants as const
+
+
+class CapacitorCatalog(abc.ABC):
+    """
+    Source of the capacitor series for the selection.
+
+    All catalogs provide the capacitor series in the same schema, see CapacitorSeriesData and load_dc_film_capacitors().
+    Catalogs are handed over to the worker processes and identify the loaded capacitor series in each worker, so derived
+    catalogs must be picklable and hashable, e.g. frozen dataclasses.
+    """
+
+    @abc.abstractmethod
+    def series_name_list(self) -> list[str]:
+        """
+        Get the names of all capacitor series of the catalog.
+
+        :return: capacitor series names
+        :rtype: list[str]
+        """
+
+    @abc.abstractmethod
+    def load_series(self, capacitor_series_name: str) -> CapacitorSeriesData:
+        """
+        Load a single capacitor series.
+
+        :param capacitor_series_name: name of the capacitor series
+        :type capacitor_series_name: str
+        :return: capacitor series data
+        :rtype: CapacitorSeriesData
+        """
+
+
+def _load_series_values(data_directory: str | pathlib.Path | None = None) -> pd.DataFrame:
+    """
+    Load the series specific values (e.g. maximum self-heating) of all capacitor series.
+
+    :param data_directory: directory of the capacitor data, defaults to the capacitor data of the package
+    :type data_directory: str | pathlib.Path | None
+    :return: series values
+    :rtype: pd.DataFrame
+    """
+    if data_directory is None:
+        data_directory = pathlib.Path(__file__).parent / const.FOIL_CAPACITOR_DATA_DIRECTORY
+    capacitor_series_values_path = pathlib.Path(data_directory) / f"{const.FOIL_CAPACITOR_SERIES_VALUES}.csv"
+    return pd.read_csv(capacitor_series_values_path, delimiter=';', decimal=',')
+
+def _load_capacitor_series_data(capacitor_series_name: str, series_values: pd.DataFrame,
+                                data_directory: str | pathlib.Path | None = None) -> CapacitorSeriesData:
+    """
+    Load the database of a single capacitor series.
+
+    :param capacitor_series_name: name of the capacitor series
+    :type capacitor_series_name: str
+    :param series_values: series specific values, e.g. the maximum self-heating
+    :type series_values: pd.DataFrame
+    :param data_directory: directory of the capacitor data, defaults to the capacitor data of the package
+    :type data_directory: str | pathlib.Path | None
+    :return: capacitor series data
+    :rtype: CapacitorSeriesData
+    """
+    c_db, c_thermal, c_derating, dvdt_df, lt_dto_list = load_dc_film_capacitors(capacitor_series_name, data_directory=data_directory)
+    delta_t_jc_max = series_values.loc[series_values["series"] == capacitor_series_name, "delta_t_jc"].values[0]
+
+    return CapacitorSeriesData(capacitor_series_name=capacitor_series_name, c_db=c_db, c_thermal=c_thermal, c_derating=c_derating,
+                               dvdt_df=dvdt_df, lt_dto_list=lt_dto_list, delta_t_jc_max=delta_t_jc_max)
+
+
+@dataclasses.dataclass(frozen=True)
+class FoilCapacitorCatalog(CapacitorCatalog):
+    """
+    Catalog of foil capacitor series stored as datasheet csv files.
+
+    The data directory contains the file 'series_values.csv' (columns 'series' and 'delta_t_jc') and a sub-directory with
+    the csv files per capacitor series, see load_dc_film_capacitors(). Without a data directory, the TDK capacitor series
+    of the package are used.
+    """
+
+    data_directory: str | pathlib.Path | None = None
+
+    def series_name_list(self) -> list[str]:
+        """
+        Get the names of all capacitor series of the catalog.
+
+        :return: capacitor series names
+        :rtype: list[str]
+        """
+        if self.data_directory is None:
+            return list(const.FOIL_CAPACITOR_SERIES_NAME_LIST)
+        return [str(capacitor_series_name) for capacitor_series_name in _load_series_values(self.data_directory)["series"]]
+
+    def load_series(self, capacitor_series_name: str) -> CapacitorSeriesData:
+        """
+        Load a single capacitor series.
+
+        :param capacitor_series_name: name of the capacitor series
+        :type capacitor_series_name: str
+        :return: capacitor series data
+        :rtype: CapacitorSeriesData
+        """
+        return _load_capacitor_series_data(capacitor_series_name, _load_series_values(self.data_directory), self.data_directory)
+
+
+@dataclasses.dataclass(frozen=True)
+class CombinedCatalog(CapacitorCatalog):
+    """Catalog of the capacitor series of several catalogs, e.g. of several manufacturers."""
+
+    catalog_list: tuple[CapacitorCatalog, ...]
+
+    def __post_init__(self) -> None:
+        """
+        Check the capacitor series names to be unique.
+
+        :raises ValueError: if a capacitor series name is part of several catalogs
+        """
+        series_name_list = self.series_name_list()
+        duplicate_name_list = sorted({name for name in series_name_list if series_name_list.count(name) > 1})
+        if duplicate_name_list:
+            raise ValueError(f"Capacitor series {duplicate_name_list} are part of several catalogs.")
+
+    def series_name_list(self) -> list[str]:
+        """
+        Get the names of all capacitor series of all catalogs, in the order of the catalogs.
+
+        :return: capacitor series names
+        :rtype: list[str]
+        """
+        return [capacitor_series_name for catalog in self.catalog_list for capacitor_series_name in catalog.series_name_list()]
+
+    def load_series(self, capacitor_series_name: str) -> CapacitorSeriesData:
+        """
+        Load a single capacitor series from the catalog containing it.
+
+        :param capacitor_series_name: name of the capacitor series
+        :type capacitor_series_name: str
+        :return: capacitor series data
+        :rtype: CapacitorSeriesData
+        :raises KeyError: if no catalog contains the capacitor series
+        """
+        for catalog in self.catalog_list:
+            if capacitor_series_name in catalog.series_name_list():
+                return catalog.load_series(capacitor_series_name)
+        raise KeyError(f"Capacitor series {capacitor_series_name} is not part of the catalog.")
+
+
+class SortedIndex:
+    """
+    Sorted index of a per-capacitor value, e.g. the rated voltage.
+
+    Range queries use a binary search on the sorted values, so the capacitors within a value range are found in
+    O(log n) plus the number of found capacitors. NaN values are never part of a range.
+    """
+
+    def __init__(self, values: np.ndarray) -> None:
+        """
+        Sort the values.
+
+        :param values: value for each capacitor
+        :type values: np.ndarray
+        """
+        self.values = np.asarray(values, dtype=float)
+        # NaN values are sorted to the end and never found by the binary search
+        self.order = np.argsort(self.values, kind="stable")
+        self.sorted_values = self.values[self.order]
+
+    def _bounds(self, minimum: float, maximum: float) -> tuple[int, int]:
+        """
+        Get the positions of a value range in the sorted values.
+
+        :param minimum: smallest value of the range
+        :type minimum: float
+        :param maximum: largest value of the range
+        :type maximum: float
+        :return: start and stop position
+        :rtype: tuple[int, int]
+        """
+        start = int(np.searchsorted(self.sorted_values, minimum, side="left"))
+        stop = int(np.searchsorted(self.sorted_values, maximum, side="right"))
+        return start, max(start, stop)
+
+    def count(self, minimum: float = -np.inf, maximum: float = np.inf) -> int:
+        """
+        Count the capacitors with minimum <= value <= maximum.
+
+        :param minimum: smallest value of the range
+        :type minimum: float
+        :param maximum: largest value of the range
+        :type maximum: float
+        :return: number of capacitors
+        :rtype: int
+        """
+        start, stop = self._bounds(minimum, maximum)
+        return stop - start
+
+    def range(self, minimum: float = -np.inf, maximum: float = np.inf) -> np.ndarray:
+        """
+        Get the capacitors with minimum <= value <= maximum.
+
+        :param minimum: smallest value of the range
+        :type minimum: float
+        :param maximum: largest value of the range
+        :type maximum: float
+        :return: capacitor indices in the order of the values
+        :rtype: np.ndarray
+        """
+        start, stop = self._bounds(minimum, maximum)
+        return self.order[start:stop]
+
+    def is_in_range(self, capacitor_index: np.ndarray, minimum: float = -np.inf, maximum: float = np.inf) -> np.ndarray:
+        """
+        Check the values of the given capacitors to be within minimum <= value <= maximum.
+
+        :param capacitor_index: capacitor indices
+        :type capacitor_index: np.ndarray
+        :param minimum: smallest value of the range
+        :type minimum: float
+        :param maximum: largest value of the range
+        :type maximum: float
+        :return: True for each capacitor within the range
+        :rtype: np.ndarray
+        """
+        values = self.values[capacitor_index]
+        is_within_range: np.ndarray = (values >= minimum) & (values <= maximum)
+        return is_within_range
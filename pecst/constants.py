@@ -5,8 +5,9 @@ MILLI_TO_NORM = 1e-3
 MICRO_TO_NORM = 1e-6
 NANO_TO_NORM = 1e-9
 
-# normal to milli
+# normal to milli, micro
 NORM_TO_MILLI = 1e3
+NORM_TO_MICRO = 1e6
 
 # qubic milli/deci-meter
 QUBIC_METER_TO_QUBIC_DECI_METER = 1e3
@@ -16,6 +17,12 @@ QUBIC_METER_TO_QUBIC_MILLI_METER = 1e9
 # folder names
 ESR_OVER_FREQUENCY_DIRECTORY = "esr_downloads"
 FOIL_CAPACITOR_DATA_DIRECTORY = "foil_capacitor_data"
+# compiled capacitor series, see load_dc_film_capacitors()
+CATALOG_CACHE_DIRECTORY = "catalog_cache"
+# binary ESR database inside the ESR directory, see build_esr_database()
+ESR_DATABASE_FILE = "esr_database.bin"
+# download manifest inside the ESR directory, see download_esr_csv_files()
+ESR_MANIFEST_FILE = "esr_manifest.json"
 
 # available foil capacitor series
 FOIL_CAPACITOR_SERIES_NAME_LIST = ["B3271*P", "B3272*AGT", "B3277*P"]
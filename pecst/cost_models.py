@@ -5,7 +5,7 @@ Ralph Burkart and Johann W. Kolar.
 """
 
 # 3rd party libraries
-
+import numpy as np
 
 # Fix cost values according to the above cited paper
 COST_MODEL_DICT = {
@@ -32,17 +32,19 @@ def cost_electrolytic_capacitor(voltage_rated: float, capacitance_rated: float)
     return cost
 
 
-def cost_film_capacitor(voltage_rated: float, capacitance_rated: float) -> float:
+def cost_film_capacitor(voltage_rated: float | np.ndarray, capacitance_rated: float | np.ndarray) -> float | np.ndarray:
     """
     Calculate the cost in euro of a film capacitor.
 
+    Works for single values as well as element-wise for arrays of capacitors.
+
     :param voltage_rated: rated capacitor voltage in V
-    :type voltage_rated: float
+    :type voltage_rated: float | np.ndarray
     :param capacitance_rated: rated capacitor capacitance in F
-    :type capacitance_rated: float
+    :type capacitance_rated: float | np.ndarray
     :return: Cost of the capacitor
-    :rtype: float
+    :rtype: float | np.ndarray
     """
-    cost: float = COST_MODEL_DICT["a_film"] + COST_MODEL_DICT["b_film"] * voltage_rated + COST_MODEL_DICT["c_film"] * capacitance_rated
+    cost: float | np.ndarray = COST_MODEL_DICT["a_film"] + COST_MODEL_DICT["b_film"] * voltage_rated + COST_MODEL_DICT["c_film"] * capacitance_rated
 
     return cost
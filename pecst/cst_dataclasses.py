@@ -36,6 +36,55 @@ class CapacitorRequirements:
     lifetime_h: float
     results_directory: str
 
+@dataclass
+class SelectionConstraints:
+    """Optional user limits for the selected capacitor banks. None means no limit."""
+
+    maximum_volume: float | None = None
+    maximum_cost: float | None = None
+    maximum_area: float | None = None
+    maximum_number_capacitors: int | None = None
+
+@dataclass
+class HarmonicTable:
+    """
+    Spectra of several waveforms, see fft_batch().
+
+    'csr' layout: 1-D arrays with the harmonics of all waveforms, waveform k uses the entries offsets[k]:offsets[k + 1].
+    'padded' layout: 2-D arrays with one row per waveform, padded with frequency NaN, amplitude 0 and phase 0.
+    """
+
+    frequency: np.ndarray
+    amplitude: np.ndarray
+    phase: np.ndarray
+    number_of_harmonics: np.ndarray
+    offsets: np.ndarray
+
+@dataclass
+class FrequencyDependentLimits:
+    """Frequency-dependent ESR and current capability of a capacitor, see EsrStore."""
+
+    frequency: np.ndarray
+    esr: np.ndarray
+    current_capability: np.ndarray
+
+@dataclass
+class DownloadResult:
+    """
+    Result of a single file download, see download_esr_csv_files().
+
+    status is 'downloaded', 'not_modified' (conditional request, local file is up to date), 'skipped' (local file exists) or 'failed'.
+    manifest_entry contains size, SHA-256 hash, ETag, Last-Modified and fetch time of a downloaded file.
+    """
+
+    url: str
+    save_path: str
+    status: str
+    status_code: int | None = None
+    attempts: int = 0
+    error: str | None = None
+    manifest_entry: dict | None = None
+
 @dataclass
 class CalculatedRequirementsValues:
     """From input values calculated values or requirements."""
@@ -51,3 +100,15 @@ class LifetimeDerating:
     voltage: float
     temperature: float
     lifetime: pd.DataFrame
+
+@dataclass
+class CapacitorSeriesData:
+    """Loaded database of a single capacitor series, shared between selection runs."""
+
+    capacitor_series_name: str
+    c_db: pd.DataFrame
+    c_thermal: pd.DataFrame
+    c_derating: pd.DataFrame
+    dvdt_df: pd.DataFrame
+    lt_dto_list: list[LifetimeDerating]
+    delta_t_jc_max: float
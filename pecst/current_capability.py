@@ -6,34 +6,56 @@
 import numpy as np
 
 # own libraries
-from pecst.power_loss import read_capacitor_frequency_dependent_limits
+from pecst.esr_store import get_esr_store
 
-def current_capability_film_capacitor(order_number: str, frequency_list: list[float], current_amplitude_list: list[float], derating_factor: float) -> int:
+def current_capability_film_capacitor(order_number: str, frequency_list: list[float] | np.ndarray, current_amplitude_list: list[float] | np.ndarray,
+                                      derating_factor: float) -> int:
     """
     Film capacitor power loss estimation.
 
     :param order_number: capacitor order number
     :type order_number: str
     :param frequency_list: frequency in Hertz in a list
-    :type frequency_list: list[float]
+    :type frequency_list: list[float] | np.ndarray
     :param current_amplitude_list: current in ampere in a list
-    :type current_amplitude_list: list[float]
+    :type current_amplitude_list: list[float] | np.ndarray
     :param derating_factor: derating factor
     :type derating_factor: float
     :return: number of parallel capacitors needed due to current limit
     :rtype: int
     """
-    order_number = order_number.replace("+", "K")
-
-    # read peak current capability from file
-    peak_current_capability_df = read_capacitor_frequency_dependent_limits(order_number)
+    # peak current capability, the file is read only once per process
+    limits = get_esr_store().get(order_number)
 
     # interpolate the current capability according to the given frequencies. Note
     peak_current_capability_at_frequencies = derating_factor * np.sqrt(2) * np.interp(
-        frequency_list, peak_current_capability_df["F_HZ"], peak_current_capability_df["IRMS_FINAL_AT_TOP"])
+        frequency_list, limits.frequency, limits.current_capability)
 
     number_parallel_capacitors_at_frequencies = np.ceil(current_amplitude_list / peak_current_capability_at_frequencies)
 
     number_parallel_capacitors = np.max(number_parallel_capacitors_at_frequencies)
 
     return int(number_parallel_capacitors)
+
+def current_capability_film_capacitor_vectorized(current_capability_matrix: np.ndarray, current_amplitude_list: np.ndarray,
+                                                 derating_factor: float) -> np.ndarray:
+    """
+    Film capacitor current capability evaluation for many capacitors at once.
+
+    Vectorized version of current_capability_film_capacitor().
+
+    :param current_capability_matrix: RMS current capability in A of shape (number of capacitors, number of frequencies)
+    :type current_capability_matrix: np.ndarray
+    :param current_amplitude_list: current in ampere in a list
+    :type current_amplitude_list: np.ndarray
+    :param derating_factor: derating factor
+    :type derating_factor: float
+    :return: number of parallel capacitors needed due to current limit, for each capacitor
+    :rtype: np.ndarray
+    """
+    peak_current_capability_at_frequencies = derating_factor * np.sqrt(2) * current_capability_matrix
+
+    number_parallel_capacitors_at_frequencies = np.ceil(np.asarray(current_amplitude_list) / peak_current_capability_at_frequencies)
+
+    number_parallel_capacitors: np.ndarray = np.max(number_parallel_capacitors_at_frequencies, axis=1, initial=0)
+    return number_parallel_capacitors
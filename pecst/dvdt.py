@@ -49,17 +49,77 @@ def calc_parallel_capacitors_dvdt(capacitance: float, rated_voltage: float, i_pe
     :rtype: int
     """
     # get maximum allowed dv/dt per capacitor type
-    dvdt_max_df = dvdt_df["dv/dt"].loc[dvdt_df.apply(
-        lambda x: series_in_order_number(x["series"], ordering_number), axis=1) & (dvdt_df["rated_voltage"] == rated_voltage)]
-
-    if len(dvdt_max_df.values) != 1:
-        dvdt_max = np.nan
-        logger.info("Value can not be found in the dv/dt database. Something must be wrong with the table data.\n"
-                    f"{ordering_number=}, {rated_voltage=}")
-    else:
-        dvdt_max = float(dvdt_max_df.values[0])
+    dvdt_max = float(get_dvdt_max_vectorized(np.array([rated_voltage]), dvdt_df, np.array([ordering_number]))[0])
 
     # calculate number of parallel capacitors to meet the dv/dt maximum requirement
     number_parallel_capacitors = np.ceil(i_peak / dvdt_max / capacitance)
 
     return int(number_parallel_capacitors)
+
+def get_dvdt_max_vectorized(rated_voltage: np.ndarray, dvdt_df: pd.DataFrame, ordering_number: np.ndarray) -> np.ndarray:
+    """
+    Get the maximum allowed dv/dt for many capacitors at once.
+
+    The dv/dt table is joined on the capacitor series, i.e. the beginning of the ordering number, and the rated voltage.
+    The series prefix is cut from the ordering numbers once per length of the series names in the table, so the lookup is
+    a single hashed merge instead of a scan of the table for each capacitor. Capacitors without exactly one entry in the
+    table result in NaN and are logged together.
+
+    :param rated_voltage: capacitors rated voltage in V
+    :type rated_voltage: np.ndarray
+    :param dvdt_df: dataframe with information about dv/dt limits
+    :type dvdt_df: pd.DataFrame
+    :param ordering_number: capacitor ordering numbers
+    :type ordering_number: np.ndarray
+    :return: maximum allowed dv/dt in V/s, NaN in case of missing dv/dt data
+    :rtype: np.ndarray
+    """
+    key_df = pd.DataFrame({"ordering_number": pd.Series(ordering_number, dtype=str).to_numpy(),
+                           "rated_voltage": np.asarray(rated_voltage, dtype=float)})
+    # keys with several entries in the table have no unique dv/dt
+    table_df = pd.DataFrame({"series": dvdt_df["series"].astype(str), "rated_voltage": dvdt_df["rated_voltage"].to_numpy(dtype=float),
+                             "dv/dt": dvdt_df["dv/dt"].to_numpy(dtype=float)}).drop_duplicates(subset=["series", "rated_voltage"], keep=False)
+
+    dvdt_max = np.full(len(key_df), np.nan)
+    number_of_matches = np.zeros(len(key_df), dtype=int)
+    # one join per length of the series names, on the series prefix of the ordering number and the rated voltage
+    for prefix_length, prefix_df in table_df.groupby(table_df["series"].str.len()):
+        key_df["series"] = key_df["ordering_number"].str[:prefix_length]
+        dvdt = key_df.merge(prefix_df, how="left", on=["series", "rated_voltage"])["dv/dt"].to_numpy(dtype=float)
+        is_match = ~np.isnan(dvdt)
+        dvdt_max[is_match] = dvdt[is_match]
+        number_of_matches += is_match
+
+    is_not_unique = number_of_matches != 1
+    dvdt_max[is_not_unique] = np.nan
+    if np.any(is_not_unique):
+        logger.info(f"{np.count_nonzero(is_not_unique)} values can not be found in the dv/dt database. Something must be wrong with the table data.\n"
+                    f"{key_df.loc[is_not_unique, ['ordering_number', 'rated_voltage']].to_numpy().tolist()}")
+
+    return dvdt_max
+
+def calc_parallel_capacitors_dvdt_vectorized(capacitance: np.ndarray, rated_voltage: np.ndarray, i_peak: float, dvdt_df: pd.DataFrame,
+                                             ordering_number: np.ndarray) -> np.ndarray:
+    """
+    Calculate the number of parallel capacitors needed due to the maximum dv/dt requirement for many capacitors at once.
+
+    Vectorized version of calc_parallel_capacitors_dvdt(), see get_dvdt_max_vectorized() for the dv/dt lookup.
+
+    :param capacitance: capacitance in F
+    :type capacitance: np.ndarray
+    :param rated_voltage: capacitors rated voltage in V
+    :type rated_voltage: np.ndarray
+    :param i_peak: peak current of the capacitor bank
+    :type i_peak: float
+    :param dvdt_df: dataframe with information about dv/dt limits
+    :type dvdt_df: pd.DataFrame
+    :param ordering_number: capacitor ordering numbers
+    :type ordering_number: np.ndarray
+    :return: number of parallel capacitors needed due to dv/dt requirement, NaN in case of missing dv/dt data
+    :rtype: np.ndarray
+    """
+    dvdt_max = get_dvdt_max_vectorized(rated_voltage, dvdt_df, ordering_number)
+
+    # calculate number of parallel capacitors to meet the dv/dt maximum requirement
+    number_parallel_capacitors: np.ndarray = np.ceil(i_peak / dvdt_max / np.asarray(capacitance))
+    return number_parallel_capacitors
@@ -0,0 +1,155 @@
+"""Consolidated binary ESR database, memory-mapped at load time."""
+
+# python libraries
+import argparse
+import logging
+import os
+import pathlib
+
+# 3rd party libraries
+import numpy as np
+import pandas as pd
+
+# own libraries
+from pecst.cst_dataclasses import FrequencyDependentLimits
+import pecst.constants as const
+
+logger = logging.getLogger(__name__)
+
+# file layout: header, index of all curves, data of shape (3, number of points) with frequency, ESR and current capability
+_DATABASE_MAGIC = b"PECSTESR"
+_DATABASE_VERSION = 1
+_HEADER_DTYPE = np.dtype([("magic", "S8"), ("version", "<u4"), ("number_of_curves", "<u4"), ("number_of_points", "<u8")])
+_INDEX_DTYPE = np.dtype([("order_number", "S32"), ("offset", "<u8"), ("length", "<u8"), ("modification_time", "<i8")])
+
+
+def _read_esr_file(esr_csv_filepath: pathlib.Path) -> FrequencyDependentLimits:
+    """
+    Read the frequency-dependent ESR and current capability from an ESR file.
+
+    :param esr_csv_filepath: path of the ESR file
+    :type esr_csv_filepath: pathlib.Path
+    :return: frequency in Hz, ESR in Ohm and RMS current capability in A
+    :rtype: FrequencyDependentLimits
+    """
+    df = pd.read_csv(esr_csv_filepath, usecols=["F_HZ", "ESR_FINAL", "IRMS_FINAL_AT_TOP"])
+    return FrequencyDependentLimits(frequency=df["F_HZ"].to_numpy(dtype=float), esr=(df["ESR_FINAL"] * const.MILLI_TO_NORM).to_numpy(dtype=float),
+                                    current_capability=df["IRMS_FINAL_AT_TOP"].to_numpy(dtype=float))
+
+def build_esr_database(esr_directory: str | pathlib.Path | None = None, database_file: str | pathlib.Path | None = None) -> pathlib.Path:
+    """
+    Compile all ESR files of a directory into a single binary database file.
+
+    The modification time of each ESR file is stored, so curves of files changed after the build are not used.
+
+    :Minimal Example:
+
+    >>> import pecst
+    >>> pecst.download_esr_csv_files()
+    >>> pecst.build_esr_database()
+
+    Same from the command line: pecst-build-esr-database [--esr-directory DIRECTORY] [--database-file FILE]
+
+    :param esr_directory: directory of the ESR files. Defaults to None: the 'esr_downloads' directory of the package.
+    :type esr_directory: str | pathlib.Path | None
+    :param database_file: database file to write. Defaults to None: 'esr_database.bin' inside the ESR directory.
+    :type database_file: str | pathlib.Path | None
+    :return: path of the written database file
+    :rtype: pathlib.Path
+    """
+    esr_directory = pathlib.Path(__file__).parent / const.ESR_OVER_FREQUENCY_DIRECTORY if esr_directory is None else pathlib.Path(esr_directory)
+    database_file = esr_directory / const.ESR_DATABASE_FILE if database_file is None else pathlib.Path(database_file)
+
+    esr_csv_filepath_list = sorted(esr_directory.glob("*.csv"))
+    index = np.zeros(len(esr_csv_filepath_list), dtype=_INDEX_DTYPE)
+    data_list = []
+    offset = 0
+    for count, esr_csv_filepath in enumerate(esr_csv_filepath_list):
+        limits = _read_esr_file(esr_csv_filepath)
+        data_list.append(np.array([limits.frequency, limits.esr, limits.current_capability]))
+        index[count] = (esr_csv_filepath.stem.encode("ascii"), offset, len(limits.frequency), os.stat(esr_csv_filepath).st_mtime_ns)
+        offset += len(limits.frequency)
+
+    header = np.array([(_DATABASE_MAGIC, _DATABASE_VERSION, len(index), offset)], dtype=_HEADER_DTYPE)
+    data = np.concatenate(data_list, axis=1) if data_list else np.empty((3, 0))
+
+    # write to a temporary file first, so readers never see a partly written database
+    temporary_file = database_file.with_name(database_file.name + ".tmp")
+    with open(temporary_file, "wb") as file:
+        header.tofile(file)
+        index.tofile(file)
+        data.astype("<f8").tofile(file)
+    os.replace(temporary_file, database_file)
+    logger.info(f"ESR database with {len(index)} curves written to {database_file}")
+    return database_file
+
+
+class EsrDatabase:
+    """
+    Read-only access to a binary ESR database written by build_esr_database().
+
+    The curves are memory-mapped, so all processes reading the same database share its memory.
+    """
+
+    def __init__(self, database_file: str | pathlib.Path) -> None:
+        """
+        Open the database file.
+
+        :param database_file: database file written by build_esr_database()
+        :type database_file: str | pathlib.Path
+        :raises ValueError: in case the file is no ESR database of a supported version
+        """
+        self.database_file = pathlib.Path(database_file)
+        header = np.fromfile(self.database_file, dtype=_HEADER_DTYPE, count=1)
+        if len(header) != 1 or header["magic"][0] != _DATABASE_MAGIC or header["version"][0] != _DATABASE_VERSION:
+            raise ValueError(f"{self.database_file} is no ESR database of version {_DATABASE_VERSION}.")
+
+        number_of_curves = int(header["number_of_curves"][0])
+        number_of_points = int(header["number_of_points"][0])
+        index = np.fromfile(self.database_file, dtype=_INDEX_DTYPE, count=number_of_curves, offset=_HEADER_DTYPE.itemsize)
+        self._index = {order_number.decode("ascii"): (int(offset), int(length), int(modification_time))
+                       for order_number, offset, length, modification_time in index}
+        self._data = np.memmap(self.database_file, dtype="<f8", mode="r", shape=(3, number_of_points),
+                               offset=_HEADER_DTYPE.itemsize + _INDEX_DTYPE.itemsize * number_of_curves) if number_of_points > 0 else np.empty((3, 0))
+
+    def __len__(self) -> int:
+        """
+        Get the number of curves.
+
+        :return: number of curves
+        :rtype: int
+        """
+        return len(self._index)
+
+    def get(self, order_number: str, modification_time: int | None = None) -> FrequencyDependentLimits | None:
+        """
+        Get the frequency-dependent ESR and current capability of a capacitor, as read-only views of the database.
+
+        :param order_number: normalized capacitor order number, see normalize_order_number()
+        :type order_number: str
+        :param modification_time: modification time in ns of the ESR file, None in case the ESR file is not available
+        :type modification_time: int | None
+        :return: frequency in Hz, ESR in Ohm and RMS current capability in A. None in case the capacitor is not in the database
+            or its ESR file changed after building the database.
+        :rtype: FrequencyDependentLimits | None
+        """
+        if order_number not in self._index:
+            return None
+        offset, length, database_modification_time = self._index[order_number]
+        if modification_time is not None and modification_time != database_modification_time:
+            return None
+        curves = self._data[:, offset:offset + length]
+        return FrequencyDependentLimits(frequency=curves[0], esr=curves[1], current_capability=curves[2])
+
+
+def main() -> None:
+    """Build the ESR database from the command line."""
+    parser = argparse.ArgumentParser(description="Compile the downloaded ESR files into a single binary ESR database.")
+    parser.add_argument("--esr-directory", default=None, help="directory of the ESR files, defaults to the 'esr_downloads' directory of pecst")
+    parser.add_argument("--database-file", default=None, help="database file to write, defaults to 'esr_database.bin' inside the ESR directory")
+    arguments = parser.parse_args()
+    print(build_esr_database(arguments.esr_directory, arguments.database_file))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,72 +1,360 @@
 """Download capacitor ESR files."""
 
 # python libraries
-import requests
+import datetime
+import hashlib
+import json
+import os
 import pathlib
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # 3rd party libraries
+import requests
+from requests.adapters import HTTPAdapter
 
 # own libraries
 import pecst.constants as const
+from pecst.cst_dataclasses import DownloadResult
+from pecst.esr_store import normalize_order_number
 from pecst.read_capacitor_database import load_dc_film_capacitors
 
 logger = logging.getLogger(__name__)
 
-def _download_file(url: str, save_path: str) -> None:
+# HTTP status codes worth a retry: rate limit and server errors
+_RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def _esr_download_url(ordering_code: str) -> str:
+    """
+    Generate the download URL of the ESR file.
+
+    :param ordering_code: normalized ordering code, see normalize_order_number()
+    :type ordering_code: str
+    :return: download URL
+    :rtype: str
+    """
+    # this is a URL specific replacement (not clear why needed, but figured out by studying the URL. Works fine.)
+    ordering_code_short = ordering_code.replace("000", "")
+    return (f"https://captools.tdk-electronics.tdk.com/CLARA/api/ApiWebCLARA/DownloadThermalRating?partNumber={ordering_code}"
+            f"&modelPartNumber={ordering_code_short}")
+
+
+def _file_hash(file_path: pathlib.Path) -> str:
+    """
+    Calculate the SHA-256 hash of a file.
+
+    :param file_path: file path
+    :type file_path: pathlib.Path
+    :return: hexadecimal SHA-256 hash
+    :rtype: str
+    """
+    with open(file_path, 'rb') as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def _is_file_valid(file_path: pathlib.Path, manifest_entry: dict | None) -> bool:
+    """
+    Check a local file against its manifest entry. Files without manifest entry are valid in case they exist.
+
+    :param file_path: file path
+    :type file_path: pathlib.Path
+    :param manifest_entry: manifest entry of the file or None
+    :type manifest_entry: dict | None
+    :return: True in case the file exists and matches size and hash of the manifest entry
+    :rtype: bool
+    """
+    if not file_path.is_file():
+        return False
+    if manifest_entry is None:
+        return True
+    return bool(file_path.stat().st_size == manifest_entry["size"] and _file_hash(file_path) == manifest_entry["sha256"])
+
+
+def _read_manifest(manifest_file: pathlib.Path) -> dict:
+    """
+    Read the download manifest.
+
+    :param manifest_file: manifest file path
+    :type manifest_file: pathlib.Path
+    :return: manifest entry for each file, key is the file path relative to the manifest directory
+    :rtype: dict
+    """
+    if not manifest_file.exists():
+        return {}
+    with open(manifest_file, encoding="utf-8") as file:
+        manifest: dict = json.load(file)["files"]
+    return manifest
+
+
+def _write_manifest(manifest_file: pathlib.Path, manifest: dict) -> None:
+    """
+    Write the download manifest atomically.
+
+    :param manifest_file: manifest file path
+    :type manifest_file: pathlib.Path
+    :param manifest: manifest entry for each file, key is the file path relative to the manifest directory
+    :type manifest: dict
+    """
+    temporary_file = manifest_file.with_name(manifest_file.name + ".tmp")
+    with open(temporary_file, "w", encoding="utf-8") as file:
+        json.dump({"version": 1, "files": dict(sorted(manifest.items()))}, file, indent=1)
+    os.replace(temporary_file, manifest_file)
+
+
+def _manifest_key(manifest_file: pathlib.Path, file_path: pathlib.Path) -> str:
+    """
+    Get the manifest key of a file.
+
+    :param manifest_file: manifest file path
+    :type manifest_file: pathlib.Path
+    :param file_path: file path
+    :type file_path: pathlib.Path
+    :return: file path relative to the manifest directory
+    :rtype: str
+    """
+    return pathlib.Path(os.path.relpath(file_path.absolute(), manifest_file.absolute().parent)).as_posix()
+
+
+def _create_session(number_of_workers: int) -> requests.Session:
+    """
+    Create a HTTP session with a connection pool for number_of_workers concurrent downloads.
+
+    :param number_of_workers: number of concurrent downloads
+    :type number_of_workers: int
+    :return: HTTP session
+    :rtype: requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=number_of_workers, pool_maxsize=number_of_workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _download_file(session: requests.Session, url: str, save_path: str, timeout: float, maximum_retries: int,
+                   backoff_factor: float, request_headers: dict | None = None) -> DownloadResult:
     """
     Download the capacitor csv file containing ESR over frequency.
 
+    Connection errors, timeouts, rate limits (429) and server errors (5xx) are retried with exponential backoff,
+    other status codes fail immediately. The file is written to a temporary file first and renamed afterward,
+    so save_path never contains a partially written file.
+
+    :param session: HTTP session
+    :type session: requests.Session
     :param url: download URL
     :type url: str
     :param save_path: path to save downloaded csv file
     :type save_path: str
+    :param timeout: connect and read timeout in seconds
+    :type timeout: float
+    :param maximum_retries: maximum number of retries after the first attempt
+    :type maximum_retries: int
+    :param backoff_factor: waiting time before the n-th retry is backoff_factor * 2 ** (n - 1) seconds
+    :type backoff_factor: float
+    :param request_headers: additional request headers, e.g. for conditional requests
+    :type request_headers: dict | None
+    :return: download result
+    :rtype: DownloadResult
     """
-    try:
-        # Send GET request to the URL
-        response = requests.get(url)
+    result = DownloadResult(url=url, save_path=save_path, status="failed")
+    for attempt in range(maximum_retries + 1):
+        if attempt > 0:
+            time.sleep(backoff_factor * 2 ** (attempt - 1))
+        result.attempts = attempt + 1
+        try:
+            response = session.get(url, timeout=timeout, headers=request_headers)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            result.status_code, result.error = None, str(e)
+            logger.debug(f"Attempt {attempt + 1} failed for {url}: {e}")
+            continue
+        except requests.RequestException as e:
+            result.status_code, result.error = None, str(e)
+            break
 
-        # Check if the request was successful (status code 200)
+        result.status_code = response.status_code
+        if response.status_code == 304:
+            result.status, result.error = "not_modified", None
+            logger.info(f"File not modified: {save_path}")
+            return result
         if response.status_code == 200:
-            # Write the content of the response to a local file
-            with open(save_path, 'wb') as file:
-                file.write(response.content)
+            temporary_file = save_path + ".tmp"
+            try:
+                # Write the content of the response to a temporary file and replace the local file afterward
+                with open(temporary_file, 'wb') as file:
+                    file.write(response.content)
+                os.replace(temporary_file, save_path)
+            except OSError as e:
+                pathlib.Path(temporary_file).unlink(missing_ok=True)
+                result.error = str(e)
+                break
+            result.status, result.error = "downloaded", None
+            result.manifest_entry = {"url": url, "size": len(response.content), "sha256": hashlib.sha256(response.content).hexdigest(),
+                                     "etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified"),
+                                     "fetched": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")}
             logger.info(f"File downloaded successfully: {save_path}")
+            return result
+        result.error = f"Status code: {response.status_code}"
+        if response.status_code not in _RETRY_STATUS_CODES:
+            break
+
+    logger.warning(f"Failed to download file ({url}) after {result.attempts} attempt(s). {result.error}")
+    return result
+
+
+def download_files(url_path_list: list[tuple[str, pathlib.Path]], number_of_workers: int = 8, timeout: float = 30.0,
+                   maximum_retries: int = 3, backoff_factor: float = 0.5, refresh: bool = False,
+                   manifest_file: str | pathlib.Path | None = None) -> list[DownloadResult]:
+    """
+    Download several files concurrently using a shared HTTP session.
+
+    With a manifest, size, SHA-256 hash, ETag, Last-Modified and fetch time of every downloaded file are recorded.
+    Local files not matching size and hash of their manifest entry (e.g. truncated or modified) are downloaded again.
+    A refresh uses conditional requests (If-None-Match, If-Modified-Since) for files with manifest entry, so only
+    changed files are transferred.
+
+    :param url_path_list: list of (download URL, path to save the file)
+    :type url_path_list: list[tuple[str, pathlib.Path]]
+    :param number_of_workers: maximum number of concurrent downloads. Defaults to 8.
+    :type number_of_workers: int
+    :param timeout: connect and read timeout in seconds. Defaults to 30 s.
+    :type timeout: float
+    :param maximum_retries: maximum number of retries of a failed download. Defaults to 3.
+    :type maximum_retries: int
+    :param backoff_factor: waiting time before the n-th retry is backoff_factor * 2 ** (n - 1) seconds. Defaults to 0.5.
+    :type backoff_factor: float
+    :param refresh: True to check existing files for updates on the server. Defaults to False: valid existing files are skipped.
+    :type refresh: bool
+    :param manifest_file: optional manifest file, created if not existing. Defaults to None: no manifest.
+    :type manifest_file: str | pathlib.Path | None
+    :return: download result for each file, in the order of url_path_list
+    :rtype: list[DownloadResult]
+    """
+    if number_of_workers < 1:
+        raise ValueError(f"number_of_workers must be at least 1, got {number_of_workers}.")
+    if maximum_retries < 0:
+        raise ValueError(f"maximum_retries must not be negative, got {maximum_retries}.")
+
+    manifest_path = None if manifest_file is None else pathlib.Path(manifest_file)
+    manifest = {} if manifest_path is None else _read_manifest(manifest_path)
+    manifest_key_list = [None if manifest_path is None else _manifest_key(manifest_path, pathlib.Path(save_path)) for _, save_path in url_path_list]
+
+    result_list: list[DownloadResult | None] = [None] * len(url_path_list)
+    request_header_dict: dict[int, dict | None] = {}
+    for index, ((url, save_path), manifest_key) in enumerate(zip(url_path_list, manifest_key_list, strict=True)):
+        manifest_entry = manifest.get(manifest_key) if manifest_key is not None else None
+        if manifest_entry is not None and manifest_entry["url"] != url:
+            manifest_entry = None
+        is_file_valid = _is_file_valid(pathlib.Path(save_path), manifest_entry)
+        if is_file_valid and not refresh:
+            logger.info(f"{save_path} already exists. Skip download.")
+            result_list[index] = DownloadResult(url=url, save_path=str(save_path), status="skipped")
+        elif is_file_valid and manifest_entry is not None:
+            request_headers = {}
+            if manifest_entry["etag"] is not None:
+                request_headers["If-None-Match"] = manifest_entry["etag"]
+            if manifest_entry["last_modified"] is not None:
+                request_headers["If-Modified-Since"] = manifest_entry["last_modified"]
+            request_header_dict[index] = request_headers
+        else:
+            request_header_dict[index] = None
+
+    if request_header_dict:
+        with _create_session(number_of_workers) as session, ThreadPoolExecutor(max_workers=number_of_workers) as executor:
+            future_dict = {index: executor.submit(_download_file, session, url_path_list[index][0], str(url_path_list[index][1]), timeout,
+                                                  maximum_retries, backoff_factor, request_headers)
+                           for index, request_headers in request_header_dict.items()}
+            for index, future in future_dict.items():
+                result_list[index] = future.result()
+
+    checked_result_list = [result for result in result_list if result is not None]
+    if manifest_path is not None:
+        for result, manifest_key in zip(checked_result_list, manifest_key_list, strict=True):
+            if result.manifest_entry is not None:
+                manifest[manifest_key] = result.manifest_entry
+        _write_manifest(manifest_path, manifest)
+
+    return checked_result_list
+
+
+def verify_files(manifest_file: str | pathlib.Path) -> dict[str, str]:
+    """
+    Verify the local files against the manifest by their size and SHA-256 hash, without network access.
+
+    :param manifest_file: manifest file, see download_files()
+    :type manifest_file: str | pathlib.Path
+    :return: 'ok', 'modified' or 'missing' for each file of the manifest, key is the file path relative to the manifest directory
+    :rtype: dict[str, str]
+    """
+    manifest_path = pathlib.Path(manifest_file)
+    verification_dict = {}
+    for manifest_key, manifest_entry in _read_manifest(manifest_path).items():
+        file_path = manifest_path.parent / manifest_key
+        if not file_path.is_file():
+            verification_dict[manifest_key] = "missing"
         else:
-            logger.warning(f"Failed to download file ({url}). Status code: {response.status_code}")
-    except Exception as e:
-        logger.error(f"Error {e} while downloading capacitor url:{url}")
+            verification_dict[manifest_key] = "ok" if _is_file_valid(file_path, manifest_entry) else "modified"
+    return verification_dict
 
 
-def download_esr_csv_files(capacitor_series_name_list: list[str] = const.FOIL_CAPACITOR_SERIES_NAME_LIST) -> None:
+def verify_esr_files() -> dict[str, str]:
+    """
+    Verify the downloaded ESR files against the download manifest, without network access.
+
+    :return: 'ok', 'modified' or 'missing' for each ESR file of the manifest
+    :rtype: dict[str, str]
+    """
+    verification_dict = verify_files((pathlib.Path(__file__).parent).joinpath(const.ESR_OVER_FREQUENCY_DIRECTORY, const.ESR_MANIFEST_FILE))
+    for file_name, verification in verification_dict.items():
+        if verification != "ok":
+            logger.warning(f"ESR file {file_name} is {verification}.")
+    return verification_dict
+
+
+def download_esr_csv_files(capacitor_series_name_list: list[str] = const.FOIL_CAPACITOR_SERIES_NAME_LIST, number_of_workers: int = 8,
+                           timeout: float = 30.0, maximum_retries: int = 3, backoff_factor: float = 0.5,
+                           refresh: bool = False) -> list[DownloadResult]:
     """
     Download ESR over frequency data from the manufacturers homepage.
 
+    Files are downloaded concurrently. Failed downloads are reported, but do not stop the other downloads.
+    Every download is recorded in the manifest 'esr_manifest.json' of the ESR directory, see download_files():
+    existing files are skipped unless they do not match the manifest. With refresh, only files changed on the
+    server are downloaded again.
+
     :param capacitor_series_name_list: list of capacitor series names to download
     :type capacitor_series_name_list: list[str]
+    :param number_of_workers: maximum number of concurrent downloads. Defaults to 8.
+    :type number_of_workers: int
+    :param timeout: connect and read timeout in seconds. Defaults to 30 s.
+    :type timeout: float
+    :param maximum_retries: maximum number of retries of a failed download. Defaults to 3.
+    :type maximum_retries: int
+    :param backoff_factor: waiting time before the n-th retry is backoff_factor * 2 ** (n - 1) seconds. Defaults to 0.5.
+    :type backoff_factor: float
+    :param refresh: True to check existing files for updates on the server. Defaults to False.
+    :type refresh: bool
+    :return: download result for each ESR file
+    :rtype: list[DownloadResult]
     """
+    esr_folder_name = (pathlib.Path(__file__).parent).joinpath(const.ESR_OVER_FREQUENCY_DIRECTORY)
+    if not esr_folder_name.exists():
+        pathlib.Path.mkdir(esr_folder_name)
+
+    url_path_list = []
     for capacitor_series_name in capacitor_series_name_list:
-        c_db, c_thermal, c_derating, _, _ = load_dc_film_capacitors(capacitor_series_name)
-
-        esr_folder_name = (pathlib.Path(__file__).parent).joinpath(const.ESR_OVER_FREQUENCY_DIRECTORY)
-        if not esr_folder_name.exists():
-            pathlib.Path.mkdir(esr_folder_name)
-
-        # capacitor pareto plane calculation
-        for ordering_code in c_db['ordering code']:
-            # modify ordering code for url
-            # ESR graphs are the same for 5 % ("J") and 10 % ("K") tolerance. So 10 % is used, as in 5 %, not all capacitors are available
-            ordering_code = ordering_code.replace("+", "K")
-            # replace * by nothing, as this is for an optional 2-pin version only
-            ordering_code = ordering_code.replace("*", "")
-            # this is a URL specific replacement (not clear why needed, but figured out by studying the URL. Works fine.)
-            ordering_code_short = ordering_code.replace("000", "")
-
-            # generate csv file path
-            save_path = (pathlib.Path(__file__).parent).joinpath(const.ESR_OVER_FREQUENCY_DIRECTORY, f"{ordering_code}.csv")
-            if save_path.exists():
-                logger.info(f"{save_path} already exists. Skip download.")
-            else:
-                url = (f"https://captools.tdk-electronics.tdk.com/CLARA/api/ApiWebCLARA/DownloadThermalRating?partNumber={ordering_code}"
-                       f"&modelPartNumber={ordering_code_short}")
-                _download_file(url, str(save_path))
+        c_db, _, _, _, _ = load_dc_film_capacitors(capacitor_series_name)
+
+        # ESR graphs are the same for 5 % ("J") and 10 % ("K") tolerance. So 10 % is used, as in 5 %, not all capacitors are available
+        for ordering_code in dict.fromkeys(normalize_order_number(ordering_code) for ordering_code in c_db['ordering code']):
+            url_path_list.append((_esr_download_url(ordering_code), esr_folder_name.joinpath(f"{ordering_code}.csv")))
+
+    result_list = download_files(url_path_list, number_of_workers, timeout, maximum_retries, backoff_factor, refresh,
+                                 esr_folder_name.joinpath(const.ESR_MANIFEST_FILE))
+
+    status_count = {status: sum(result.status == status for result in result_list) for status in ["downloaded", "not_modified", "skipped", "failed"]}
+    logger.info(f"ESR files: {status_count['downloaded']} downloaded, {status_count['not_modified']} not modified, "
+                f"{status_count['skipped']} skipped, {status_count['failed']} failed.")
+    return result_list
@@ -0,0 +1,174 @@
+"""Process-wide store of the frequency-dependent ESR and current capability curves."""
+
+# python libraries
+import logging
+import os
+import pathlib
+
+# 3rd party libraries
+import numpy as np
+
+# own libraries
+from pecst.cst_dataclasses import FrequencyDependentLimits
+from pecst.esr_database import EsrDatabase, _read_esr_file
+import pecst.constants as const
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_order_number(order_number: str) -> str:
+    """
+    Normalize an ordering code of the capacitor database to the name of its ESR file.
+
+    :param order_number: capacitor order number, e.g. 'B32774D4106+000'
+    :type order_number: str
+    :return: normalized order number, e.g. 'B32774D4106K000'
+    :rtype: str
+    """
+    return order_number.replace("+", "K").replace("*", "")
+
+
+class EsrStore:
+    """
+    Keep the ESR files as NumPy arrays in memory, so every file is parsed only once per process.
+
+    The least recently used curves are dropped in case more than maximum_size files are kept. A file is read again
+    in case its modification time changed, e.g. after downloading new ESR files.
+
+    In case a binary ESR database (see build_esr_database()) exists, the curves are taken from the memory-mapped database
+    instead of parsing the ESR files, as long as the ESR file did not change after building the database.
+
+    :Minimal Example:
+
+    >>> import pecst
+    >>> limits = pecst.get_esr_store().get("B32774D4106+000")
+    >>> limits.frequency, limits.esr, limits.current_capability
+    """
+
+    def __init__(self, directory: str | pathlib.Path | None = None, maximum_size: int = 1024,
+                 database_file: str | pathlib.Path | None = None) -> None:
+        """
+        Create an empty ESR store.
+
+        :param directory: directory of the ESR files. Defaults to None: the 'esr_downloads' directory of the package.
+        :type directory: str | pathlib.Path | None
+        :param maximum_size: maximum number of kept ESR files
+        :type maximum_size: int
+        :param database_file: binary ESR database, used if existing. Defaults to None: 'esr_database.bin' inside the ESR directory.
+        :type database_file: str | pathlib.Path | None
+        """
+        self.directory = pathlib.Path(__file__).parent / const.ESR_OVER_FREQUENCY_DIRECTORY if directory is None else pathlib.Path(directory)
+        self.maximum_size = maximum_size
+        self.database_file = self.directory / const.ESR_DATABASE_FILE if database_file is None else pathlib.Path(database_file)
+        self._memory: dict[str, tuple[int | None, FrequencyDependentLimits]] = {}
+        self._database: EsrDatabase | None = None
+        self._database_modification_time: int | None = None
+
+    def __len__(self) -> int:
+        """
+        Get the number of kept ESR files.
+
+        :return: number of kept ESR files
+        :rtype: int
+        """
+        return len(self._memory)
+
+    def __contains__(self, order_number: str) -> bool:
+        """
+        Check if the ESR file of a capacitor is kept.
+
+        :param order_number: capacitor order number
+        :type order_number: str
+        :return: True in case the ESR file is kept
+        :rtype: bool
+        """
+        return normalize_order_number(order_number) in self._memory
+
+    def clear(self) -> None:
+        """Drop all kept ESR files and close the ESR database."""
+        self._memory = {}
+        self._database = None
+        self._database_modification_time = None
+
+    def _get_database(self) -> EsrDatabase | None:
+        """
+        Get the ESR database, opened again in case the database file changed.
+
+        :return: ESR database, None in case no database file exists
+        :rtype: EsrDatabase | None
+        """
+        try:
+            modification_time = os.stat(self.database_file).st_mtime_ns
+        except FileNotFoundError:
+            self._database, self._database_modification_time = None, None
+            return None
+        if modification_time != self._database_modification_time:
+            self._database, self._database_modification_time = EsrDatabase(self.database_file), modification_time
+        return self._database
+
+    def get(self, order_number: str) -> FrequencyDependentLimits:
+        """
+        Get the frequency-dependent ESR and current capability of a capacitor.
+
+        :param order_number: capacitor order number
+        :type order_number: str
+        :return: frequency in Hz, ESR in Ohm and RMS current capability in A
+        :rtype: FrequencyDependentLimits
+        :raises FileNotFoundError: in case neither the ESR file nor the ESR database contains the capacitor
+        """
+        order_number = normalize_order_number(order_number)
+        esr_csv_filepath = self.directory / f"{order_number}.csv"
+        try:
+            modification_time: int | None = os.stat(esr_csv_filepath).st_mtime_ns
+        except FileNotFoundError:
+            modification_time = None
+
+        memory_entry = self._memory.pop(order_number, None)
+        if memory_entry is None or memory_entry[0] != modification_time:
+            database = self._get_database()
+            limits = None if database is None else database.get(order_number, modification_time)
+            if limits is None:
+                if modification_time is None:
+                    raise FileNotFoundError(f"No ESR file and no ESR database entry found for {order_number} in {self.directory}.")
+                limits = _read_esr_file(esr_csv_filepath)
+            memory_entry = (modification_time, limits)
+            if len(self._memory) >= self.maximum_size:
+                # drop the least recently used ESR file, the first one in insertion order
+                del self._memory[next(iter(self._memory))]
+        self._memory[order_number] = memory_entry
+        return memory_entry[1]
+
+    def at_frequencies(self, order_number_list: list[str], frequency_list: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolate the ESR and current capability of many capacitors at the given frequencies.
+
+        :param order_number_list: capacitor order numbers
+        :type order_number_list: list[str]
+        :param frequency_list: frequency in Hertz in a list
+        :type frequency_list: np.ndarray
+        :return: ESR in Ohm and RMS current capability in A, both of shape (number of capacitors, number of frequencies)
+        :rtype: tuple[np.ndarray, np.ndarray]
+        """
+        esr_matrix = np.empty((len(order_number_list), len(frequency_list)))
+        current_capability_matrix = np.empty((len(order_number_list), len(frequency_list)))
+
+        for count_capacitor, order_number in enumerate(order_number_list):
+            limits = self.get(order_number)
+            esr_matrix[count_capacitor] = np.interp(frequency_list, limits.frequency, limits.esr)
+            current_capability_matrix[count_capacitor] = np.interp(frequency_list, limits.frequency, limits.current_capability)
+
+        return esr_matrix, current_capability_matrix
+
+
+# ESR store shared by all calculations of this process
+_esr_store = EsrStore()
+
+
+def get_esr_store() -> EsrStore:
+    """
+    Get the ESR store shared by all calculations of this process.
+
+    :return: process-wide ESR store
+    :rtype: EsrStore
+    """
+    return _esr_store
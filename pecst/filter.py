@@ -1,14 +1,159 @@
 """Capacitor Pareto front filtering."""
 
+# python libraries
+import bisect
+import warnings
+
 # 3rd party libraries
 import pandas as pd
 import numpy as np
 
-# Faster than is_pareto_efficient_simple, but less readable.
+# own libraries
+from pecst.result_sink import ResultSink
+
+# below this number of designs, the Kung front is calculated by comparing all designs of the block
+_KUNG_BLOCK_SIZE = 128
+# maximum number of design comparisons per vectorized dominance check, to limit the memory
+_DOMINANCE_CHUNK_SIZE = 2 ** 22
+# number of designs with the lowest normalized cost sum, whose front sorts out dominated designs before the front calculation
+_PREFILTER_SIZE = 256
+# the prefilter stops, if a front design sorts out less than this fraction of the remaining designs
+_PREFILTER_MINIMUM_FRACTION = 0.05
+
+def _lexicographic_order(costs: np.ndarray) -> np.ndarray:
+    """
+    Sort the designs lexicographically by their costs, equal designs in the order of their index.
+
+    In this order, a design is never dominated by a later design, and of equal designs the first one comes first.
+
+    :param costs: An (n_points, n_costs) array without NaN
+    :type costs: np.ndarray
+    :return: order of the designs
+    :rtype: np.ndarray
+    """
+    # np.lexsort() is stable and uses the last key as primary key
+    order: np.ndarray = np.lexsort(tuple(costs[:, ::-1].T))
+    return order
+
+def _pareto_sweep(costs: np.ndarray) -> np.ndarray:
+    """
+    Find the pareto-efficient points for up to two costs by sort and sweep in O(n log n).
+
+    After sorting by the first cost, a design is efficient if its second cost is lower than the second cost of all designs before.
+
+    :param costs: An (n_points, 1) or (n_points, 2) array without NaN
+    :type costs: np.ndarray
+    :return: True for each pareto-efficient point
+    :rtype: np.ndarray
+    """
+    order = _lexicographic_order(costs)
+    last_cost = costs[order, -1]
+    previous_minimum = np.minimum.accumulate(np.concatenate([[np.inf], last_cost[:-1]]))
+    is_efficient = np.zeros(len(costs), dtype=bool)
+    is_efficient[order] = last_cost < previous_minimum
+    if len(costs) > 0:
+        # the first design is efficient, also for an infinite cost
+        is_efficient[order[0]] = True
+    return is_efficient
+
+def _is_covered(front_costs: np.ndarray, costs: np.ndarray) -> np.ndarray:
+    """
+    Check the designs to be dominated by or equal to any design of the front.
+
+    :param front_costs: An (n_front_points, n_costs) array
+    :type front_costs: np.ndarray
+    :param costs: An (n_points, n_costs) array
+    :type costs: np.ndarray
+    :return: True for each covered point
+    :rtype: np.ndarray
+    """
+    is_covered = np.zeros(len(costs), dtype=bool)
+    chunk_size = max(_DOMINANCE_CHUNK_SIZE // max(len(front_costs) * costs.shape[1], 1), 1)
+    for chunk_start in range(0, len(costs), chunk_size):
+        chunk = slice(chunk_start, chunk_start + chunk_size)
+        is_covered[chunk] = np.any(np.all(front_costs[:, np.newaxis, :] <= costs[np.newaxis, chunk, :], axis=2), axis=0)
+    return is_covered
+
+def _kung_front(sorted_costs: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """
+    Find the pareto-efficient points of lexicographically sorted costs by Kung's divide and conquer.
+
+    The front of the first half is calculated recursively. The front of the second half only keeps the designs not covered
+    by the front of the first half, as no design is dominated by a later design.
+
+    :param sorted_costs: An (n_points, n_costs) array sorted by _lexicographic_order()
+    :type sorted_costs: np.ndarray
+    :param start: first position
+    :type start: int
+    :param stop: position after the last position
+    :type stop: int
+    :return: positions of the pareto-efficient points in ascending order
+    :rtype: np.ndarray
+    """
+    if stop - start <= _KUNG_BLOCK_SIZE:
+        block_costs = sorted_costs[start:stop]
+        # design i covers design j for i < j
+        is_covered = np.triu(np.all(block_costs[:, np.newaxis, :] <= block_costs[np.newaxis, :, :], axis=2), k=1)
+        return start + np.nonzero(~np.any(is_covered, axis=0))[0]
+
+    middle = (start + stop) // 2
+    front_first = _kung_front(sorted_costs, start, middle)
+    front_second = _kung_front(sorted_costs, middle, stop)
+    return np.concatenate([front_first, front_second[~_is_covered(sorted_costs[front_first], sorted_costs[front_second])]])
+
+def _dominance_prefilter(costs: np.ndarray) -> np.ndarray:
+    """
+    Sort out designs dominated by the front of the designs with the lowest normalized cost sum.
+
+    These designs are likely to dominate many others, so typically only a small part of the designs remains for the front
+    calculation. The front designs are checked one after another in the order of their cost sum, each only against the not
+    yet sorted out designs, column by column. The check stops as soon as a front design sorts out less than
+    _PREFILTER_MINIMUM_FRACTION of the remaining designs, e.g. if most designs are efficient. Only dominated designs are
+    sorted out, equal designs are kept, so the front does not depend on the prefilter.
+
+    :param costs: An (n_points, n_costs) array without NaN
+    :type costs: np.ndarray
+    :return: True for each point not sorted out
+    :rtype: np.ndarray
+    """
+    finite_costs = np.where(np.isfinite(costs), costs, np.nan)
+    with warnings.catch_warnings():
+        # objectives without finite values
+        warnings.simplefilter("ignore", RuntimeWarning)
+        cost_min, cost_max = np.nanmin(finite_costs, axis=0), np.nanmax(finite_costs, axis=0)
+    cost_min, cost_max = np.nan_to_num(cost_min), np.nan_to_num(cost_max)
+    normalized_sum = np.sum((np.clip(costs, cost_min, cost_max) - cost_min) / np.where(cost_max > cost_min, cost_max - cost_min, 1), axis=1)
+
+    candidate_index = np.argpartition(normalized_sum, _PREFILTER_SIZE)[:_PREFILTER_SIZE]
+    candidate_index = candidate_index[np.argsort(normalized_sum[candidate_index], kind="stable")]
+    front_index = candidate_index[_is_pareto_efficient(costs[candidate_index])]
+
+    remaining_index = np.arange(len(costs))
+    remaining_costs = np.ascontiguousarray(costs.T)
+    for front_point in costs[front_index]:
+        is_dominated = np.ones(len(remaining_index), dtype=bool)
+        for front_cost, cost in zip(front_point, remaining_costs, strict=True):
+            is_dominated &= front_cost <= cost
+        dominated_position = np.nonzero(is_dominated)[0]
+        is_dominated[dominated_position[np.all(remaining_costs[:, dominated_position] == front_point[:, np.newaxis], axis=0)]] = False
+        number_dominated = np.count_nonzero(is_dominated)
+        remaining_index = remaining_index[~is_dominated]
+        remaining_costs = remaining_costs[:, ~is_dominated]
+        if number_dominated < _PREFILTER_MINIMUM_FRACTION * (len(remaining_index) + number_dominated):
+            break
+
+    is_remaining = np.zeros(len(costs), dtype=bool)
+    is_remaining[remaining_index] = True
+    return is_remaining
+
 def _is_pareto_efficient(costs: np.ndarray, return_mask: bool = True) -> np.ndarray:
     """
     Find the pareto-efficient points.
 
+    Up to two costs, the front is a sort and sweep in O(n log n), for more costs Kung's divide and conquer. For many designs,
+    the designs dominated by a few good designs are sorted out first, see _dominance_prefilter(). Of designs with equal costs,
+    only the first one is efficient. Designs with NaN costs can not be compared and are never efficient.
+
     :param costs: An (n_points, n_costs) array
     :type costs: np.array
     :param return_mask: True to return a mask
@@ -18,21 +163,112 @@ def _is_pareto_efficient(costs: np.ndarray, return_mask: bool = True) -> np.ndar
         Otherwise it will be a (n_efficient_points, ) integer array of indices.
     :rtype: np.array
     """
-    is_efficient = np.arange(costs.shape[0])
-    n_points = costs.shape[0]
-    next_point_index = 0  # Next index in the is_efficient array to search for
-    while next_point_index < len(costs):
-        nondominated_point_mask: np.ndarray = np.array(np.any(costs < costs[next_point_index], axis=1))
-        nondominated_point_mask[next_point_index] = True
-        is_efficient = is_efficient[nondominated_point_mask]  # Remove dominated points
-        costs = costs[nondominated_point_mask]
-        next_point_index = np.sum(nondominated_point_mask[:next_point_index]) + 1
+    costs = np.asarray(costs, dtype=float)
+    is_complete = ~np.any(np.isnan(costs), axis=1)
+    complete_index = np.nonzero(is_complete)[0]
+    complete_costs = costs[complete_index]
+
+    if len(complete_index) > 4 * _PREFILTER_SIZE:
+        is_remaining = _dominance_prefilter(complete_costs)
+        complete_index, complete_costs = complete_index[is_remaining], complete_costs[is_remaining]
+
+    is_efficient_mask = np.zeros(len(costs), dtype=bool)
+    if costs.shape[1] <= 2:
+        is_efficient_mask[complete_index] = _pareto_sweep(complete_costs)
+    else:
+        order = _lexicographic_order(complete_costs)
+        is_efficient_mask[complete_index[order[_kung_front(complete_costs[order], 0, len(order))]]] = True
+
     if return_mask:
-        is_efficient_mask = np.zeros(n_points, dtype=bool)
-        is_efficient_mask[is_efficient] = True
         return is_efficient_mask
     else:
-        return is_efficient
+        return np.nonzero(is_efficient_mask)[0]
+
+def _non_dominated_ranks(costs: np.ndarray, number_of_ranks: int | None = None) -> np.ndarray:
+    """
+    Sort the points into non-dominated fronts (ranks).
+
+    Rank 0 is the Pareto front, rank 1 the Pareto front without rank 0, and so on. Up to two costs, all ranks are found in a
+    single sweep in O(n log n): a design gets the lowest rank with no design covering it so far. For more costs, the fronts
+    are peeled off one after another.
+
+    :param costs: An (n_points, n_costs) array
+    :type costs: np.ndarray
+    :param number_of_ranks: number of ranks to calculate. Defaults to None: all ranks.
+    :type number_of_ranks: int | None
+    :return: rank of each point, -1 for points with NaN costs and points beyond number_of_ranks
+    :rtype: np.ndarray
+    """
+    costs = np.asarray(costs, dtype=float)
+    rank = np.full(len(costs), -1, dtype=int)
+    complete_index = np.nonzero(~np.any(np.isnan(costs), axis=1))[0]
+    number_of_ranks = len(complete_index) if number_of_ranks is None else number_of_ranks
+
+    if costs.shape[1] <= 2:
+        order = _lexicographic_order(costs[complete_index])
+        # lowest last cost of each rank so far, in ascending order of the ranks (and the costs)
+        rank_minimum: list[float] = []
+        for position, last_cost in zip(order.tolist(), costs[complete_index[order], -1].tolist(), strict=True):
+            design_rank = bisect.bisect_right(rank_minimum, last_cost)
+            if design_rank == len(rank_minimum):
+                rank_minimum.append(last_cost)
+            else:
+                rank_minimum[design_rank] = last_cost
+            rank[complete_index[position]] = design_rank
+        rank[rank >= number_of_ranks] = -1
+        return rank
+
+    remaining_index = complete_index
+    for count_rank in range(number_of_ranks):
+        if len(remaining_index) == 0:
+            break
+        is_efficient = _is_pareto_efficient(costs[remaining_index])
+        rank[remaining_index[is_efficient]] = count_rank
+        remaining_index = remaining_index[~is_efficient]
+    return rank
+
+def pareto_front(df: pd.DataFrame, objectives: tuple[str, ...] = ("volume_total", "power_loss_total")) -> pd.DataFrame:
+    """
+    Get the Pareto front of designs for any number of objectives to minimize, e.g. volume, loss, cost and area together.
+
+    Designs with missing objective values can not be compared and are not part of the front. Of designs with equal objective
+    values, only the first one is kept.
+
+    :Minimal Example:
+
+    >>> import pecst
+    >>> results_df = pecst.select_capacitors_batch(c_requirements_list)
+    >>> front_df = pecst.pareto_front(results_df, objectives=("volume_total", "power_loss_total", "cost", "area_total"))
+
+    :param df: designs, e.g. a result data frame of select_capacitors() or select_capacitors_batch()
+    :type df: pd.DataFrame
+    :param objectives: column names of the objectives to minimize
+    :type objectives: tuple[str, ...]
+    :return: pareto-efficient designs in their original order
+    :rtype: pd.DataFrame
+    """
+    return df[_is_pareto_efficient(df[list(objectives)].to_numpy(dtype=float))]
+
+def non_dominated_sorting(df: pd.DataFrame, objectives: tuple[str, ...] = ("volume_total", "power_loss_total"), number_of_ranks: int | None = None,
+                          rank_column: str = "pareto_rank") -> pd.DataFrame:
+    """
+    Sort designs into non-dominated fronts: rank 0 is the Pareto front, rank 1 the front of the remaining designs, and so on.
+
+    Designs with missing objective values are dropped, see pareto_front().
+
+    :param df: designs, e.g. a result data frame of select_capacitors() or select_capacitors_batch()
+    :type df: pd.DataFrame
+    :param objectives: column names of the objectives to minimize
+    :type objectives: tuple[str, ...]
+    :param number_of_ranks: number of fronts to keep. Defaults to None: all designs.
+    :type number_of_ranks: int | None
+    :param rank_column: column name for the rank of each design
+    :type rank_column: str
+    :return: designs of the first number_of_ranks fronts in their original order, including the rank column
+    :rtype: pd.DataFrame
+    """
+    rank = _non_dominated_ranks(df[list(objectives)].to_numpy(dtype=float), number_of_ranks)
+    return df[rank >= 0].assign(**{rank_column: rank[rank >= 0]})
 
 def _pareto_front_from_df(df: pd.DataFrame, x: str, y: str) -> pd.DataFrame:
     """
@@ -40,15 +276,14 @@ def _pareto_front_from_df(df: pd.DataFrame, x: str, y: str) -> pd.DataFrame:
 
     :param df: Pandas dataframe
     :type df: pd.DataFrame
+    :param x: x-value name
+    :type x: str
+    :param y: y-value name
+    :type y: str
     :return: Pandas dataframe with pareto efficient points
     :rtype: pd.DataFrame
     """
-    x_vec = df[x][~pd.isnull(df[x])]
-    y_vec = df[y][~pd.isnull(df[x])]
-    numpy_zip = np.column_stack((x_vec, y_vec))
-    pareto_tuple_mask_vec = _is_pareto_efficient(numpy_zip)
-    pareto_df = df[~pd.isnull(df[x])][pareto_tuple_mask_vec]
-    return pareto_df
+    return pareto_front(df, objectives=(x, y))
 
 def filter_df(df: pd.DataFrame, x: str = "volume_total", y: str = "power_loss_total", factor_min_dc_losses: float = 0.5,
               factor_max_dc_losses: float = 1000) -> pd.DataFrame:
@@ -90,3 +325,142 @@ def filter_df(df: pd.DataFrame, x: str = "volume_total", y: str = "power_loss_to
     pareto_df_offset: pd.DataFrame = df[df[y] < ref_loss_max]
 
     return pareto_df_offset
+
+class ParetoArchive(ResultSink):
+    """
+    Incremental Pareto front of capacitor designs.
+
+    Batches of designs, e.g. per capacitor series, per requirement chunk or per worker, are added one after another. Only the
+    non-dominated designs are kept, so the memory is bounded by the size of the front. Designs with equal objective values
+    keep the design added first. The front is identical to pareto_front() of all batches concatenated.
+
+    The archive is a result sink, so it can be given as result_sink to the selection functions.
+
+    :Minimal Example:
+
+    >>> import pecst
+    >>> archive = pecst.ParetoArchive()
+    >>> pecst.select_capacitors(c_requirements, result_sink=archive)
+    >>> archive.front  # Pareto front over all capacitor series, 'batch' column contains the series name
+    >>> archive.changed_batches  # series contributing to the front
+    """
+
+    def __init__(self, objectives: tuple[str, ...] = ("volume_total", "power_loss_total"), batch_column: str = "batch") -> None:
+        """
+        Create an empty archive.
+
+        :param objectives: column names of the objectives to minimize
+        :type objectives: tuple[str, ...]
+        :param batch_column: column name for the batch label of each design in the front
+        :type batch_column: str
+        """
+        self.objectives = list(objectives)
+        self.batch_column = batch_column
+        self.changed_batches: list = []
+        self._front_df: pd.DataFrame | None = None
+        self._costs = np.empty((0, len(self.objectives)))
+        self._number_of_batches = 0
+
+    @property
+    def front(self) -> pd.DataFrame:
+        """
+        Get the current Pareto front.
+
+        :return: non-dominated designs in the order they were added, including the batch label column
+        :rtype: pd.DataFrame
+        """
+        if self._front_df is None:
+            return pd.DataFrame(columns=self.objectives + [self.batch_column])
+        return self._front_df.copy()
+
+    def __len__(self) -> int:
+        """
+        Get the number of designs in the front.
+
+        :return: number of designs in the front
+        :rtype: int
+        """
+        return len(self._costs)
+
+    def _add(self, result_df: pd.DataFrame) -> int:
+        """
+        Add designs including the batch label column.
+
+        :param result_df: designs including the batch label column
+        :type result_df: pd.DataFrame
+        :return: number of added designs entering the front
+        :rtype: int
+        """
+        # empty results, e.g. of capacitor series without any design, may miss the objective columns
+        if len(result_df) == 0:
+            return 0
+        costs = result_df[self.objectives].to_numpy(dtype=float)
+        # designs with missing objective values can not be compared
+        is_complete = ~np.any(np.isnan(costs), axis=1)
+        result_df, costs = result_df[is_complete], costs[is_complete]
+
+        # reduce the batch to its own front first, so only few designs are compared to the archive
+        is_efficient = _is_pareto_efficient(costs)
+        result_df, costs = result_df[is_efficient], costs[is_efficient]
+
+        # designs dominated by or equal to an archived design are dropped, archived designs win ties
+        is_new = ~np.any(np.all(self._costs[:, np.newaxis, :] <= costs[np.newaxis, :, :], axis=2), axis=0)
+        result_df, costs = result_df[is_new], costs[is_new]
+        if len(costs) == 0:
+            return 0
+
+        # archived designs dominated by a new design are removed
+        is_weakly_dominated = np.all(costs[np.newaxis, :, :] <= self._costs[:, np.newaxis, :], axis=2)
+        is_better = np.any(costs[np.newaxis, :, :] < self._costs[:, np.newaxis, :], axis=2)
+        is_dominated = np.any(is_weakly_dominated & is_better, axis=1)
+        if self._front_df is None:
+            self._front_df = result_df.copy()
+        else:
+            self._front_df = pd.concat([self._front_df[~is_dominated], result_df])
+        self._costs = np.concatenate([self._costs[~is_dominated], costs])
+
+        for batch in result_df[self.batch_column]:
+            if batch not in self.changed_batches:
+                self.changed_batches.append(batch)
+        return len(costs)
+
+    def add(self, result_df: pd.DataFrame, batch: object = None) -> int:
+        """
+        Add a batch of designs.
+
+        :param result_df: designs, e.g. a result data frame of select_capacitors() or select_capacitors_batch()
+        :type result_df: pd.DataFrame
+        :param batch: label of the batch. Defaults to None: number of the batch, counting from 0.
+        :type batch: object
+        :return: number of designs of the batch entering the front, 0 in case the front did not change
+        :rtype: int
+        """
+        batch = self._number_of_batches if batch is None else batch
+        self._number_of_batches += 1
+        return self._add(result_df.assign(**{self.batch_column: [batch] * len(result_df)}))
+
+    def write(self, name: str, result_df: pd.DataFrame) -> None:
+        """
+        Add a batch of designs, labeled with the result name, e.g. the capacitor series name.
+
+        :param name: result name, used as batch label
+        :type name: str
+        :param result_df: designs
+        :type result_df: pd.DataFrame
+        """
+        self.add(result_df, batch=name)
+
+    def merge(self, other: "ParetoArchive") -> int:
+        """
+        Merge the front of another archive, e.g. of a different worker. The batch labels of the other archive are kept.
+
+        :param other: other archive with the same objectives
+        :type other: ParetoArchive
+        :return: number of designs of the other archive entering the front
+        :rtype: int
+        """
+        if other.objectives != self.objectives or other.batch_column != self.batch_column:
+            raise ValueError("Only archives with the same objectives and batch column can be merged.")
+        if other._front_df is None:
+            return 0
+        return self._add(other._front_df)
@@ -5,19 +5,59 @@ import logging
 
 # 3rd party libraries
 import numpy as np
-from matplotlib import pyplot as plt
+
+# own libraries
+from pecst.cst_dataclasses import HarmonicTable
 
 logger = logging.getLogger(__name__)
 
+def _piecewise_linear_spectrum(t: np.ndarray, i: np.ndarray, number_of_harmonics: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate the exact single-sided spectrum of a periodic piecewise-linear signal from its breakpoints.
+
+    Each linear segment is integrated in closed form, vectorized over harmonics and segments. Equal consecutive time
+    values describe a step of the signal.
+
+    :param t: time vector of the breakpoints, one period starting at 0
+    :type t: np.ndarray
+    :param i: signal values at the breakpoints
+    :type i: np.ndarray
+    :param number_of_harmonics: highest harmonic number to calculate
+    :type number_of_harmonics: int
+    :return: frequencies, amplitudes and phases in rad for the DC component and the harmonics 1 ... number_of_harmonics
+    :rtype: tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    period = t[-1]
+    segment_length = np.diff(t)
+    is_segment = segment_length > 0
+    t_start, t_end, segment_length = t[:-1][is_segment], t[1:][is_segment], segment_length[is_segment]
+    i_start, i_end = i[:-1][is_segment], i[1:][is_segment]
+    slope = (i_end - i_start) / segment_length
+
+    # segment integral of i(t) * exp(-j omega t), integrated by parts twice
+    omega = 2 * np.pi / period * np.arange(1, number_of_harmonics + 1)[:, np.newaxis]
+    exp_start = np.exp(-1j * omega * t_start)
+    exp_end = np.exp(-1j * omega * t_end)
+    segment_integral = (i_start * exp_start - i_end * exp_end) / (1j * omega) + slope * (exp_start - exp_end) / (1j * omega) ** 2
+    coefficients = np.concatenate([[np.sum(segment_length * (i_start + i_end) / 2)], np.sum(segment_integral, axis=1)]) / period
+
+    amplitudes = 2 * np.abs(coefficients)
+    amplitudes[0] = amplitudes[0] / 2
+    return np.arange(number_of_harmonics + 1) / period, amplitudes, np.angle(coefficients)
+
 def fft(period_vector_t_i: np.ndarray, sample_factor: int = 1000, plot: str = 'no', mode: str = 'rad',
         f0: float | None = None, title: str = 'ffT', filter_type: str = 'factor',
         filter_value_factor: float = 0.01, filter_value_harmonic: int = 100,
-        figure_size: tuple | None = None, figure_directory: str | None = None) -> np.ndarray:
+        figure_size: tuple | None = None, figure_directory: str | None = None, method: str = 'fft') -> np.ndarray:
     """
     Calculate the FFT for a given input signal. Input signal is in vector format and should include one period.
 
     Output vector includes only frequencies with amplitudes > 1% of input signal
 
+    The input signal is linear between the given points. method='analytic' calculates the exact spectrum of this
+    piecewise-linear signal from the points, without resampling and aliasing. The fundamental frequency is not rounded
+    in this case.
+
     :Minimal Example:
 
     >>> import numpy as np
@@ -48,6 +88,9 @@ def fft(period_vector_t_i: np.ndarray, sample_factor: int = 1000, plot: str = 'n
     :type figure_directory: tuple
     :param figure_size: None for auto-fit; fig_size for matplotlib (width, length)
     :type figure_size: tuple
+    :param method: 'fft'[default]: FFT of the signal resampled to sample_factor points, 'analytic': exact spectrum
+        of the piecewise-linear signal with the same number of harmonics (sample_factor / 2)
+    :type method: str
 
     :return: numpy-array [[frequency-vector],[amplitude-vector],[phase-vector]]
     :rtype: np.ndarray[list]
@@ -79,44 +122,42 @@ def fft(period_vector_t_i: np.ndarray, sample_factor: int = 1000, plot: str = 'n
 
     # fft-function works per default in time domain
     t_interp = np.linspace(0, t[-1], sample_factor)
-    i_interp = np.interp(t_interp, t, i)
 
-    f0 = round(1 / t[-1])
-    Fs = f0 * sample_factor
+    if method == 'fft':
+        i_interp = np.interp(t_interp, t, i)
+
+        f0 = round(1 / t[-1])
+        Fs = f0 * sample_factor
 
-    # frequency domain
-    f = np.linspace(0, (sample_factor - 1) * f0, sample_factor)
-    x = np.fft.fft(i_interp)
-    x_mag = np.abs(x) / sample_factor
-    phi_rad = np.angle(x)
+        # frequency domain
+        f = np.linspace(0, (sample_factor - 1) * f0, sample_factor)
+        x = np.fft.fft(i_interp)
+        x_mag = np.abs(x) / sample_factor
+        phi_rad = np.angle(x)
 
-    f_corrected = f[0:int(sample_factor / 2 + 1)]
-    x_mag_corrected = 2 * x_mag[0:int(sample_factor / 2 + 1)]
-    x_mag_corrected[0] = x_mag_corrected[0] / 2
-    phi_rad_corrected = phi_rad[0:int(sample_factor / 2 + 1)]
+        f_corrected = f[0:int(sample_factor / 2 + 1)]
+        x_mag_corrected = 2 * x_mag[0:int(sample_factor / 2 + 1)]
+        x_mag_corrected[0] = x_mag_corrected[0] / 2
+        phi_rad_corrected = phi_rad[0:int(sample_factor / 2 + 1)]
+    elif method == 'analytic':
+        f0 = 1 / t[-1]
+        Fs = f0 * sample_factor
+        f_corrected, x_mag_corrected, phi_rad_corrected = _piecewise_linear_spectrum(t, i, int(sample_factor / 2))
+    else:
+        raise ValueError(f"method '{method}' not available: Must be 'fft' or 'analytic'")
 
-    f_out = np.array([])
-    x_out = np.array([])
-    phi_rad_out = np.array([])
     if filter_type.lower() == 'factor':
-        for count, _ in enumerate(x_mag_corrected):
-            if x_mag_corrected[count] > filter_value_factor * max(abs(i)):
-                f_out = np.append(f_out, f_corrected[count])
-                x_out = np.append(x_out, x_mag_corrected[count])
-                phi_rad_out = np.append(phi_rad_out, phi_rad_corrected[count])
+        is_kept = x_mag_corrected > filter_value_factor * np.max(np.abs(i))
     elif filter_type.lower() == 'harmonic':
-        for count, _ in enumerate(x_mag_corrected):
-            if count < filter_value_harmonic:
-                f_out = np.append(f_out, f_corrected[count])
-                x_out = np.append(x_out, x_mag_corrected[count])
-                phi_rad_out = np.append(phi_rad_out, phi_rad_corrected[count])
+        is_kept = np.arange(len(x_mag_corrected)) < filter_value_harmonic
     elif filter_type.lower() == 'disabled':
-        f_out = f_corrected
-        x_out = x_mag_corrected
-        phi_rad_out = phi_rad_corrected
+        is_kept = np.ones(len(x_mag_corrected), dtype=bool)
     else:
         raise ValueError(
             f"filter_type '{filter_value_harmonic}' not available: Must be 'factor','harmonic' or 'disabled ")
+    f_out = f_corrected[is_kept]
+    x_out = x_mag_corrected[is_kept]
+    phi_rad_out = phi_rad_corrected[is_kept]
 
     if plot != 'no' and plot is not False:
         logger.info(f"{title=}")
@@ -133,6 +174,9 @@ def fft(period_vector_t_i: np.ndarray, sample_factor: int = 1000, plot: str = 'n
             reconstructed_signal += x_out[i_range] * np.cos(
                 2 * np.pi * f_out[i_range] * t_interp + phi_rad_out[i_range])
 
+        # matplotlib is imported on demand, to keep the package import fast
+        from matplotlib import pyplot as plt
+
         fig, [ax1, ax2, ax3] = plt.subplots(num=title, nrows=3, ncols=1, figsize=figure_size)
         ax1.plot(t, i, label='original signal')
         ax1.plot(t_interp, reconstructed_signal, label='reconstructed signal')
@@ -159,3 +203,87 @@ def fft(period_vector_t_i: np.ndarray, sample_factor: int = 1000, plot: str = 'n
         plt.show()
 
     return np.array([f_out, x_out, phi_rad_out])
+
+def fft_batch(period_vector_t_i_list: list[np.ndarray] | np.ndarray, sample_factor: int = 1000, filter_type: str = 'factor',
+              filter_value_factor: float = 0.01, filter_value_harmonic: int = 100, method: str = 'fft', output: str = 'csr') -> HarmonicTable:
+    """
+    Calculate the spectra of many waveforms at once, see fft() in 'time' mode for the single waveform version.
+
+    The resampled waveforms are transformed by a single real FFT along the time axis, the filters are applied by boolean masks.
+
+    :Minimal Example:
+
+    >>> import numpy as np
+    >>> waveform_list = [np.array([[0, 5e-6, 10e-6], [-10, 10, -10]]), np.array([[0, 2e-6, 20e-6], [-5, 5, -5]])]
+    >>> harmonic_table = fft_batch(waveform_list)
+    >>> frequency_list = harmonic_table.frequency[harmonic_table.offsets[1]:harmonic_table.offsets[2]]  # second waveform
+
+    :param period_vector_t_i_list: waveforms as list of numpy-arrays [[time-vector[,[current-vector]], the number of points may
+        differ, or as 3-D numpy-array (waveform, time/current, point). One period only, starting with 0 seconds.
+    :type period_vector_t_i_list: list[np.ndarray] | np.ndarray
+    :param sample_factor: f_sampling/f_period, defaults to 1000
+    :type sample_factor: int
+    :param filter_type: 'factor'[default] or 'harmonic' or 'disabled', see fft()
+    :type filter_type: str
+    :param filter_value_factor: filters out amplitude-values below a certain factor of max. input amplitude of each waveform.
+        Should be 0...1, default to 0.01 (1%)
+    :type filter_value_factor: float
+    :param filter_value_harmonic: filters out harmonics up to a certain number. Default value is 100.
+        Note: count 1 is DC component, count 2 is the fundamental frequency
+    :type filter_value_harmonic: int
+    :param method: 'fft'[default] or 'analytic', see fft()
+    :type method: str
+    :param output: 'csr'[default]: harmonics of all waveforms concatenated, 'padded': one row per waveform
+    :type output: str
+    :return: frequencies, amplitudes and phases of the kept harmonics
+    :rtype: HarmonicTable
+    """
+    if output not in ['csr', 'padded']:
+        raise ValueError(f"output '{output}' not available: Must be 'csr' or 'padded'")
+    if any(period_vector_t_i[0][0] != 0 for period_vector_t_i in period_vector_t_i_list):
+        raise ValueError("Period vector must start with 0 seconds!")
+
+    if method == 'fft':
+        i_interp = np.array([np.interp(np.linspace(0, period_vector_t_i[0][-1], sample_factor), period_vector_t_i[0], period_vector_t_i[1])
+                             for period_vector_t_i in period_vector_t_i_list])
+        f0 = np.round(1 / np.array([period_vector_t_i[0][-1] for period_vector_t_i in period_vector_t_i_list]))
+        frequency = np.linspace(0, (sample_factor - 1) * f0, sample_factor, axis=1)[:, :int(sample_factor / 2 + 1)]
+        x = np.fft.rfft(i_interp, axis=1)
+        amplitude = 2 * np.abs(x) / sample_factor
+        amplitude[:, 0] = amplitude[:, 0] / 2
+        phase = np.angle(x)
+    elif method == 'analytic':
+        spectrum_list = [_piecewise_linear_spectrum(np.asarray(period_vector_t_i[0], dtype=float), np.asarray(period_vector_t_i[1], dtype=float),
+                                                    int(sample_factor / 2)) for period_vector_t_i in period_vector_t_i_list]
+        frequency, amplitude, phase = (np.array(spectrum_values) for spectrum_values in zip(*spectrum_list, strict=True))
+    else:
+        raise ValueError(f"method '{method}' not available: Must be 'fft' or 'analytic'")
+
+    if filter_type.lower() == 'factor':
+        maximum_amplitude = np.array([np.max(np.abs(period_vector_t_i[1])) for period_vector_t_i in period_vector_t_i_list])
+        is_kept = amplitude > filter_value_factor * maximum_amplitude[:, np.newaxis]
+    elif filter_type.lower() == 'harmonic':
+        is_kept = np.broadcast_to(np.arange(amplitude.shape[1]) < filter_value_harmonic, amplitude.shape)
+    elif filter_type.lower() == 'disabled':
+        is_kept = np.ones(amplitude.shape, dtype=bool)
+    else:
+        raise ValueError(f"filter_type '{filter_type}' not available: Must be 'factor','harmonic' or 'disabled'")
+
+    number_of_harmonics = np.sum(is_kept, axis=1)
+    offsets = np.concatenate([[0], np.cumsum(number_of_harmonics)])
+    if output == 'csr':
+        return HarmonicTable(frequency=frequency[is_kept], amplitude=amplitude[is_kept], phase=phase[is_kept],
+                             number_of_harmonics=number_of_harmonics, offsets=offsets)
+
+    # position of each kept harmonic in its row of the padded table
+    row_index, _ = np.nonzero(is_kept)
+    column_index = np.arange(len(row_index)) - offsets[row_index]
+    table_shape = (len(number_of_harmonics), int(np.max(number_of_harmonics, initial=0)))
+    padded_frequency = np.full(table_shape, np.nan)
+    padded_amplitude = np.zeros(table_shape)
+    padded_phase = np.zeros(table_shape)
+    padded_frequency[row_index, column_index] = frequency[is_kept]
+    padded_amplitude[row_index, column_index] = amplitude[is_kept]
+    padded_phase[row_index, column_index] = phase[is_kept]
+    return HarmonicTable(frequency=padded_frequency, amplitude=padded_amplitude, phase=padded_phase,
+                         number_of_harmonics=number_of_harmonics, offsets=offsets)
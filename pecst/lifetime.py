@@ -3,12 +3,13 @@
 # 3rd party libraries
 import numpy as np
 import pandas as pd
-from scipy.interpolate import interp1d
-from matplotlib import pyplot as plt
 
 # own libraries
 from pecst.cst_dataclasses import LifetimeDerating
 
+# the lifetime curve of the operating temperature is interpolated until the bisection temperature is within this tolerance in degree Celsius
+_BISECTION_TEMPERATURE_TOLERANCE = 1
+
 def get_voltage_from_semilogx_lifetime(lifetime: float, lifetime_vec: pd.Series, voltage_vec: pd.Series) -> np.ndarray:
     """
     Semilogarithmic interpolation from voltage over lifetime curve to get the maximum allowed voltage (to reach the lifetime).
@@ -23,6 +24,9 @@ def get_voltage_from_semilogx_lifetime(lifetime: float, lifetime_vec: pd.Series,
     :type voltage_vec: pd.Series
     :return:
     """
+    # scipy is imported on demand, to keep the package import fast
+    from scipy.interpolate import interp1d
+
     log_lifetime_vec = np.log10(lifetime_vec)
     try:
         f = interp1d(log_lifetime_vec, voltage_vec)
@@ -31,11 +35,272 @@ def get_voltage_from_semilogx_lifetime(lifetime: float, lifetime_vec: pd.Series,
         voltage = np.nan
     return np.array([voltage])
 
+class LifetimeDeratingSurface:
+    """
+    Precompiled lifetime derating of all voltage ratings of a capacitor series.
+
+    Between the lifetime curves of the neighbouring temperatures, the curve at the operating temperature is interpolated
+    geometrically by bisection, until the bisection temperature is within _BISECTION_TEMPERATURE_TOLERANCE of the operating
+    temperature. The curves on all bisection temperatures only depend on the lifetime curves, so they are calculated once:
+    for each voltage rating, the surface holds the curves over the logarithmic lifetime on all bisection temperatures.
+    A lookup for arrays of (lifetime, temperature, voltage rating) triples follows the bisection on these temperatures and
+    interpolates linearly over the logarithmic lifetime, vectorized for all triples. Temperatures outside the lifetime curves
+    use the curve of the lowest or highest temperature.
+    """
+
+    def __init__(self, lt_dto_list: list[LifetimeDerating]) -> None:
+        """
+        Calculate the curves on all bisection temperatures.
+
+        :param lt_dto_list: lifetime_h DTO list
+        :type lt_dto_list: list[LifetimeDerating]
+        """
+        curve_dict: dict[float, dict[float, pd.DataFrame]] = {}
+        for lt_dto in lt_dto_list:
+            curve_dict.setdefault(float(lt_dto.voltage), {})[float(lt_dto.temperature)] = lt_dto.lifetime
+        self.voltage_rating = np.array(sorted(curve_dict), dtype=float)
+
+        # curves of all bisection temperatures (nodes)
+        self._node_temperature_list: list[float] = []
+        self._node_lifetime_list: list[np.ndarray] = []
+        self._node_voltage_list: list[np.ndarray] = []
+
+        number_temperatures = max([len(temperature_dict) for temperature_dict in curve_dict.values()], default=1)
+        self._curve_temperature = np.full((len(self.voltage_rating), number_temperatures), np.inf)
+        self._curve_node = np.zeros((len(self.voltage_rating), number_temperatures), dtype=int)
+        # bisection nodes between two neighbouring curves in heap order: children of heap index h are 2h + 1 (lower) and 2h + 2 (higher)
+        tree_dict_list: list[list[dict[int, int]]] = []
+        for count_rating, voltage_rating in enumerate(self.voltage_rating):
+            temperature_list = sorted(curve_dict[voltage_rating])
+            self._curve_temperature[count_rating, :len(temperature_list)] = temperature_list
+            self._curve_node[count_rating, :len(temperature_list)] = [
+                self._add_node(temperature, curve_dict[voltage_rating][temperature]["lifetime"].to_numpy(dtype=float),
+                               curve_dict[voltage_rating][temperature]["voltage"].to_numpy(dtype=float)) for temperature in temperature_list]
+            tree_dict_list.append([])
+            for temperature_lower, temperature_higher in zip(temperature_list[:-1], temperature_list[1:], strict=True):
+                tree_dict: dict[int, int] = {}
+                # the curve points are interpolated pointwise, aligned by their index
+                lower_df, higher_df = curve_dict[voltage_rating][temperature_lower].align(curve_dict[voltage_rating][temperature_higher])
+                self._add_bisection_nodes(tree_dict, 0, temperature_lower, temperature_higher,
+                                          (lower_df["lifetime"].to_numpy(dtype=float), lower_df["voltage"].to_numpy(dtype=float)),
+                                          (higher_df["lifetime"].to_numpy(dtype=float), higher_df["voltage"].to_numpy(dtype=float)))
+                tree_dict_list[-1].append(tree_dict)
+        self._temperature_max = np.array([np.max(temperature_row[np.isfinite(temperature_row)]) for temperature_row in self._curve_temperature])
+
+        number_heap_indices = max([max(tree_dict) + 1 for tree_dict_row in tree_dict_list for tree_dict in tree_dict_row], default=1)
+        self._tree = np.zeros((len(self.voltage_rating), max(number_temperatures - 1, 1), number_heap_indices), dtype=int)
+        for count_rating, tree_dict_row in enumerate(tree_dict_list):
+            for count_pair, tree_dict in enumerate(tree_dict_row):
+                self._tree[count_rating, count_pair, list(tree_dict)] = list(tree_dict.values())
+
+        # curves padded with NaN, sorted by lifetime
+        number_points = max([len(node_lifetime) for node_lifetime in self._node_lifetime_list] + [2])
+        self._node_temperature = np.array(self._node_temperature_list, dtype=float)
+        self._node_length = np.array([len(node_lifetime) for node_lifetime in self._node_lifetime_list], dtype=int)
+        self._node_lifetime = np.full((len(self._node_lifetime_list), number_points), np.nan)
+        self._node_log_lifetime = np.full((len(self._node_lifetime_list), number_points), np.nan)
+        self._node_voltage = np.full((len(self._node_lifetime_list), number_points), np.nan)
+        for count_node, (node_lifetime, node_voltage) in enumerate(zip(self._node_lifetime_list, self._node_voltage_list, strict=True)):
+            log_lifetime = np.log10(node_lifetime)
+            order = np.argsort(log_lifetime, kind="mergesort")
+            self._node_lifetime[count_node, :len(order)] = node_lifetime[order]
+            self._node_log_lifetime[count_node, :len(order)] = log_lifetime[order]
+            self._node_voltage[count_node, :len(order)] = node_voltage[order]
+
+    def _add_node(self, temperature: float, lifetime: np.ndarray, voltage: np.ndarray) -> int:
+        """
+        Add the curve of a bisection temperature.
+
+        :param temperature: bisection temperature in degree Celsius
+        :type temperature: float
+        :param lifetime: lifetime in hours
+        :type lifetime: np.ndarray
+        :param voltage: voltage in V for each lifetime
+        :type voltage: np.ndarray
+        :return: node index
+        :rtype: int
+        """
+        self._node_temperature_list.append(temperature)
+        self._node_lifetime_list.append(lifetime)
+        self._node_voltage_list.append(voltage)
+        return len(self._node_temperature_list) - 1
+
+    def _add_bisection_nodes(self, tree_dict: dict[int, int], heap_index: int, temperature_start: float, temperature_stop: float,
+                             lower_curve: tuple[np.ndarray, np.ndarray], higher_curve: tuple[np.ndarray, np.ndarray]) -> None:
+        """
+        Add the bisection node between two curves and, recursively, all nodes the bisection can reach from it.
+
+        :param tree_dict: heap index -> node index
+        :type tree_dict: dict[int, int]
+        :param heap_index: heap index of the new node
+        :type heap_index: int
+        :param temperature_start: temperature of the lower curve in degree Celsius
+        :type temperature_start: float
+        :param temperature_stop: temperature of the higher curve in degree Celsius
+        :type temperature_stop: float
+        :param lower_curve: lifetime in hours, voltage in V of the lower curve
+        :type lower_curve: tuple[np.ndarray, np.ndarray]
+        :param higher_curve: lifetime in hours, voltage in V of the higher curve
+        :type higher_curve: tuple[np.ndarray, np.ndarray]
+        """
+        # geometric interpolation for the new lifetime_h curve for the new temperature
+        temperature_mid = (temperature_start + temperature_stop) / 2
+        mid_curve = (np.sqrt(lower_curve[0] * higher_curve[0]), np.sqrt(lower_curve[1] * higher_curve[1]))
+        tree_dict[heap_index] = self._add_node(temperature_mid, *mid_curve)
+
+        # the bisection only continues for temperatures farther than the tolerance from the bisection temperature
+        if temperature_mid - temperature_start > _BISECTION_TEMPERATURE_TOLERANCE:
+            self._add_bisection_nodes(tree_dict, 2 * heap_index + 1, temperature_start, temperature_mid, lower_curve, mid_curve)
+        if temperature_stop - temperature_mid > _BISECTION_TEMPERATURE_TOLERANCE:
+            self._add_bisection_nodes(tree_dict, 2 * heap_index + 2, temperature_mid, temperature_stop, mid_curve, higher_curve)
+
+    def _node_index(self, operating_temperature: np.ndarray, voltage_rating: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the curve of the bisection for each pair of operating temperature and voltage rating.
+
+        :param operating_temperature: operating temperature in degree Celsius
+        :type operating_temperature: np.ndarray
+        :param voltage_rating: voltage rating in V
+        :type voltage_rating: np.ndarray
+        :return: node index, False for voltage ratings without lifetime curves and NaN temperatures
+        :rtype: tuple[np.ndarray, np.ndarray]
+        """
+        node_index = np.zeros(len(voltage_rating), dtype=int)
+        if len(self.voltage_rating) == 0:
+            return node_index, np.zeros(len(voltage_rating), dtype=bool)
+        rating_index = np.minimum(np.searchsorted(self.voltage_rating, voltage_rating), len(self.voltage_rating) - 1)
+        is_valid = (self.voltage_rating[rating_index] == voltage_rating) & ~np.isnan(operating_temperature)
+
+        # temperatures outside the lifetime curves use the curve of the lowest or highest temperature
+        curve_temperature = self._curve_temperature[rating_index]
+        temperature = np.clip(operating_temperature, curve_temperature[:, 0], self._temperature_max[rating_index])
+        lower_index = np.maximum(np.sum(curve_temperature <= temperature[:, np.newaxis], axis=1) - 1, 0)
+        node_index = self._curve_node[rating_index, lower_index]
+
+        # between two curves: follow the bisection until the bisection temperature is within the tolerance
+        pair_index = np.minimum(lower_index, self._tree.shape[1] - 1)
+        heap_index = np.zeros(len(voltage_rating), dtype=int)
+        is_active = is_valid & (curve_temperature[np.arange(len(voltage_rating)), lower_index] != temperature)
+        while np.any(is_active):
+            active = np.nonzero(is_active)[0]
+            node_index[active] = self._tree[rating_index[active], pair_index[active], heap_index[active]]
+            temperature_mid = self._node_temperature[node_index[active]]
+            heap_index[active] = 2 * heap_index[active] + np.where(temperature[active] > temperature_mid, 2, 1)
+            is_active[active] = np.abs(temperature[active] - temperature_mid) > _BISECTION_TEMPERATURE_TOLERANCE
+        return node_index, is_valid
+
+    def voltage(self, target_lifetime: float | np.ndarray, operating_temperature: float | np.ndarray,
+                voltage_rating: float | np.ndarray) -> np.ndarray:
+        """
+        Get the voltage derating due to the capacitor lifetime_h for (lifetime, temperature, voltage rating) triples.
+
+        The arguments are broadcast against each other. Lifetimes outside the lifetime curve and voltage ratings without
+        lifetime curves give NaN.
+
+        :param target_lifetime: capacitor target lifetime_h in hours
+        :type target_lifetime: float | np.ndarray
+        :param operating_temperature: operating temperature in degree Celsius
+        :type operating_temperature: float | np.ndarray
+        :param voltage_rating: capacitor voltage rating in V
+        :type voltage_rating: float | np.ndarray
+        :return: voltage for each triple
+        :rtype: np.ndarray
+        """
+        target_lifetime, operating_temperature, voltage_rating = np.broadcast_arrays(
+            np.asarray(target_lifetime, dtype=float), np.asarray(operating_temperature, dtype=float), np.asarray(voltage_rating, dtype=float))
+        shape = voltage_rating.shape
+        node_index, is_valid = self._node_index(operating_temperature.reshape(-1), voltage_rating.reshape(-1))
+
+        # linear interpolation of the voltage over the logarithmic lifetime, same as np.interp() for each curve
+        x = np.log10(target_lifetime.reshape(-1))
+        xp = self._node_log_lifetime[node_index]
+        fp = self._node_voltage[node_index]
+        row_index = np.arange(len(x))
+        last_index = self._node_length[node_index] - 1
+        left_index = np.clip(np.sum(xp <= x[:, np.newaxis], axis=1) - 1, 0, np.maximum(last_index - 1, 0))
+        x_left, x_right = xp[row_index, left_index], xp[row_index, left_index + 1]
+        fp_left, fp_right = fp[row_index, left_index], fp[row_index, left_index + 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = (fp_right - fp_left) / (x_right - x_left)
+            voltage = slope * (x - x_left) + fp_left
+            # if the interpolation gives NaN in one direction, try the other
+            voltage = np.where(np.isnan(voltage), slope * (x - x_right) + fp_right, voltage)
+        voltage = np.where(np.isnan(voltage) & (fp_left == fp_right), fp_left, voltage)
+        voltage = np.where(x == x_left, fp_left, voltage)
+        voltage = np.where(x == xp[row_index, last_index], fp[row_index, last_index], voltage)
+
+        # no extrapolation outside the lifetime curve
+        is_valid &= (last_index >= 1) & ~np.isnan(x) & ~(x < xp[:, 0]) & ~(x > xp[row_index, last_index])
+        return np.where(is_valid, voltage, np.nan).reshape(shape)
+
+    def lifetime(self, voltage: float | np.ndarray, operating_temperature: float | np.ndarray, voltage_rating: float | np.ndarray) -> np.ndarray:
+        """
+        Get the achievable lifetime for (voltage, temperature, voltage rating) triples, the inverse of voltage().
+
+        The achievable lifetime is the longest lifetime on the lifetime curve with a voltage of at least the given voltage,
+        interpolated on the same curves and segments as voltage(). So voltage(lifetime(v, t, r), t, r) >= v holds up to
+        rounding. The arguments are broadcast against each other. Voltages below the end of the lifetime curve give the
+        longest lifetime of the curve, as there is no extrapolation. Voltages above the whole lifetime curve and voltage
+        ratings without lifetime curves give NaN.
+
+        :param voltage: voltage in V, in the scale of the lifetime curves
+        :type voltage: float | np.ndarray
+        :param operating_temperature: operating temperature in degree Celsius
+        :type operating_temperature: float | np.ndarray
+        :param voltage_rating: capacitor voltage rating in V
+        :type voltage_rating: float | np.ndarray
+        :return: lifetime in hours for each triple
+        :rtype: np.ndarray
+        """
+        voltage, operating_temperature, voltage_rating = np.broadcast_arrays(
+            np.asarray(voltage, dtype=float), np.asarray(operating_temperature, dtype=float), np.asarray(voltage_rating, dtype=float))
+        shape = voltage_rating.shape
+        node_index, is_valid = self._node_index(operating_temperature.reshape(-1), voltage_rating.reshape(-1))
+        is_valid &= self._node_length[node_index] >= 2
+
+        # per curve segment: the segment end if its voltage is high enough, else the crossing of the voltage within the segment
+        v = voltage.reshape(-1)[:, np.newaxis]
+        x = self._node_log_lifetime[node_index]
+        fp = self._node_voltage[node_index]
+        x_left, x_right = x[:, :-1], x[:, 1:]
+        fp_left, fp_right = fp[:, :-1], fp[:, 1:]
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            segment_lifetime = np.where(fp_right >= v, self._node_lifetime[node_index][:, 1:], np.where(
+                fp_left >= v, 10 ** (x_left + (v - fp_left) * (x_right - x_left) / (fp_right - fp_left)), np.nan))
+        # the longest lifetime of all segments, NaN (padding) segments are ignored
+        lifetime = np.fmax.reduce(segment_lifetime, axis=1)
+        return np.where(is_valid, lifetime, np.nan).reshape(shape)
+
+    def curve(self, operating_temperature: float, voltage_rating: float) -> tuple[float, np.ndarray, np.ndarray]:
+        """
+        Get the interpolated lifetime curve of an operating temperature, e.g. for plots.
+
+        :param operating_temperature: operating temperature in degree Celsius
+        :type operating_temperature: float
+        :param voltage_rating: capacitor voltage rating in V
+        :type voltage_rating: float
+        :return: bisection temperature in degree Celsius, lifetime in hours, voltage in V for each lifetime
+        :rtype: tuple[float, np.ndarray, np.ndarray]
+        :raises ValueError: if no lifetime curves are available for the voltage rating
+        """
+        node_index, is_valid = self._node_index(np.array([operating_temperature], dtype=float), np.array([voltage_rating], dtype=float))
+        if not is_valid[0]:
+            raise ValueError(f"No lifetime curves available for the voltage rating {voltage_rating} V.")
+        node_length = self._node_length[node_index[0]]
+        return (float(self._node_temperature[node_index[0]]), self._node_lifetime[node_index[0], :node_length],
+                self._node_voltage[node_index[0], :node_length])
+
+
 def voltage_rating_due_to_lifetime(target_lifetime: float, operating_temperature: float, voltage_rating: float,
                                    lt_dto_list: list[LifetimeDerating], is_debug: bool = False) -> float:
     """
     Voltage dearting due to capacitor lifetime_h.
 
+    The lifetime curve of the operating temperature is interpolated by bisection between the curves of the neighbouring
+    temperatures, for a single capacitor. LifetimeDeratingSurface gives the same voltages for many capacitors at once.
+    Temperatures outside the lifetime curves use the curve of the lowest or highest temperature. Voltage ratings without
+    lifetime curves and NaN temperatures give NaN.
+
     :param target_lifetime: capacitor target lifetime_h in hours
     :type target_lifetime: float
     :param operating_temperature: operating temperature in degree Celsius
@@ -49,19 +314,14 @@ def voltage_rating_due_to_lifetime(target_lifetime: float, operating_temperature
     :return: voltage
     :rtype: float
     """
-    temperature_lower: float = 0
-    temperature_higher: float = 500
-    for lt_dto in lt_dto_list:
-        # find temperature below and temperature above the operating temperature
-        if lt_dto.voltage == voltage_rating:
-            if operating_temperature <= lt_dto.temperature < temperature_higher:
-                temperature_higher = lt_dto.temperature
-            if operating_temperature >= lt_dto.temperature > temperature_lower:
-                temperature_lower = lt_dto.temperature
-    if temperature_higher == 500:
-        temperature_higher = temperature_lower
-    if temperature_lower == 0:
-        temperature_lower = temperature_higher
+    temperature_list = sorted(lt_dto.temperature for lt_dto in lt_dto_list if lt_dto.voltage == voltage_rating)
+    if len(temperature_list) == 0 or np.isnan(operating_temperature):
+        return np.nan
+
+    # find temperature below and temperature above the operating temperature
+    temperature = min(max(operating_temperature, temperature_list[0]), temperature_list[-1])
+    temperature_lower = max(curve_temperature for curve_temperature in temperature_list if curve_temperature <= temperature)
+    temperature_higher = min(curve_temperature for curve_temperature in temperature_list if curve_temperature >= temperature)
 
     # get the dataframes of lower and higher temperatures (closest to the operating point)
     for lt_dto in lt_dto_list:
@@ -71,14 +331,12 @@ def voltage_rating_due_to_lifetime(target_lifetime: float, operating_temperature
             df_higher = lt_dto.lifetime
 
     # interpolate between both temperatures multiple times using bisection
-    # experimentally figure out c_min
     temperature_start = temperature_lower
     temperature_stop = temperature_higher
     higher_df = df_higher.copy()
     lower_df = df_lower.copy()
-    delta_temperature = 100
-    # temperature error should be less than 1 degree Celsius
-    while delta_temperature > 1:
+    delta_temperature = np.inf
+    while delta_temperature > _BISECTION_TEMPERATURE_TOLERANCE:
         # interpolated temperature
         temperature_mid = (temperature_start + temperature_stop) / 2
 
@@ -88,11 +346,11 @@ def voltage_rating_due_to_lifetime(target_lifetime: float, operating_temperature
         df_mid["voltage"] = np.sqrt(lower_df["voltage"] * higher_df["voltage"])
 
         # bisection new start conditions
-        if operating_temperature > temperature_mid:
+        if temperature > temperature_mid:
             temperature_start = temperature_mid
             lower_df["lifetime"] = df_mid["lifetime"]
             lower_df["voltage"] = df_mid["voltage"]
-        elif operating_temperature == temperature_mid:
+        elif temperature == temperature_mid:
             break
         else:
             temperature_stop = temperature_mid
@@ -100,12 +358,15 @@ def voltage_rating_due_to_lifetime(target_lifetime: float, operating_temperature
             higher_df["voltage"] = df_mid["voltage"]
 
         # calculate temperature error
-        delta_temperature = np.abs(operating_temperature - temperature_mid)
+        delta_temperature = np.abs(temperature - temperature_mid)
 
     # logarithmic voltage interpolation for the voltage
-    voltage = get_voltage_from_semilogx_lifetime(target_lifetime, df_mid["lifetime"], df_mid["voltage"])
+    voltage = float(get_voltage_from_semilogx_lifetime(target_lifetime, df_mid["lifetime"], df_mid["voltage"])[0])
 
     if is_debug:
+        # matplotlib is imported on demand, to keep the package import fast
+        from matplotlib import pyplot as plt
+
         plt.semilogx(df_lower["lifetime"], df_lower["voltage"], label=f"{temperature_lower} °C")
         plt.semilogx(df_higher["lifetime"], df_higher["voltage"], label=f"{temperature_higher} °C")
         plt.semilogx(df_mid["lifetime"], df_mid["voltage"], label=f"{temperature_mid} °C")
@@ -115,7 +376,28 @@ def voltage_rating_due_to_lifetime(target_lifetime: float, operating_temperature
         plt.grid()
         plt.show()
 
-    return float(voltage)
+    return voltage
+
+def voltage_rating_due_to_lifetime_vectorized(target_lifetime: float, operating_temperature: float, voltage_rating: np.ndarray,
+                                              lt_dto_list: list[LifetimeDerating]) -> np.ndarray:
+    """
+    Voltage derating due to capacitor lifetime_h for many capacitors at once.
+
+    The lifetime curves are compiled once to a LifetimeDeratingSurface for all capacitors. For repeated calls with the same
+    lifetime curves, use LifetimeDeratingSurface directly.
+
+    :param target_lifetime: capacitor target lifetime_h in hours
+    :type target_lifetime: float
+    :param operating_temperature: operating temperature in degree Celsius
+    :type operating_temperature: float
+    :param voltage_rating: capacitor operating voltages in V
+    :type voltage_rating: np.ndarray
+    :param lt_dto_list: lifetime_h DTO list
+    :type lt_dto_list: list[LifetimeDerating]
+    :return: voltage for each capacitor
+    :rtype: np.ndarray
+    """
+    return LifetimeDeratingSurface(lt_dto_list).voltage(target_lifetime, operating_temperature, voltage_rating).reshape(-1)
 
 
 if __name__ == '__main__':
@@ -9,6 +9,7 @@ import numpy as np
 
 # own libraries
 import pecst.constants as const
+from pecst.esr_store import get_esr_store
 
 # def read_leakage_current(operating_voltage: float, temperature_ambient: float) -> float:
 #     leakage_current = 1
@@ -40,34 +41,127 @@ def read_capacitor_frequency_dependent_limits(order_number: str) -> pd.DataFrame
 
     return df
 
-def power_loss_film_capacitor(order_number: str, frequency_list: list[float], current_amplitude_list: list[float], number_parallel_capacitors: int) -> float:
+def power_loss_film_capacitor(order_number: str, frequency_list: list[float] | np.ndarray, current_amplitude_list: list[float] | np.ndarray,
+                              number_parallel_capacitors: int) -> float:
     """
     Film capacitor power loss estimation.
 
     :param order_number: capacitor order number
     :type order_number: str
     :param frequency_list: frequency in Hertz in a list
-    :type frequency_list: list[float]
+    :type frequency_list: list[float] | np.ndarray
     :param current_amplitude_list: current in ampere in a list
-    :type current_amplitude_list: list[float]
+    :type current_amplitude_list: list[float] | np.ndarray
     :param number_parallel_capacitors: number of parallel capacitors to estimate the current per capacitor
     :type number_parallel_capacitors: int
     :return: loss of a single capacitor in Watt
     :rtype: float
     """
-    order_number = order_number.replace("+", "K")
-    order_number = order_number.replace("*", "")
+    # ESR curve, the file is read only once per process
+    limits = get_esr_store().get(order_number)
 
-    # read ESR file
-    esr_df = read_capacitor_frequency_dependent_limits(order_number)
+    # interpolate ESR at all given frequencies
+    esr = np.interp(frequency_list, limits.frequency, limits.esr)
 
-    esr_losses = 0.0
-    for count_frequency, frequency in enumerate(frequency_list):
-        # interpolate ESR at given frequency
-        esr = np.interp(frequency, esr_df["F_HZ"], esr_df["esr"])
+    # loss = R * I_RMS ** 2 = R * 0.5 * I_Peak ** 2 (peak due to the fft output)
+    # parallel capacitors reduce the I_Peak according to the number of parallel same-value(!) capacitors
+    esr_losses = esr @ (0.5 * np.asarray(current_amplitude_list, dtype=float) ** 2) / number_parallel_capacitors ** 2
 
-        # loss = R * I_RMS ** 2 = R * 0.5 * I_Peak ** 2 (peak due to the fft output)
-        # parallel capacitors reduce the I_Peak according to the number of parallel same-value(!) capacitors
-        esr_losses += esr * 0.5 * (current_amplitude_list[count_frequency] / number_parallel_capacitors) ** 2
+    return float(esr_losses)
 
+def read_capacitor_frequency_dependent_limits_at_frequencies(order_number_list: list[str], frequency_list: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Read the frequency-dependent limits of many capacitors and interpolate them at the given frequencies.
+
+    The ESR files are kept by the process-wide ESR store, so every file is read only once. The result is used by the
+    vectorized loss and current capability calculation.
+
+    :param order_number_list: capacitor order numbers
+    :type order_number_list: list[str]
+    :param frequency_list: frequency in Hertz in a list
+    :type frequency_list: np.ndarray
+    :return: ESR in Ohm and RMS current capability in A, both of shape (number of capacitors, number of frequencies)
+    :rtype: tuple[np.ndarray, np.ndarray]
+    """
+    return get_esr_store().at_frequencies(order_number_list, frequency_list)
+
+def power_loss_film_capacitor_vectorized(esr_matrix: np.ndarray, current_amplitude_list: np.ndarray,
+                                         number_parallel_capacitors: np.ndarray | float) -> np.ndarray:
+    """
+    Film capacitor power loss estimation for many capacitors at once.
+
+    Vectorized version of power_loss_film_capacitor(). The losses of all capacitors are a single matrix-vector product of the
+    ESR matrix and the squared current amplitudes, divided by the squared number of parallel capacitors.
+
+    :param esr_matrix: ESR in Ohm of shape (number of capacitors, number of frequencies)
+    :type esr_matrix: np.ndarray
+    :param current_amplitude_list: current in ampere in a list
+    :type current_amplitude_list: np.ndarray
+    :param number_parallel_capacitors: number of parallel capacitors per capacitor to estimate the current per capacitor,
+        or the same number for all capacitors
+    :type number_parallel_capacitors: np.ndarray | float
+    :return: loss of a single capacitor in Watt, for each capacitor
+    :rtype: np.ndarray
+    """
+    # loss = R * I_RMS ** 2 = R * 0.5 * I_Peak ** 2 (peak due to the fft output)
+    esr_losses: np.ndarray = esr_matrix @ (0.5 * np.asarray(current_amplitude_list, dtype=float) ** 2) / np.asarray(number_parallel_capacitors) ** 2
     return esr_losses
+
+def capacitor_admittance(esr_matrix: np.ndarray, capacitance: np.ndarray, esl: np.ndarray, frequency_list: np.ndarray) -> np.ndarray:
+    """
+    Complex admittance of capacitors using a series R-L-C model, to calculate the current share of parallel capacitors.
+
+    At 0 Hz, the admittance is set to the limit for small frequencies (proportional to the capacitance), so a DC value of
+    the spectrum is shared in the same way as very low frequency currents.
+
+    :param esr_matrix: ESR in Ohm of shape (number of capacitors, number of frequencies)
+    :type esr_matrix: np.ndarray
+    :param capacitance: capacitance in F for each capacitor
+    :type capacitance: np.ndarray
+    :param esl: equivalent series inductance in H for each capacitor
+    :type esl: np.ndarray
+    :param frequency_list: frequency in Hertz in a list
+    :type frequency_list: np.ndarray
+    :return: complex admittance in S of shape (number of capacitors, number of frequencies)
+    :rtype: np.ndarray
+    """
+    capacitance = np.asarray(capacitance, dtype=float)[:, np.newaxis]
+    omega = 2 * np.pi * np.asarray(frequency_list, dtype=float)
+    is_dc = omega == 0
+    omega = np.where(is_dc, 1.0, omega)
+    admittance = 1 / (esr_matrix + 1j * (omega * np.asarray(esl, dtype=float)[:, np.newaxis] - 1 / (omega * capacitance)))
+    return np.where(is_dc, 1j * capacitance, admittance)
+
+def power_loss_film_capacitor_mixed(esr_matrix: np.ndarray, capacitance: np.ndarray, esl: np.ndarray, number_parallel_capacitors: np.ndarray,
+                                    frequency_list: np.ndarray, current_amplitude_list: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Film capacitor power loss estimation for parallel capacitors of different types.
+
+    Extension of power_loss_film_capacitor() to parallel capacitors with different ESR, capacitance and ESL. The current of
+    each harmonic is shared according to the complex admittance of the capacitors, see capacitor_admittance().
+    For same-value capacitors, each capacitor carries 1 / number_parallel_capacitors of the current, same as power_loss_film_capacitor().
+
+    :param esr_matrix: ESR in Ohm of shape (number of capacitor types, number of frequencies)
+    :type esr_matrix: np.ndarray
+    :param capacitance: capacitance in F for each capacitor type
+    :type capacitance: np.ndarray
+    :param esl: equivalent series inductance in H for each capacitor type
+    :type esl: np.ndarray
+    :param number_parallel_capacitors: number of parallel capacitors for each capacitor type
+    :type number_parallel_capacitors: np.ndarray
+    :param frequency_list: frequency in Hertz in a list
+    :type frequency_list: np.ndarray
+    :param current_amplitude_list: current in ampere in a list
+    :type current_amplitude_list: np.ndarray
+    :return: loss of a single capacitor in Watt for each capacitor type,
+        current amplitude in A of a single capacitor of shape (number of capacitor types, number of frequencies)
+    :rtype: tuple[np.ndarray, np.ndarray]
+    """
+    admittance = capacitor_admittance(esr_matrix, capacitance, esl, frequency_list)
+    admittance_total = np.sum(np.asarray(number_parallel_capacitors, dtype=float)[:, np.newaxis] * admittance, axis=0)
+    current_amplitude_per_capacitor = np.abs(admittance / admittance_total) * np.asarray(current_amplitude_list)
+
+    # loss = R * I_RMS ** 2 = R * 0.5 * I_Peak ** 2 (peak due to the fft output)
+    esr_losses = np.sum(esr_matrix * 0.5 * current_amplitude_per_capacitor ** 2, axis=1)
+
+    return esr_losses, current_amplitude_per_capacitor
@@ -1,7 +1,10 @@
 """Read the capacitor database."""
 
 # python libraries
+import dataclasses
+import os
 import pathlib
+import pickle
 import logging
 
 # 3rd party libraries
@@ -14,6 +17,15 @@ from pecst.cst_dataclasses import LifetimeDerating
 
 logger = logging.getLogger(__name__)
 
+# capacitor data, self-heating data, derating data, dv/dt data, lifetime derating list
+FilmCapacitorSeriesTuple = tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, list[LifetimeDerating]]
+
+# increase in case the compiled format of _parse_dc_film_capacitors() changes
+_CATALOG_CACHE_VERSION = 1
+
+# in-process memory of the compiled capacitor series: series directory -> (fingerprint, compiled capacitor series)
+_catalog_memory: dict[str, tuple[tuple, FilmCapacitorSeriesTuple]] = {}
+
 def get_str_value_from_str(text: str, start: str, end: str) -> str:
     """
     Get string value between start and end from a given string.
@@ -40,20 +52,17 @@ def get_str_value_from_str(text: str, start: str, end: str) -> str:
         logger.info("Delimiters not found")
     return res
 
-def load_dc_film_capacitors(capacitor_series_name: str) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, list[LifetimeDerating]]:
+def _parse_dc_film_capacitors(capacitor_series_name: str, film_capacitor_series_path: pathlib.Path) -> FilmCapacitorSeriesTuple:
     """
-    Load dc film capacitors from the database.
+    Parse the datasheet csv files of a dc film capacitor series.
 
-    :param capacitor_series_name: name of the capacitor series to download
+    :param capacitor_series_name: name of the capacitor series
     :type capacitor_series_name: str
-    :return: unified list of film capacitors
-    :rtype: tuple[pandas.DataFrame, pandas.DataFrame, pandas.DataFrame]
+    :param film_capacitor_series_path: directory of the capacitor series csv files
+    :type film_capacitor_series_path: pathlib.Path
+    :return: capacitor data, self-heating data, derating data, dv/dt data, lifetime derating list
+    :rtype: tuple[pandas.DataFrame, pandas.DataFrame, pandas.DataFrame, pandas.DataFrame, list[LifetimeDerating]]
     """
-    # capacitor data
-    path = pathlib.Path(__file__)
-
-    film_capacitor_series_path = pathlib.PurePath(path.parents[0], const.FOIL_CAPACITOR_DATA_DIRECTORY, capacitor_series_name)
-
     database_path = pathlib.PurePath(film_capacitor_series_path, f"{capacitor_series_name}.csv")
     c_df = pd.read_csv(database_path, sep=';', decimal='.')
 
@@ -104,14 +113,15 @@ def load_dc_film_capacitors(capacitor_series_name: str) -> tuple[pd.DataFrame, p
         temperature = float(get_str_value_from_str(lifetime_data_file.stem, start="V_", end="degree"))
 
         if voltage_str == "x":
+            relative_lifetime_df = pd.read_csv(lifetime_data_file, decimal=',', delimiter=';')
+            # derating factor is maximum 1. May greater due to digitizing error from datasheet. Clip value to 1.
+            relative_lifetime_df["voltage"] = np.clip(relative_lifetime_df["voltage"], a_min=0, a_max=1)
+
             # get all different rated temperatures
             unique_voltage_values = c_df["V_R_85degree"].unique()
             for unique_voltage_value in unique_voltage_values:
-                lifetime_df = pd.read_csv(lifetime_data_file, decimal=',', delimiter=';')
-                # derating factor is maximum 1. May greater due to digitizing error from datasheet. Clip value to 1.
-                lifetime_df["voltage"] = np.clip(lifetime_df["voltage"], a_min=0, a_max=1)
-
                 # modify lifetime_h df, as there is a factor and no absolute voltage level given
+                lifetime_df = relative_lifetime_df.copy()
                 lifetime_df["voltage"] = unique_voltage_value * lifetime_df["voltage"]
                 lt_dto = LifetimeDerating(temperature=temperature, voltage=unique_voltage_value,
                                           lifetime=lifetime_df)
@@ -129,6 +139,159 @@ def load_dc_film_capacitors(capacitor_series_name: str) -> tuple[pd.DataFrame, p
 
     return c_df, sh_df, c_derating, dvdt_df, lt_dto_list
 
+def _catalog_fingerprint(film_capacitor_series_path: pathlib.Path) -> tuple:
+    """
+    Fingerprint of the datasheet csv files of a capacitor series, changes in case a file is added, removed or modified.
+
+    :param film_capacitor_series_path: directory of the capacitor series csv files
+    :type film_capacitor_series_path: pathlib.Path
+    :return: file name, size and modification time in ns of each csv file
+    :rtype: tuple
+    """
+    fingerprint = []
+    for csv_file in sorted(film_capacitor_series_path.glob("*.csv")):
+        file_stat = csv_file.stat()
+        fingerprint.append((csv_file.name, file_stat.st_size, file_stat.st_mtime_ns))
+    return tuple(fingerprint)
+
+def _read_catalog_cache_file(cache_file: pathlib.Path, fingerprint: tuple) -> FilmCapacitorSeriesTuple | None:
+    """
+    Read the compiled capacitor series from the cache file.
+
+    :param cache_file: cache file
+    :type cache_file: pathlib.Path
+    :param fingerprint: fingerprint of the datasheet csv files, see _catalog_fingerprint()
+    :type fingerprint: tuple
+    :return: compiled capacitor series, None in case the cache file does not exist, is unreadable or outdated
+    :rtype: FilmCapacitorSeriesTuple | None
+    """
+    try:
+        with open(cache_file, "rb") as file:
+            cache_content = pickle.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+        logger.debug(f"Capacitor catalog cache {cache_file} is not readable: {e}")
+        return None
+    if cache_content.get("version") != _CATALOG_CACHE_VERSION or cache_content.get("fingerprint") != fingerprint:
+        return None
+    catalog: FilmCapacitorSeriesTuple = cache_content["catalog"]
+    return catalog
+
+def _write_catalog_cache_file(cache_file: pathlib.Path, fingerprint: tuple, catalog: FilmCapacitorSeriesTuple) -> None:
+    """
+    Write the compiled capacitor series atomically to the cache file. A not writable cache directory is ignored.
+
+    :param cache_file: cache file
+    :type cache_file: pathlib.Path
+    :param fingerprint: fingerprint of the datasheet csv files, see _catalog_fingerprint()
+    :type fingerprint: tuple
+    :param catalog: compiled capacitor series
+    :type catalog: FilmCapacitorSeriesTuple
+    """
+    temporary_file = cache_file.with_name(cache_file.name + ".tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(temporary_file, "wb") as file:
+            pickle.dump({"version": _CATALOG_CACHE_VERSION, "fingerprint": fingerprint, "catalog": catalog}, file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file, cache_file)
+    except OSError as e:
+        temporary_file.unlink(missing_ok=True)
+        logger.debug(f"Capacitor catalog cache {cache_file} is not writable: {e}")
+
+def _copy_catalog(catalog: FilmCapacitorSeriesTuple) -> FilmCapacitorSeriesTuple:
+    """
+    Copy a compiled capacitor series, so the caller can modify the data frames without changing the cache.
+
+    :param catalog: compiled capacitor series
+    :type catalog: FilmCapacitorSeriesTuple
+    :return: copy of the compiled capacitor series
+    :rtype: FilmCapacitorSeriesTuple
+    """
+    c_df, sh_df, c_derating, dvdt_df, lt_dto_list = catalog
+    return (c_df.copy(), sh_df.copy(), c_derating.copy(), dvdt_df.copy(),
+            [dataclasses.replace(lt_dto, lifetime=lt_dto.lifetime.copy()) for lt_dto in lt_dto_list])
+
+def _load_catalog(capacitor_series_name: str, film_capacitor_series_path: pathlib.Path, cache_directory: pathlib.Path) -> FilmCapacitorSeriesTuple:
+    """
+    Load a compiled capacitor series from the in-process memory, the cache file or by parsing the datasheet csv files.
+
+    :param capacitor_series_name: name of the capacitor series
+    :type capacitor_series_name: str
+    :param film_capacitor_series_path: directory of the capacitor series csv files
+    :type film_capacitor_series_path: pathlib.Path
+    :param cache_directory: directory of the cache files
+    :type cache_directory: pathlib.Path
+    :return: compiled capacitor series, not to be modified
+    :rtype: FilmCapacitorSeriesTuple
+    """
+    fingerprint = _catalog_fingerprint(film_capacitor_series_path)
+    memory_key = str(film_capacitor_series_path.absolute())
+    memory_entry = _catalog_memory.get(memory_key)
+    if memory_entry is not None and memory_entry[0] == fingerprint:
+        return memory_entry[1]
+
+    # '*' is not allowed in file names on all operating systems
+    cache_file = cache_directory / f"{capacitor_series_name.replace('*', '_')}.pkl"
+    catalog = _read_catalog_cache_file(cache_file, fingerprint)
+    if catalog is None:
+        logger.debug(f"Compile capacitor catalog {capacitor_series_name}.")
+        catalog = _parse_dc_film_capacitors(capacitor_series_name, film_capacitor_series_path)
+        _write_catalog_cache_file(cache_file, fingerprint, catalog)
+    _catalog_memory[memory_key] = (fingerprint, catalog)
+    return catalog
+
+def _catalog_cache_directory(data_directory: str | pathlib.Path | None = None) -> pathlib.Path:
+    """
+    Get the directory of the compiled catalog cache files.
+
+    :param data_directory: directory of the capacitor data, defaults to the capacitor data of the package
+    :type data_directory: str | pathlib.Path | None
+    :return: 'catalog_cache' directory of the package or inside the data directory
+    :rtype: pathlib.Path
+    """
+    if data_directory is None:
+        return pathlib.Path(__file__).parent / const.CATALOG_CACHE_DIRECTORY
+    return pathlib.Path(data_directory) / const.CATALOG_CACHE_DIRECTORY
+
+def load_dc_film_capacitors(capacitor_series_name: str, use_cache: bool = True, data_directory: str | pathlib.Path | None = None) -> FilmCapacitorSeriesTuple:
+    """
+    Load dc film capacitors from the database.
+
+    The parsed capacitor series is kept in memory and in a compiled cache file inside the 'catalog_cache' directory of
+    the package, or of the data directory for own capacitor data. Both are invalidated automatically in case a datasheet
+    csv file of the series changes.
+
+    :param capacitor_series_name: name of the capacitor series to download
+    :type capacitor_series_name: str
+    :param use_cache: False to parse the datasheet csv files without using the cache. Defaults to True.
+    :type use_cache: bool
+    :param data_directory: directory containing a sub-directory with the csv files per capacitor series.
+        Defaults to the capacitor data of the package.
+    :type data_directory: str | pathlib.Path | None
+    :return: capacitor data, self-heating data, derating data, dv/dt data, lifetime derating list
+    :rtype: tuple[pandas.DataFrame, pandas.DataFrame, pandas.DataFrame, pandas.DataFrame, list[LifetimeDerating]]
+    """
+    if data_directory is None:
+        film_capacitor_series_path = pathlib.Path(__file__).parent / const.FOIL_CAPACITOR_DATA_DIRECTORY / capacitor_series_name
+    else:
+        film_capacitor_series_path = pathlib.Path(data_directory) / capacitor_series_name
+    if not use_cache:
+        return _parse_dc_film_capacitors(capacitor_series_name, film_capacitor_series_path)
+    return _copy_catalog(_load_catalog(capacitor_series_name, film_capacitor_series_path, _catalog_cache_directory(data_directory)))
+
+def clear_catalog_cache(data_directory: str | pathlib.Path | None = None) -> None:
+    """
+    Drop the in-process memory and the cache files of the compiled capacitor series.
+
+    :param data_directory: directory of own capacitor data to drop its cache files, defaults to the capacitor data of the package
+    :type data_directory: str | pathlib.Path | None
+    """
+    _catalog_memory.clear()
+    for cache_file in _catalog_cache_directory(data_directory).glob("*.pkl"):
+        cache_file.unlink(missing_ok=True)
+
 
 if __name__ == "__main__":
     # c_df, sh_df, c_derating, dvdt_df, l_dto_list = load_dc_film_capacitors("B3272*AGT")
@@ -0,0 +1,226 @@
+"""Destinations for the selection results."""
+
+# python libraries
+import abc
+import collections
+import importlib.util
+import logging
+import pathlib
+import queue
+import threading
+
+# 3rd party libraries
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class ResultSink(abc.ABC):
+    """
+    Destination for the selection results.
+
+    Derived sinks must implement write(). A result sink can be used as a context manager. Leaving the context waits until
+    all results are written, also in case of an exception.
+    """
+
+    @abc.abstractmethod
+    def write(self, name: str, result_df: pd.DataFrame) -> None:
+        """
+        Hand over a result data frame to the sink.
+
+        :param name: result name, e.g. the capacitor series name
+        :type name: str
+        :param result_df: result data frame
+        :type result_df: pd.DataFrame
+        """
+
+    def flush(self) -> None:
+        """Wait until all results handed over to the sink are written."""
+
+    def close(self) -> None:
+        """Write all outstanding results and release the resources of the sink."""
+        self.flush()
+
+    def __enter__(self) -> "ResultSink":
+        """
+        Enter the context.
+
+        :return: the result sink itself
+        :rtype: ResultSink
+        """
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """
+        Leave the context and close the sink.
+
+        :param args: exception information, unused
+        :type args: object
+        """
+        self.close()
+
+
+class NoResultSink(ResultSink):
+    """Discard all results, e.g. for parameter sweeps where the results are processed in memory."""
+
+    def write(self, name: str, result_df: pd.DataFrame) -> None:
+        """
+        Discard the result data frame.
+
+        :param name: result name, e.g. the capacitor series name
+        :type name: str
+        :param result_df: result data frame
+        :type result_df: pd.DataFrame
+        """
+
+
+class MemoryResultSink(ResultSink):
+    """Keep the results in memory. Results with the same name overwrite each other, same as for files."""
+
+    def __init__(self) -> None:
+        self.results: dict[str, pd.DataFrame] = {}
+
+    def write(self, name: str, result_df: pd.DataFrame) -> None:
+        """
+        Keep a copy of the result data frame in the results dictionary.
+
+        :param name: result name, e.g. the capacitor series name
+        :type name: str
+        :param result_df: result data frame
+        :type result_df: pd.DataFrame
+        """
+        self.results[name] = result_df.copy()
+
+
+class FileResultSink(ResultSink):
+    """
+    Write the results as 'results_<name>.<file_format>' to a directory.
+
+    By default, results with the same name overwrite each other, so a sink shared between many select_capacitors() calls
+    keeps only the results of the last call. For sweeps, use keep_all=True, a MemoryResultSink() or select_capacitors_batch().
+    By default, the files are written by a background thread, so writing does not block the selection.
+    Exceptions of the background thread are raised again by flush() or close().
+    """
+
+    def __init__(self, directory: str | pathlib.Path = "", file_format: str = "csv", background: bool = True, keep_all: bool = False) -> None:
+        """
+        Create a file result sink.
+
+        :param directory: directory to write the files to. Empty string for the current working directory. Created if not existing.
+        :type directory: str | pathlib.Path
+        :param file_format: 'csv'[default] or 'parquet'. 'parquet' needs pyarrow or fastparquet to be installed.
+        :type file_format: str
+        :param background: True[default] to write the files by a background thread, False to write directly
+        :type background: bool
+        :param keep_all: False[default] to overwrite the file of a repeated name. True to keep all results, the repeated
+            results of a name are written as 'results_<name>_<count>.<file_format>' with count 1, 2, ...
+        :type keep_all: bool
+        :raises ValueError: in case of an unknown file format
+        :raises ImportError: in case of parquet without a parquet engine installed
+        """
+        if file_format not in ["csv", "parquet"]:
+            raise ValueError(f"file_format '{file_format}' not available: Must be 'csv' or 'parquet'")
+        if file_format == "parquet" and importlib.util.find_spec("pyarrow") is None and importlib.util.find_spec("fastparquet") is None:
+            raise ImportError("Writing parquet files needs pyarrow or fastparquet to be installed.")
+
+        self.directory = pathlib.Path(directory)
+        self.file_format = file_format
+        self.keep_all = keep_all
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # number of results written per name, to number the repeated names in case of keep_all
+        self._name_counter: collections.Counter = collections.Counter()
+        self._name_counter_lock = threading.Lock()
+
+        self._queue: queue.Queue | None = None
+        self._thread: threading.Thread | None = None
+        self._exception: BaseException | None = None
+        if background:
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._write_from_queue, name="pecst-result-writer", daemon=True)
+            self._thread.start()
+
+    def file_path(self, name: str, count: int = 0) -> pathlib.Path:
+        """
+        Get the file path for a result name.
+
+        :param name: result name, e.g. the capacitor series name
+        :type name: str
+        :param count: number of earlier results of the same name, only used in case of keep_all. Defaults to 0 (first result).
+        :type count: int
+        :return: file path
+        :rtype: pathlib.Path
+        """
+        if count > 0:
+            return self.directory / f"results_{name}_{count}.{self.file_format}"
+        return self.directory / f"results_{name}.{self.file_format}"
+
+    def _write_file(self, file_path: pathlib.Path, result_df: pd.DataFrame) -> None:
+        """
+        Write a single result file.
+
+        :param file_path: file path
+        :type file_path: pathlib.Path
+        :param result_df: result data frame
+        :type result_df: pd.DataFrame
+        """
+        if self.file_format == "csv":
+            result_df.to_csv(file_path)
+        else:
+            result_df.to_parquet(file_path)
+
+    def _write_from_queue(self) -> None:
+        """Write the queued results until the end marker None is received. Runs in the background thread."""
+        if self._queue is None:
+            return
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write_file(*item)
+            except Exception as e:
+                logger.error(f"Error {e} while writing the result file {item[0]}")
+                self._exception = e
+            finally:
+                self._queue.task_done()
+
+    def write(self, name: str, result_df: pd.DataFrame) -> None:
+        """
+        Write the result data frame to a file, in the background if enabled.
+
+        :param name: result name, e.g. the capacitor series name
+        :type name: str
+        :param result_df: result data frame
+        :type result_df: pd.DataFrame
+        :raises RuntimeError: in case the sink is already closed
+        """
+        if self._queue is not None and (self._thread is None or not self._thread.is_alive()):
+            raise RuntimeError("Result sink is already closed.")
+        # the file name is given on writing, so the numbering follows the order of the write() calls
+        with self._name_counter_lock:
+            file_path = self.file_path(name, self._name_counter[name] if self.keep_all else 0)
+            self._name_counter[name] += 1
+        if self._queue is None:
+            self._write_file(file_path, result_df)
+        else:
+            # copy, as the caller may modify the data frame while the background thread writes it
+            self._queue.put((file_path, result_df.copy()))
+
+    def flush(self) -> None:
+        """
+        Wait until all results handed over to the sink are written.
+
+        :raises RuntimeError: in case writing a file in the background thread failed
+        """
+        if self._queue is not None:
+            self._queue.join()
+        if self._exception is not None:
+            exception, self._exception = self._exception, None
+            raise RuntimeError("Writing a result file failed.") from exception
+
+    def close(self) -> None:
+        """Write all outstanding results and stop the background thread."""
+        if self._thread is not None and self._thread.is_alive() and self._queue is not None:
+            self._queue.put(None)
+            self._thread.join()
+        self.flush()
@@ -1,53 +1,59 @@
 """Misc calculations."""
 # python libraries
+import concurrent.futures
+import dataclasses
+import functools
+import itertools
 import logging
-import pathlib
+from collections.abc import Callable
+from typing import Any
 
 # 3rd party libraries
 import numpy as np
 import pandas as pd
-from matplotlib import pyplot as plt
 
 # own libraries
-from pecst.cst_dataclasses import CapacitorRequirements, CalculatedRequirementsValues
-from pecst.functions import fft
-from pecst.read_capacitor_database import load_dc_film_capacitors
-from pecst.power_loss import power_loss_film_capacitor
+from pecst.cst_dataclasses import (CapacitorRequirements, CalculatedRequirementsValues, LifetimeDerating, CapacitorSeriesData,
+                                   SelectionConstraints)
+from pecst.functions import fft_batch
+from pecst.catalog import CapacitorCatalog, FoilCapacitorCatalog, SortedIndex
+from pecst.power_loss import (power_loss_film_capacitor, power_loss_film_capacitor_vectorized,
+                              read_capacitor_frequency_dependent_limits_at_frequencies)
 import pecst.constants as const
 import pecst.cost_models as cost
-from pecst.current_capability import current_capability_film_capacitor
-from pecst.lifetime import voltage_rating_due_to_lifetime
-from pecst.dvdt import calc_parallel_capacitors_dvdt
+from pecst.result_sink import ResultSink
+from pecst.current_capability import current_capability_film_capacitor, current_capability_film_capacitor_vectorized
+from pecst.lifetime import LifetimeDeratingSurface, voltage_rating_due_to_lifetime
+from pecst.dvdt import calc_parallel_capacitors_dvdt_vectorized, get_dvdt_max_vectorized
 
 logger = logging.getLogger(__name__)
 
 
 def integrate(time: np.ndarray, data: np.ndarray) -> np.ndarray:
     """
-    Integrate a given time series.
+    Integrate a given time series by the cumulative trapezoidal rule.
 
-    :param time: list of time
+    The time steps may be non-uniform. Several time series can be integrated at once, the time is along the last axis.
+    NaN values in data are treated as zero.
+
+    :param time: list of time, 1-D for a time base shared by all time series or same shape as data
     :type time: np.ndarray
-    :param data: list of data
+    :param data: list of data, 1-D or N-D with one time series per row
     :type data: np.ndarray
+    :return: integrated data, same shape as data, starting with zero
+    :rtype: np.ndarray
     """
-    time_step = time[1] - time[0]
-    integrated_data = np.array([])
-    for count, _ in enumerate(time):
-        if count == 0:
-            # set first energy value to zero
-            integrated_data = np.append(integrated_data, 0)
-        else:
-            # using euler method
-            integrated_time_step = (np.nan_to_num(data[count]) + np.nan_to_num(data[count - 1])) / 2 * time_step
-            integrated_data = np.append(integrated_data, integrated_data[-1] + integrated_time_step)
-
-    return integrated_data
+    data = np.nan_to_num(np.asarray(data, dtype=float))
+    integrated_time_step = (data[..., 1:] + data[..., :-1]) / 2 * np.diff(np.asarray(time, dtype=float), axis=-1)
+    return np.concatenate([np.zeros(data.shape[:-1] + (1,)), np.cumsum(integrated_time_step, axis=-1)], axis=-1)
 
 def calculate_from_requirements(capacitor_requirements: CapacitorRequirements, debug: bool = False) -> CalculatedRequirementsValues:
     """
     Values and requirements for further calculations needed from the input values.
 
+    The voltage ripple of a capacitor is the peak-to-peak charge divided by the capacitance, so the minimum capacitance
+    is calculated directly from a single charge integration.
+
     :param capacitor_requirements: capacitor requirements and input values in a DTO
     :type capacitor_requirements: CapacitorRequirements
     :param debug: True to show debug plots
@@ -60,32 +66,18 @@ def calculate_from_requirements(capacitor_requirements: CapacitorRequirements, d
     new_current_sample_rate = np.interp(new_time_sample_rate, capacitor_requirements.current_waveform_for_op_max_current[0],
                                         capacitor_requirements.current_waveform_for_op_max_current[1])
 
-    # experimentally figure out c_min
-    c_min = 1e-9
-    c_max = 1e3
-    for _ in np.linspace(1, 50, 50):
-        charge = integrate(new_time_sample_rate, new_current_sample_rate)
-        v_c_at_c_max = charge / c_max
-        v_c_at_c_min = charge / c_min
-        # this is the logarithmic mid between c_min and c_max
-        c_mid = np.sqrt(c_min * c_max)
-        v_c_at_c_mid = charge / c_mid
-
-        v_ripple_at_c_mid = np.max(v_c_at_c_mid) - np.min(v_c_at_c_mid)
-
-        if v_ripple_at_c_mid > capacitor_requirements.maximum_peak_to_peak_voltage_ripple:
-            c_min = c_mid
-        else:
-            c_max = c_mid
+    charge = integrate(new_time_sample_rate, new_current_sample_rate)
+    c_min = (np.max(charge) - np.min(charge)) / capacitor_requirements.maximum_peak_to_peak_voltage_ripple
 
     i_rms = np.sqrt(np.mean(capacitor_requirements.current_waveform_for_op_max_current[1] ** 2))
 
     if debug:
+        # matplotlib is imported on demand, to keep the package import fast
+        from matplotlib import pyplot as plt
+
         fig, ax = plt.subplots(nrows=3, ncols=1)
         ax[0].plot(new_time_sample_rate, new_current_sample_rate)
-        ax[1].plot(new_time_sample_rate, v_c_at_c_max, label="c_max")
-        ax[1].plot(new_time_sample_rate, v_c_at_c_min, label="c_min")
-        ax[1].plot(new_time_sample_rate, v_c_at_c_mid, label="c_mid")
+        ax[1].plot(new_time_sample_rate, charge / c_min, label="c_min")
 
         ax[0].grid()
         ax[0].set_ylabel("Current / A")
@@ -98,7 +90,7 @@ def calculate_from_requirements(capacitor_requirements: CapacitorRequirements, d
         plt.show()
 
     return CalculatedRequirementsValues(
-        requirement_c_min=c_mid,
+        requirement_c_min=c_min,
         i_rms=i_rms,
         i_max=np.max(capacitor_requirements.current_waveform_for_op_max_current[1])
     )
@@ -123,6 +115,20 @@ def get_temperature_current_derating_factor(ambient_temperature: float, df_derat
         derating_factor = np.interp(ambient_temperature, df_derating["temperature"], df_derating["derating_factor"])
     return derating_factor
 
+def _dimension_key(dimension_df: pd.DataFrame) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Quantize the case dimensions to integer micrometres, as join key for the thermal coefficient table.
+
+    :param dimension_df: data frame with the columns 'width_in_m', 'length_in_m' and 'height_in_m'
+    :type dimension_df: pd.DataFrame
+    :return: data frame with the integer dimensions in µm, True for each row with all dimensions available
+    :rtype: tuple[pd.DataFrame, np.ndarray]
+    """
+    dimension_array = dimension_df[["width_in_m", "length_in_m", "height_in_m"]].to_numpy(dtype=float) * const.NORM_TO_MICRO
+    is_available = np.all(np.isfinite(dimension_array), axis=1)
+    dimension_array = np.rint(np.where(is_available[:, np.newaxis], dimension_array, 0)).astype(np.int64)
+    return pd.DataFrame(dimension_array, columns=["width_in_um", "length_in_um", "height_in_um"]), is_available
+
 def get_equivalent_heat_coefficient(df: pd.DataFrame, width: float, length: float, height: float) -> float:
     """
     Read the thermal equivalent heat coefficient (from data sheet).
@@ -138,18 +144,1079 @@ def get_equivalent_heat_coefficient(df: pd.DataFrame, width: float, length: floa
     :return: thermal equivalent coefficient
     :rtype: float
     """
-    thermal_coefficient_series = df["g_in_W_degreeCelsius"].loc[(df["width_in_m"] == width) & (df["length_in_m"] == length) & (df["height_in_m"] == height)]
+    return float(get_equivalent_heat_coefficient_vectorized(df, np.array([width]), np.array([length]), np.array([height]))[0])
+
+def get_equivalent_heat_coefficient_vectorized(df: pd.DataFrame, width: np.ndarray, length: np.ndarray, height: np.ndarray) -> np.ndarray:
+    """
+    Read the thermal equivalent heat coefficient (from data sheet) for many capacitors at once.
+
+    Vectorized version of get_equivalent_heat_coefficient(). The table is joined on the case dimensions quantized to integer
+    micrometres in a single merge. Dimensions without exactly one entry in the table result in NaN and are logged together.
+
+    :param df: dataframe with equivalent self-heating coefficient based on the capacitor housing dimensions.
+    :type df: pandas.DataFrame
+    :param width: capacitor width in meter
+    :type width: np.ndarray
+    :param length: capacitor length in meter
+    :type length: np.ndarray
+    :param height: capacitor height in meter
+    :type height: np.ndarray
+    :return: thermal equivalent coefficient for each capacitor
+    :rtype: np.ndarray
+    """
+    dimension_df = pd.DataFrame({"width_in_m": np.asarray(width, dtype=float), "length_in_m": np.asarray(length, dtype=float),
+                                 "height_in_m": np.asarray(height, dtype=float)})
+    key_df, is_available = _dimension_key(dimension_df)
+
+    table_key_df, is_table_available = _dimension_key(df)
+    table_key_df["g_in_W_degreeCelsius"] = df["g_in_W_degreeCelsius"].to_numpy(dtype=float)
+    # dimensions with several entries in the table have no unique thermal coefficient
+    table_key_df = table_key_df[is_table_available].drop_duplicates(subset=list(key_df.columns), keep=False)
+
+    thermal_coefficient: np.ndarray = key_df.merge(table_key_df, how="left", on=list(key_df.columns))["g_in_W_degreeCelsius"].to_numpy(dtype=float)
+    thermal_coefficient[~is_available] = np.nan
+    if np.any(np.isnan(thermal_coefficient)):
+        logger.info(f"{np.count_nonzero(np.isnan(thermal_coefficient))} values can not be found in the thermal coefficient database. "
+                    "Something must be wrong with the table data.\n"
+                    f"{dimension_df[np.isnan(thermal_coefficient)].to_numpy().tolist()}")
+
+    return thermal_coefficient
+
+def _interpolate_rows(x: np.ndarray, xp: list[float], fp: np.ndarray) -> np.ndarray:
+    """
+    Linear interpolation at the points x for every row of fp. Same result as np.interp(x[i], xp, fp[row]) for each point and row.
+
+    :param x: points to interpolate at
+    :type x: np.ndarray
+    :param xp: increasing data points, same for all rows
+    :type xp: list[float]
+    :param fp: data values of shape (number of rows, len(xp))
+    :type fp: np.ndarray
+    :return: interpolated values of shape (len(x), number of rows)
+    :rtype: np.ndarray
+    """
+    x = np.asarray(x, dtype=float).reshape(-1, 1)
+    xp_array = np.asarray(xp, dtype=float)
+
+    # index of the left data point, clipped to the inner intervals. Points outside xp are set below.
+    index = np.clip(np.searchsorted(xp_array, x[:, 0], side="right") - 1, 0, len(xp_array) - 2)
+    slope = (fp[:, index + 1] - fp[:, index]).T / (xp_array[index + 1] - xp_array[index]).reshape(-1, 1)
+    interpolated = slope * (x - xp_array[index].reshape(-1, 1)) + fp[:, index].T
+
+    interpolated = np.where(x <= xp_array[0], fp[:, 0], interpolated)
+    interpolated = np.where(x >= xp_array[-1], fp[:, -1], interpolated)
+    return interpolated
+
+def _select_capacitor_series_apply(c_db: pd.DataFrame, c_thermal: pd.DataFrame, dvdt_df: pd.DataFrame, lt_dto_list: list[LifetimeDerating],
+                                   c_requirements: CapacitorRequirements, calculated_boundaries: CalculatedRequirementsValues,
+                                   frequency_list: np.ndarray, current_amplitude_list: np.ndarray, derating_factor: float,
+                                   delta_temperature_max: float) -> pd.DataFrame:
+    """
+    Select suitable capacitors of a single capacitor series, evaluated row-by-row (reference engine).
+
+    :param c_db: capacitor database of the series
+    :type c_db: pd.DataFrame
+    :param c_thermal: self-heating database of the series
+    :type c_thermal: pd.DataFrame
+    :param dvdt_df: dv/dt database of the series
+    :type dvdt_df: pd.DataFrame
+    :param lt_dto_list: lifetime_h DTO list of the series
+    :type lt_dto_list: list[LifetimeDerating]
+    :param c_requirements: capacitor requirements
+    :type c_requirements: CapacitorRequirements
+    :param calculated_boundaries: calculated requirements and values
+    :type calculated_boundaries: CalculatedRequirementsValues
+    :param frequency_list: frequencies of the current spectrum in Hz
+    :type frequency_list: np.ndarray
+    :param current_amplitude_list: current amplitudes of the current spectrum in A
+    :type current_amplitude_list: np.ndarray
+    :param derating_factor: temperature current derating factor
+    :type derating_factor: float
+    :param delta_temperature_max: maximum allowed self-heating in Kelvin
+    :type delta_temperature_max: float
+    :return: pandas data frame with all possible capacitors of this series
+    :rtype: pandas.DataFrame
+    """
+    # The interpolation is made at the given datasheet temperatures of 85 °C, 105 °C and 125 °C. This is same for all capacitors in the database.
+    # the voltage rating is for t_op = t_ambient + delta_t_self_heating (see datasheet).
+    # This is the reason to estimate the maximum inner allowed operating temperature
+    virtual_inner_max_temperature = c_requirements.temperature_ambient + delta_temperature_max
+    c_db['V_op_max_virt'] = c_db.apply(
+        lambda x, v_i_t=virtual_inner_max_temperature:
+        np.interp(v_i_t, [const.TEMPERATURE_85, const.TEMPERATURE_105, const.TEMPERATURE_125],
+                  [x["V_R_85degree"], x["V_op_105degree"], x["V_op_125degree"]]), axis=1)
+
+    # voltage lifetime_h derating
+    c_db["voltage_lifetime"] = c_db.apply(lambda x, v_i_t=virtual_inner_max_temperature, lt_dto_list=lt_dto_list: voltage_rating_due_to_lifetime(
+        target_lifetime=c_requirements.lifetime_h, operating_temperature=float(v_i_t),
+        voltage_rating=x["V_R_85degree"], lt_dto_list=lt_dto_list), axis=1)
+    c_db = c_db.drop(c_db[np.isnan(c_db["voltage_lifetime"])].index)
+
+    c_db["factor_lifetime"] = c_db["voltage_lifetime"] / c_db["V_R_85degree"]
 
-    if len(thermal_coefficient_series.values) != 1:
-        thermal_coefficient = np.nan
-        logger.info("Value can not be found in the thermal coefficient database. Something must be wrong with the table data.\n"
-                    f"{width=}, {height=}, {length=}")
+    # voltage: calculate the number of needed capacitors in a series connection
+    # the voltage rating is for t_op = t_ambient + delta_t_self_heating (see datasheet)
+    c_db["in_series_needed"] = np.ceil(c_requirements.v_dc_for_op_max_voltage / (c_db['V_op_max_virt'] * c_db["factor_lifetime"] * \
+                                                                                 (1 + c_requirements.voltage_safety_margin_percentage / 100)))
+    # drop series connection capacitors more than specified
+    c_db = c_db.drop(c_db[c_db["in_series_needed"] > c_requirements.maximum_number_series_capacitors].index)
+
+    if len(c_db["capacitance"]) == 0:
+        # all capacitors are sorted out due to lifetime ratings. Add empty keys
+        c_db["volume_total"] = np.nan
+        c_db["power_loss_total"] = np.nan
     else:
-        thermal_coefficient = float(thermal_coefficient_series.values[0])
+        # capacitance: calculate the number of parallel capacitors needed to meet the capacitance requirement
+        c_db["in_parallel_needed"] = np.ceil(
+            calculated_boundaries.requirement_c_min / (c_db["capacitance"] * \
+                                                       (1 - c_requirements.capacitor_tolerance_percent / 100) / c_db["in_series_needed"]))
+
+        # dv/dt: calculate the number of parallel capacitors needed to meet the dv/dt requirement
+        # the dv/dt table is joined once for all capacitors, so missing table data is reported once
+        c_db["in_parallel_needed_dvdt"] = calc_parallel_capacitors_dvdt_vectorized(
+            c_db["capacitance"].to_numpy(), c_db["V_R_85degree"].to_numpy(), calculated_boundaries.i_max, dvdt_df, c_db["ordering code"].to_numpy())
+
+        # current: calculate the number of parallel capacitors needed to meet the current requirement
+        c_db["parallel_current_capacitors_needed"] = c_db.apply(lambda x, der_f=derating_factor: current_capability_film_capacitor(
+            order_number=x["ordering code"], frequency_list=frequency_list, current_amplitude_list=current_amplitude_list, derating_factor=der_f),
+            axis=1)
+
+        # check if parallel capacitors due to current needed is more than due to capacitance needed
+        index_dvdt = c_db["in_parallel_needed_dvdt"] > c_db["in_parallel_needed"]
+        c_db.loc[index_dvdt, "in_parallel_needed"] = c_db.loc[index_dvdt, "in_parallel_needed_dvdt"]
+
+        # check if parallel capacitors due to current needed is more than due to capacitance needed
+        index_ripple_current = c_db["parallel_current_capacitors_needed"] > c_db["in_parallel_needed"]
+        c_db.loc[index_ripple_current, "in_parallel_needed"] = c_db.loc[index_ripple_current, "parallel_current_capacitors_needed"]
+        c_db = c_db.drop(columns=["parallel_current_capacitors_needed", "in_parallel_needed_dvdt"])
+
+        # volume calculation
+        c_db["volume_total"] = c_db["in_parallel_needed"] * c_db["in_series_needed"] * c_db["volume"]
+
+        # filter by resonance frequency: drop capacitors with resonance frequency lower than the current 1st harmonic frequency.
+        # ESL_total = L * n_serial / n_parallel
+        # C_total = C * n_parallel / n_serial
+        # ESL_total * C_total = L * C !!! To estimate the resonance frequency, it does not matter how the series and parallel connection is.
+        c_db["f_res"] = 1 / (2 * np.pi * np.sqrt(c_db["capacitance"] * c_db["ESL_in_H"]))
+        c_db = c_db.drop(c_db[c_db["f_res"] < frequency_list[0]].index)
 
-    return float(thermal_coefficient)
+        # loss calculation per capacitor
+        c_db["power_loss_per_capacitor"] = c_db.apply(lambda x: power_loss_film_capacitor(x["ordering code"], frequency_list, current_amplitude_list,
+                                                                                          x["in_parallel_needed"]), axis=1)
+        # loss calculation for all capacitors
+        c_db.loc[:, 'power_loss_total'] = c_db.loc[:, 'power_loss_per_capacitor'] * c_db["in_parallel_needed"] * c_db["in_series_needed"]
+
+        # self heating calculation
+        # g_in_W_degreeCelsius is the equivalent heat coefficient according to the data sheet
+        c_db['g_in_W_degreeCelsius'] = get_equivalent_heat_coefficient_vectorized(
+            c_thermal, c_db["width_in_m"].to_numpy(), c_db["length_in_m"].to_numpy(), c_db["height_in_m"].to_numpy())
+        c_db = c_db.drop(c_db[np.isnan(c_db["g_in_W_degreeCelsius"])].index)
+        c_db["delta_temperature"] = c_db['power_loss_total'] / c_db['g_in_W_degreeCelsius']
+
+        # drop too high self-heated capacitors
+        c_db = c_db.drop(c_db[c_db["delta_temperature"] > delta_temperature_max].index)
+
+        # calculate component cost according to cost models
+        c_db["cost"] = c_db["in_parallel_needed"] * c_db["in_series_needed"] * \
+            c_db.apply(lambda x: cost.cost_film_capacitor(x["V_R_85degree"], x["capacitance"]), axis=1)
+
+        # calculate minimum required PCB area
+        c_db["area_total"] = c_db["area"] * c_db["in_parallel_needed"] * c_db["in_series_needed"]
+
+    return c_db
+
+def _waveform_key(current_waveform: np.ndarray) -> tuple:
+    """
+    Hashable key of a current waveform, to share the waveform dependent calculations (FFT, minimum capacitance).
+
+    :param current_waveform: current waveform [[time-vector], [current-vector]]
+    :type current_waveform: np.ndarray
+    :return: hashable key
+    :rtype: tuple
+    """
+    current_waveform = np.asarray(current_waveform, dtype=float)
+    return current_waveform.shape, current_waveform.tobytes()
+
+def _empty_series_stage_result(result_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return the result in case all capacitors are sorted out due to lifetime ratings or the maximum number of series capacitors.
+
+    :param result_df: result data frame of the vectorized engine
+    :type result_df: pd.DataFrame
+    :return: empty data frame including the keys of the series stage and empty result keys
+    :rtype: pd.DataFrame
+    """
+    result_df = result_df.iloc[0:0].drop(columns=["in_parallel_needed", "f_res", "power_loss_per_capacitor", "g_in_W_degreeCelsius",
+                                                  "delta_temperature", "cost", "area_total"])
+    for column in ["V_op_max_virt", "voltage_lifetime", "factor_lifetime", "in_series_needed", "volume_total", "power_loss_total"]:
+        result_df[column] = np.array([], dtype=float)
+    return result_df
+
+def _is_within_constraints(constraints: SelectionConstraints, volume_total: np.ndarray, cost_total: np.ndarray, area_total: np.ndarray,
+                           number_capacitors: np.ndarray) -> np.ndarray:
+    """
+    Check the capacitor designs against the user constraints.
 
-def select_capacitors(c_requirements: CapacitorRequirements) -> tuple[list[str], list[pd.DataFrame]]:
+    :param constraints: user constraints
+    :type constraints: SelectionConstraints
+    :param volume_total: total volume in m³ for each design
+    :type volume_total: np.ndarray
+    :param cost_total: total cost in euro for each design
+    :type cost_total: np.ndarray
+    :param area_total: total PCB area in m² for each design
+    :type area_total: np.ndarray
+    :param number_capacitors: total number of capacitors for each design
+    :type number_capacitors: np.ndarray
+    :return: True for each design within all constraints
+    :rtype: np.ndarray
+    """
+    is_within = np.ones(len(volume_total), dtype=bool)
+    for value, maximum_value in [(volume_total, constraints.maximum_volume), (cost_total, constraints.maximum_cost),
+                                 (area_total, constraints.maximum_area), (number_capacitors, constraints.maximum_number_capacitors)]:
+        if maximum_value is not None:
+            is_within &= ~(value > maximum_value)
+    return is_within
+
+
+# maximum number of memoized stage results per series cache, the least recently used result is dropped first
+_WAVEFORM_MEMORY_SIZE = 16
+_REQUIREMENT_MEMORY_SIZE = 4096
+
+# relative widening of the range query bounds against rounding, see _candidate_capacitor_pairs()
+_RANGE_QUERY_TOLERANCE = 1e-9
+
+# temperature resolution in degree Celsius of the coupled electro-thermal solve, temperatures are rounded up to this step
+_SELF_HEATING_TEMPERATURE_STEP = 1.0
+
+
+def _get_memoized(memory: dict, key: tuple, calculate: Callable, maximum_size: int) -> Any:
+    """
+    Get a value from a size limited memory, calculate and store it if not available.
+
+    :param memory: memory, ordered from least to most recently used
+    :type memory: dict
+    :param key: key of the value
+    :type key: tuple
+    :param calculate: function without arguments to calculate the value
+    :type calculate: Callable
+    :param maximum_size: maximum number of values in the memory
+    :type maximum_size: int
+    :return: value
+    :rtype: Any
+    """
+    if key in memory:
+        memory[key] = memory.pop(key)
+    else:
+        memory[key] = calculate()
+        if len(memory) > maximum_size:
+            del memory[next(iter(memory))]
+    return memory[key]
+
+class _SeriesCache:
+    """
+    Per-capacitor values and memoized stage results of a single capacitor series.
+
+    The per-capacitor values only depend on the database and are calculated once. The stage results are memoized by the
+    requirement values they depend on:
+     - current derating factor: temperature_ambient
+     - voltage due to lifetime: lifetime_h and the virtual inner temperature (temperature_ambient)
+     - ESR and current capability at the spectrum frequencies: current_waveform_for_op_max_current
+     - parallel capacitors due to current: current_waveform_for_op_max_current and temperature_ambient
+    So consecutive selections only recalculate the stages affected by the changed requirement values. All other stages
+    (series connection, capacitance, dv/dt, volume, cost, loss, self-heating) are cheap array operations and calculated every time.
+    """
+
+    def __init__(self, series_data: CapacitorSeriesData) -> None:
+        """
+        Calculate the per-capacitor values of a capacitor series.
+
+        :param series_data: capacitor series data
+        :type series_data: CapacitorSeriesData
+        """
+        c_db = series_data.c_db
+        self.series_data = series_data
+        self.voltage_rating = c_db["V_R_85degree"].to_numpy()
+        self.voltage_points = c_db[["V_R_85degree", "V_op_105degree", "V_op_125degree"]].to_numpy(dtype=float)
+        self.capacitance = c_db["capacitance"].to_numpy(dtype=float)
+        self.ordering_code = c_db["ordering code"].to_numpy()
+        self.volume = c_db["volume"].to_numpy(dtype=float)
+        self.area = c_db["area"].to_numpy(dtype=float)
+        self.cost = np.asarray(cost.cost_film_capacitor(self.voltage_rating, self.capacitance))
+        self.esl = c_db["ESL_in_H"].to_numpy(dtype=float)
+        self.f_res = 1 / (2 * np.pi * np.sqrt(self.capacitance * self.esl))
+        self.dvdt_max = get_dvdt_max_vectorized(self.voltage_rating, series_data.dvdt_df, self.ordering_code)
+        # g_in_W_degreeCelsius is the equivalent heat coefficient according to the data sheet
+        self.g_in_w_degree_celsius = get_equivalent_heat_coefficient_vectorized(
+            series_data.c_thermal, c_db["width_in_m"].to_numpy(), c_db["length_in_m"].to_numpy(), c_db["height_in_m"].to_numpy())
+        # lifetime curves are available from this temperature on
+        self.lifetime_temperature_min = min(lt_dto.temperature for lt_dto in series_data.lt_dto_list)
+        # lifetime curves of all voltage ratings, compiled once for all lifetime and temperature requirements
+        self.lifetime_derating_surface = LifetimeDeratingSurface(series_data.lt_dto_list)
+
+        # sorted indexes to narrow down the capacitors by range queries before the per-capacitor calculation
+        self.voltage_rating_index = SortedIndex(self.voltage_rating)
+        self.capacitance_index = SortedIndex(self.capacitance)
+        self.volume_index = SortedIndex(self.volume)
+        # upper bound of v_op_max_virt * factor_lifetime / voltage_rating for all temperatures and lifetimes: the operating voltage
+        # is interpolated between the voltage points and the voltage due to the lifetime never exceeds the lifetime curves
+        lifetime_voltage_max: dict[float, float] = {}
+        for lt_dto in series_data.lt_dto_list:
+            lifetime_voltage_max[lt_dto.voltage] = max(lifetime_voltage_max.get(lt_dto.voltage, -np.inf), float(np.max(lt_dto.lifetime["voltage"])))
+        voltage_lifetime_max = np.array([lifetime_voltage_max.get(voltage_rating, np.inf) for voltage_rating in self.voltage_rating], dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            voltage_factor_max = np.max(np.max(self.voltage_points, axis=1) * voltage_lifetime_max / self.voltage_rating ** 2, initial=-np.inf)
+        # no voltage range query, in case the bound is not available (e.g. missing lifetime curves or data)
+        self.voltage_factor_max = float(voltage_factor_max) if np.isfinite(voltage_factor_max) and voltage_factor_max > 0 else np.inf
+
+        self._derating_memory: dict = {}
+        self._lifetime_memory: dict = {}
+        self._limits_memory: dict = {}
+        self._current_capability_memory: dict = {}
+
+    def candidate_capacitors(self, voltage_rating_min: float = -np.inf, capacitance_min: float = -np.inf, volume_max: float = np.inf) -> np.ndarray:
+        """
+        Get the capacitors within all value ranges, using the sorted indexes.
+
+        The index with the fewest capacitors in its range is queried by a binary search, the other ranges are only checked for
+        the found capacitors. Infinite bounds are not checked, so capacitors with missing values are kept in this case.
+
+        :param voltage_rating_min: minimum rated voltage in V
+        :type voltage_rating_min: float
+        :param capacitance_min: minimum capacitance in F
+        :type capacitance_min: float
+        :param volume_max: maximum volume in m³
+        :type volume_max: float
+        :return: ascending capacitor indices
+        :rtype: np.ndarray
+        """
+        query_list = [(index, minimum, maximum) for index, minimum, maximum in [
+            (self.voltage_rating_index, voltage_rating_min, np.inf), (self.capacitance_index, capacitance_min, np.inf),
+            (self.volume_index, -np.inf, volume_max)] if minimum > -np.inf or maximum < np.inf]
+        if not query_list:
+            return np.arange(len(self.capacitance))
+
+        query_list.sort(key=lambda query: query[0].count(query[1], query[2]))
+        capacitor_index = query_list[0][0].range(query_list[0][1], query_list[0][2])
+        for index, minimum, maximum in query_list[1:]:
+            capacitor_index = capacitor_index[index.is_in_range(capacitor_index, minimum, maximum)]
+        return np.sort(capacitor_index)
+
+    def derating_factor(self, temperature_ambient: float) -> float:
+        """
+        Get the current derating factor.
+
+        :param temperature_ambient: ambient temperature in degree Celsius
+        :type temperature_ambient: float
+        :return: current derating factor
+        :rtype: float
+        """
+        return float(_get_memoized(self._derating_memory, (temperature_ambient,), lambda: get_temperature_current_derating_factor(
+            ambient_temperature=temperature_ambient, df_derating=self.series_data.c_derating), _REQUIREMENT_MEMORY_SIZE))
+
+    def voltage_lifetime(self, lifetime_h: float, temperature: float) -> np.ndarray:
+        """
+        Get the voltage due to the lifetime requirement for all capacitors.
+
+        Temperatures outside the lifetime curves use the curve of the lowest or highest temperature.
+
+        :param lifetime_h: target lifetime in hours
+        :type lifetime_h: float
+        :param temperature: operating temperature in degree Celsius
+        :type temperature: float
+        :return: voltage for each capacitor
+        :rtype: np.ndarray
+        """
+        temperature = max(temperature, self.lifetime_temperature_min)
+        voltage: np.ndarray = _get_memoized(self._lifetime_memory, (lifetime_h, temperature), lambda: self.lifetime_derating_surface.voltage(
+            lifetime_h, temperature, self.voltage_rating), _REQUIREMENT_MEMORY_SIZE)
+        return voltage
+
+    def parallel_capacitors_dvdt(self, i_max: float) -> np.ndarray:
+        """
+        Get the number of parallel capacitors due to the dv/dt limit for all capacitors.
+
+        :param i_max: peak current in A
+        :type i_max: float
+        :return: number of parallel capacitors for each capacitor
+        :rtype: np.ndarray
+        """
+        parallel_capacitors: np.ndarray = np.ceil(i_max / self.dvdt_max / self.capacitance)
+        return parallel_capacitors
+
+    def limits_at_frequencies(self, frequency_list: np.ndarray, needed_capacitors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the ESR and the current capability at the given frequencies. Only the rows of the needed capacitors are guaranteed to be filled.
+
+        :param frequency_list: frequencies in Hz
+        :type frequency_list: np.ndarray
+        :param needed_capacitors: indices of the needed capacitors
+        :type needed_capacitors: np.ndarray
+        :return: ESR matrix in Ohm, current capability matrix in A, both (capacitors x frequencies)
+        :rtype: tuple[np.ndarray, np.ndarray]
+        """
+        esr_matrix, current_capability_matrix, is_loaded = _get_memoized(
+            self._limits_memory, _waveform_key(frequency_list),
+            lambda: (np.full((len(self.capacitance), len(frequency_list)), np.nan), np.full((len(self.capacitance), len(frequency_list)), np.nan),
+                     np.zeros(len(self.capacitance), dtype=bool)), _WAVEFORM_MEMORY_SIZE)
+        missing_capacitors = needed_capacitors[~is_loaded[needed_capacitors]]
+        if len(missing_capacitors) > 0:
+            esr_matrix[missing_capacitors], current_capability_matrix[missing_capacitors] = read_capacitor_frequency_dependent_limits_at_frequencies(
+                list(self.ordering_code[missing_capacitors]), frequency_list)
+            is_loaded[missing_capacitors] = True
+        return esr_matrix, current_capability_matrix
+
+    def parallel_capacitors_current(self, frequency_list: np.ndarray, current_amplitude_list: np.ndarray, derating_factor: float,
+                                    needed_capacitors: np.ndarray) -> np.ndarray:
+        """
+        Get the number of parallel capacitors due to the current capability. Only the values of the needed capacitors are guaranteed to be filled.
+
+        :param frequency_list: frequencies of the current spectrum in Hz
+        :type frequency_list: np.ndarray
+        :param current_amplitude_list: current amplitudes of the current spectrum in A
+        :type current_amplitude_list: np.ndarray
+        :param derating_factor: current derating factor
+        :type derating_factor: float
+        :param needed_capacitors: indices of the needed capacitors
+        :type needed_capacitors: np.ndarray
+        :return: number of parallel capacitors for each capacitor
+        :rtype: np.ndarray
+        """
+        parallel_capacitors: np.ndarray
+        parallel_capacitors, is_calculated = _get_memoized(
+            self._current_capability_memory, (_waveform_key(frequency_list), _waveform_key(current_amplitude_list), derating_factor),
+            lambda: (np.full(len(self.capacitance), np.nan), np.zeros(len(self.capacitance), dtype=bool)), _WAVEFORM_MEMORY_SIZE)
+        missing_capacitors = needed_capacitors[~is_calculated[needed_capacitors]]
+        if len(missing_capacitors) > 0:
+            _, current_capability_matrix = self.limits_at_frequencies(frequency_list, missing_capacitors)
+            parallel_capacitors[missing_capacitors] = current_capability_film_capacitor_vectorized(
+                current_capability_matrix[missing_capacitors], current_amplitude_list, derating_factor)
+            is_calculated[missing_capacitors] = True
+        return parallel_capacitors
+
+def _voltages_at_temperature(series_cache: _SeriesCache, lifetime_h: np.ndarray, temperature: np.ndarray,
+                             capacitor_index: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the temperature dependent operating voltage and the voltage due to the lifetime for (requirement, capacitor) pairs.
+
+    The operating voltages are interpolated once per unique temperature, the voltages due to the lifetime are a single lookup
+    in the lifetime derating surface for all pairs.
+
+    :param series_cache: per-capacitor values and memoized stage results of the capacitor series
+    :type series_cache: _SeriesCache
+    :param lifetime_h: target lifetime in hours for each pair
+    :type lifetime_h: np.ndarray
+    :param temperature: capacitor temperature in degree Celsius for each pair
+    :type temperature: np.ndarray
+    :param capacitor_index: capacitor index for each pair
+    :type capacitor_index: np.ndarray
+    :return: operating voltage, voltage due to the lifetime, for each pair
+    :rtype: tuple[np.ndarray, np.ndarray]
+    """
+    unique_temperature, inverse_index = np.unique(temperature, return_inverse=True)
+    v_op_max_virt = _interpolate_rows(unique_temperature, [const.TEMPERATURE_85, const.TEMPERATURE_105, const.TEMPERATURE_125],
+                                      series_cache.voltage_points)
+    voltage_lifetime = series_cache.lifetime_derating_surface.voltage(
+        lifetime_h, np.maximum(temperature, series_cache.lifetime_temperature_min), series_cache.voltage_rating[capacitor_index])
+    return v_op_max_virt[inverse_index.reshape(-1), capacitor_index], voltage_lifetime
+
+def _candidate_capacitor_pairs(series_cache: _SeriesCache, v_dc: np.ndarray, safety_margin: np.ndarray, maximum_series: np.ndarray,
+                               requirement_c_min: np.ndarray, tolerance: np.ndarray,
+                               constraints: SelectionConstraints | None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the (requirement, capacitor) pairs which may pass the selection, using range queries on the sorted indexes.
+
+    The ranges are necessary conditions, so no suitable capacitor is dropped:
+     - rated voltage: the series connection needs at least v_dc / (voltage_factor_max * voltage_rating * (1 + safety_margin / 100))
+       capacitors, which must not exceed maximum_number_series_capacitors
+     - capacitance: at least one capacitor in series and c_min / (capacitance * (1 - tolerance / 100)) capacitors in parallel,
+       which must not exceed the constraint maximum_number_capacitors
+     - volume: at least a single capacitor, which must not exceed the constraint maximum_volume
+    The bounds are widened by a relative _RANGE_QUERY_TOLERANCE against rounding. The queries run once per unique combination of bounds.
+
+    :param series_cache: per-capacitor values and memoized stage results of the capacitor series
+    :type series_cache: _SeriesCache
+    :param v_dc: dc voltage in V for each requirement
+    :type v_dc: np.ndarray
+    :param safety_margin: voltage safety margin in percent for each requirement
+    :type safety_margin: np.ndarray
+    :param maximum_series: maximum number of series capacitors for each requirement
+    :type maximum_series: np.ndarray
+    :param requirement_c_min: minimum required capacitance in F for each requirement
+    :type requirement_c_min: np.ndarray
+    :param tolerance: capacitor tolerance in percent for each requirement
+    :type tolerance: np.ndarray
+    :param constraints: optional user constraints, e.g. maximum volume or cost
+    :type constraints: SelectionConstraints | None
+    :return: requirement index, capacitor index, ordered by requirement and capacitor
+    :rtype: tuple[np.ndarray, np.ndarray]
+    """
+    number_requirements = len(v_dc)
+    voltage_rating_min: np.ndarray = np.full(number_requirements, -np.inf)
+    capacitance_min: np.ndarray = np.full(number_requirements, -np.inf)
+    volume_max: np.ndarray = np.full(number_requirements, np.inf)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        margin_factor = 1 + safety_margin / 100
+        tolerance_factor = 1 - tolerance / 100
+        is_voltage_query = (v_dc > 0) & (margin_factor > 0) & (maximum_series > 0)
+        voltage_rating_min[is_voltage_query] = (v_dc / (maximum_series * margin_factor * series_cache.voltage_factor_max))[is_voltage_query]
+        # at least one capacitor in series and in parallel
+        is_single_capacitor_minimum = is_voltage_query & (requirement_c_min > 0) & (tolerance_factor > 0)
+        if constraints is not None and constraints.maximum_number_capacitors is not None and constraints.maximum_number_capacitors > 0:
+            capacitance_min[is_single_capacitor_minimum] = (requirement_c_min / (tolerance_factor * constraints.maximum_number_capacitors))[
+                is_single_capacitor_minimum]
+        if constraints is not None and constraints.maximum_volume is not None:
+            volume_max[is_single_capacitor_minimum] = constraints.maximum_volume
+
+    # no range query for missing bounds
+    voltage_rating_min = np.where(np.isnan(voltage_rating_min), -np.inf, voltage_rating_min * (1 - _RANGE_QUERY_TOLERANCE))
+    capacitance_min = np.where(np.isnan(capacitance_min), -np.inf, capacitance_min * (1 - _RANGE_QUERY_TOLERANCE))
+    volume_max = np.where(np.isnan(volume_max), np.inf, volume_max + np.abs(volume_max) * _RANGE_QUERY_TOLERANCE)
+
+    unique_bounds, inverse_index = np.unique(np.stack([voltage_rating_min, capacitance_min, volume_max], axis=1), axis=0, return_inverse=True)
+    candidate_list = [series_cache.candidate_capacitors(*(float(bound) for bound in bounds)) for bounds in unique_bounds]
+    candidate_list = [candidate_list[count_bounds] for count_bounds in inverse_index.reshape(-1)]
+    requirement_index = np.repeat(np.arange(number_requirements), [len(candidates) for candidates in candidate_list])
+    capacitor_index = np.concatenate(candidate_list) if candidate_list else np.zeros(0, dtype=int)
+    logger.debug(f"{len(capacitor_index)} of {number_requirements * len(series_cache.capacitance)} capacitor designs remain after the range queries.")
+    return requirement_index, capacitor_index.astype(int)
+
+def _select_capacitor_series_vectorized(series_cache: _SeriesCache, c_requirements_list: list[CapacitorRequirements],
+                                        requirement_c_min: np.ndarray, i_max: float, frequency_list: np.ndarray,
+                                        current_amplitude_list: np.ndarray,
+                                        constraints: SelectionConstraints | None = None,
+                                        self_heating: str = "worst_case",
+                                        achievable_lifetime: bool = False) -> tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """
+    Select suitable capacitors of a single capacitor series for many requirements at once (vectorized engine).
+
+    All requirements must share the same current waveform. Range queries on the sorted indexes of rated voltage, capacitance
+    and volume narrow down the (requirement, capacitor) pairs first, see _candidate_capacitor_pairs(). Only these pairs
+    are evaluated, and after the series connection stage only the remaining pairs. The designs are the same as of
+    _select_capacitor_series_apply(). The losses and the self-heating differ by rounding only (relative 1e-15), as the losses
+    of all capacitors are a single matrix-vector product, which sums up the harmonics in a different order.
+
+    The stages are ordered cheapest first: series connection, parallel capacitors due to capacitance and dv/dt, resonance
+    frequency, thermal data and the lower bounds of the user constraints sort out designs before the ESR files are read
+    for the current capability and loss evaluation.
+
+    With self_heating='coupled', the temperature dependent voltages are evaluated at the capacitor temperature
+    temperature_ambient + delta_temperature instead of the maximum inner temperature. Starting at the ambient temperature,
+    all not yet converged designs are evaluated again at their new temperature in each pass (temperature -> series
+    capacitors -> parallel capacitors -> loss -> temperature). The temperature is rounded up to _SELF_HEATING_TEMPERATURE_STEP
+    and never decreases, so the solve converges after a few passes, at the latest at the maximum inner temperature used by
+    the 'worst_case' model. The current derating factor and the maximum self-heating stay defined by the ambient temperature.
+
+    With achievable_lifetime=True, the lifetime of each design is calculated backwards from its voltage per capacitor
+    v_dc / in_series_needed at the temperature the voltages were evaluated at, in a single lookup in the lifetime derating
+    surface for all designs, see LifetimeDeratingSurface.lifetime().
+
+    :param series_cache: per-capacitor values and memoized stage results of the capacitor series
+    :type series_cache: _SeriesCache
+    :param c_requirements_list: capacitor requirements, all with the same current waveform
+    :type c_requirements_list: list[CapacitorRequirements]
+    :param requirement_c_min: minimum required capacitance in F for each requirement
+    :type requirement_c_min: np.ndarray
+    :param i_max: peak current of the current waveform in A
+    :type i_max: float
+    :param frequency_list: frequencies of the current spectrum in Hz
+    :type frequency_list: np.ndarray
+    :param current_amplitude_list: current amplitudes of the current spectrum in A
+    :type current_amplitude_list: np.ndarray
+    :param constraints: optional user constraints, e.g. maximum volume or cost
+    :type constraints: SelectionConstraints | None
+    :param self_heating: 'worst_case'[default]: voltages at the maximum inner temperature, 'coupled': electro-thermal
+        fixed point of capacitor temperature and design, adds the column 'capacitor_temperature'
+    :type self_heating: str
+    :param achievable_lifetime: True to add the column 'lifetime_achievable' in hours. Defaults to False.
+    :type achievable_lifetime: bool
+    :return: data frame with all possible capacitors of all requirements, requirement index for each row,
+        True for each requirement where no capacitor passes the series connection stage
+    :rtype: tuple[pd.DataFrame, np.ndarray, np.ndarray]
+    """
+    # see _select_capacitor_series_apply() for the physical background of the single steps
+    series_data = series_cache.series_data
+
+    temperature_ambient = np.array([c_requirements.temperature_ambient for c_requirements in c_requirements_list], dtype=float)
+    lifetime_h = np.array([c_requirements.lifetime_h for c_requirements in c_requirements_list], dtype=float)
+    v_dc = np.array([c_requirements.v_dc_for_op_max_voltage for c_requirements in c_requirements_list], dtype=float)
+    safety_margin = np.array([c_requirements.voltage_safety_margin_percentage for c_requirements in c_requirements_list], dtype=float)
+    maximum_series = np.array([c_requirements.maximum_number_series_capacitors for c_requirements in c_requirements_list], dtype=float)
+    tolerance = np.array([c_requirements.capacitor_tolerance_percent for c_requirements in c_requirements_list], dtype=float)
+
+    # temperature derating and maximum inner temperature, per requirement
+    derating_factor = np.array([series_cache.derating_factor(temperature) for temperature in temperature_ambient], dtype=float)
+    delta_temperature_max = derating_factor ** 2 * series_data.delta_t_jc_max
+    virtual_inner_max_temperature = temperature_ambient + delta_temperature_max
+
+    # the coupled solve starts at the ambient temperature, as the self-heating is not known yet
+    stage_temperature = virtual_inner_max_temperature if self_heating == "worst_case" else temperature_ambient
+
+    # narrow down the (requirement, capacitor) pairs by range queries on the sorted indexes, see _candidate_capacitor_pairs()
+    requirement_index, capacitor_index = _candidate_capacitor_pairs(series_cache, v_dc, safety_margin, maximum_series, requirement_c_min,
+                                                                    tolerance, constraints)
+
+    # voltage lifetime_h derating, calculated once per unique (lifetime_h, temperature) combination
+    voltage_rating = series_cache.voltage_rating
+    v_op_max_virt, voltage_lifetime = _voltages_at_temperature(series_cache, lifetime_h[requirement_index], stage_temperature[requirement_index],
+                                                               capacitor_index)
+    factor_lifetime = voltage_lifetime / voltage_rating[capacitor_index]
+
+    # voltage: calculate the number of needed capacitors in a series connection
+    in_series_needed = np.ceil(v_dc[requirement_index] / (v_op_max_virt * factor_lifetime * (1 + safety_margin[requirement_index] / 100)))
+    is_valid = ~np.isnan(voltage_lifetime) & ~(in_series_needed > maximum_series[requirement_index])
+    is_series_stage_empty = np.bincount(requirement_index[is_valid], minlength=len(c_requirements_list)) == 0
+
+    # from here, only the remaining (requirement, capacitor) pairs are evaluated
+    requirement_index = requirement_index[is_valid]
+    capacitor_index = capacitor_index[is_valid]
+    in_series_needed = in_series_needed[is_valid]
+    v_op_max_virt = v_op_max_virt[is_valid]
+    voltage_lifetime = voltage_lifetime[is_valid]
+    factor_lifetime = factor_lifetime[is_valid]
+
+    # capacitance: calculate the number of parallel capacitors needed to meet the capacitance requirement
+    in_parallel_needed = np.ceil(requirement_c_min[requirement_index] / (
+        series_cache.capacitance[capacitor_index] * (1 - tolerance[requirement_index] / 100) / in_series_needed))
+
+    # dv/dt: calculate the number of parallel capacitors needed to meet the dv/dt requirement
+    in_parallel_needed_dvdt = series_cache.parallel_capacitors_dvdt(i_max)[capacitor_index]
+    in_parallel_needed = np.where(in_parallel_needed_dvdt > in_parallel_needed, in_parallel_needed_dvdt, in_parallel_needed)
+
+    # cheap checks first, before the expensive ESR file based current capability and loss evaluation.
+    # filter by resonance frequency: drop capacitors with resonance frequency lower than the current 1st harmonic frequency.
+    f_res = series_cache.f_res[capacitor_index]
+    # drop capacitors without thermal data
+    g_in_w_degree_celsius = series_cache.g_in_w_degree_celsius[capacitor_index]
+    is_valid_pair = ~(f_res < frequency_list[0]) & ~np.isnan(g_in_w_degree_celsius)
+
+    volume_per_capacitor = series_cache.volume[capacitor_index]
+    cost_per_capacitor = series_cache.cost[capacitor_index]
+    area_per_capacitor = series_cache.area[capacitor_index]
+    if constraints is not None:
+        # the current capability can only raise the number of parallel capacitors. So the values using the parallel capacitors
+        # due to capacitance and dv/dt are lower bounds for volume, area and number of capacitors (and cost for positive costs).
+        is_valid_pair &= _is_within_constraints(
+            constraints, volume_total=in_parallel_needed * in_series_needed * volume_per_capacitor,
+            cost_total=np.where(cost_per_capacitor < 0, -np.inf, in_parallel_needed * in_series_needed * cost_per_capacitor),
+            area_total=area_per_capacitor * in_parallel_needed * in_series_needed, number_capacitors=in_parallel_needed * in_series_needed)
+    logger.info(f"{np.count_nonzero(is_valid_pair)} of {len(is_valid_pair)} capacitor designs remain for the current capability evaluation.")
+
+    # current: calculate the number of parallel capacitors needed to meet the current requirement
+    # the ESR files are read once for all needed capacitors and reused for the loss calculation
+    parallel_current_capacitors_needed = np.full(len(capacitor_index), np.nan)
+    unique_derating_factors, derating_index = np.unique(derating_factor[requirement_index], return_inverse=True)
+    for count_derating, unique_derating_factor in enumerate(unique_derating_factors):
+        is_derating = (derating_index.reshape(-1) == count_derating) & is_valid_pair
+        parallel_current_capacitors_needed[is_derating] = series_cache.parallel_capacitors_current(
+            frequency_list, current_amplitude_list, float(unique_derating_factor), np.unique(capacitor_index[is_derating]))[capacitor_index[is_derating]]
+
+    # use the maximum number of parallel capacitors needed due to capacitance, dv/dt and current
+    in_parallel_needed = np.where(parallel_current_capacitors_needed > in_parallel_needed, parallel_current_capacitors_needed, in_parallel_needed)
+
+    # volume, cost and minimum required PCB area calculation
+    volume_total = in_parallel_needed * in_series_needed * volume_per_capacitor
+    cost_total = in_parallel_needed * in_series_needed * cost_per_capacitor
+    area_total = area_per_capacitor * in_parallel_needed * in_series_needed
+    if constraints is not None:
+        is_valid_pair &= _is_within_constraints(constraints, volume_total=volume_total, cost_total=cost_total, area_total=area_total,
+                                                number_capacitors=in_parallel_needed * in_series_needed)
+
+    # loss calculation per capacitor and for all capacitors
+    # the loss of a single capacitor carrying the full current is calculated once per capacitor and scaled by the parallel capacitors
+    needed_capacitors = np.unique(capacitor_index[is_valid_pair])
+    esr_matrix, _ = series_cache.limits_at_frequencies(frequency_list, needed_capacitors)
+    power_loss_full_current = np.full(len(series_cache.capacitance), np.nan)
+    power_loss_full_current[needed_capacitors] = power_loss_film_capacitor_vectorized(esr_matrix[needed_capacitors], current_amplitude_list, 1)
+    power_loss_per_capacitor = np.full(len(capacitor_index), np.nan)
+    power_loss_per_capacitor[is_valid_pair] = power_loss_full_current[capacitor_index[is_valid_pair]] / in_parallel_needed[is_valid_pair] ** 2
+    power_loss_total = power_loss_per_capacitor * in_parallel_needed * in_series_needed
+
+    # self heating calculation
+    delta_temperature = power_loss_total / g_in_w_degree_celsius
+
+    if self_heating == "coupled":
+        # capacitance, dv/dt and current capability parallel capacitors and the full current loss do not depend on the temperature
+        in_parallel_needed_fixed = np.where(parallel_current_capacitors_needed > in_parallel_needed_dvdt, parallel_current_capacitors_needed,
+                                            in_parallel_needed_dvdt)
+        capacitor_temperature = temperature_ambient[requirement_index]
+        is_active = is_valid_pair.copy()
+        while True:
+            new_temperature = temperature_ambient[requirement_index] + delta_temperature
+            new_temperature = np.ceil(new_temperature / _SELF_HEATING_TEMPERATURE_STEP) * _SELF_HEATING_TEMPERATURE_STEP
+            new_temperature = np.minimum(new_temperature, virtual_inner_max_temperature[requirement_index])
+            # converged: the design was evaluated at least at its own capacitor temperature
+            is_active &= new_temperature > capacitor_temperature
+            if not np.any(is_active):
+                break
+            pair = np.nonzero(is_active)[0]
+            capacitor_temperature[pair] = new_temperature[pair]
+
+            # temperature -> series capacitors
+            v_op_max_virt[pair], voltage_lifetime[pair] = _voltages_at_temperature(
+                series_cache, lifetime_h[requirement_index[pair]], capacitor_temperature[pair], capacitor_index[pair])
+            factor_lifetime[pair] = voltage_lifetime[pair] / voltage_rating[capacitor_index[pair]]
+            in_series_needed[pair] = np.ceil(v_dc[requirement_index[pair]] / (
+                v_op_max_virt[pair] * factor_lifetime[pair] * (1 + safety_margin[requirement_index[pair]] / 100)))
+            is_valid_pair[pair] &= ~np.isnan(voltage_lifetime[pair]) & ~(in_series_needed[pair] > maximum_series[requirement_index[pair]])
+
+            # series capacitors -> parallel capacitors
+            in_parallel_needed[pair] = np.ceil(requirement_c_min[requirement_index[pair]] / (
+                series_cache.capacitance[capacitor_index[pair]] * (1 - tolerance[requirement_index[pair]] / 100) / in_series_needed[pair]))
+            in_parallel_needed[pair] = np.where(in_parallel_needed_fixed[pair] > in_parallel_needed[pair], in_parallel_needed_fixed[pair],
+                                                in_parallel_needed[pair])
+            volume_total[pair] = in_parallel_needed[pair] * in_series_needed[pair] * volume_per_capacitor[pair]
+            cost_total[pair] = in_parallel_needed[pair] * in_series_needed[pair] * cost_per_capacitor[pair]
+            area_total[pair] = area_per_capacitor[pair] * in_parallel_needed[pair] * in_series_needed[pair]
+            if constraints is not None:
+                is_valid_pair[pair] &= _is_within_constraints(constraints, volume_total=volume_total[pair], cost_total=cost_total[pair],
+                                                              area_total=area_total[pair], number_capacitors=in_parallel_needed[pair] * in_series_needed[pair])
+
+            # parallel capacitors -> loss -> self-heating
+            power_loss_per_capacitor[pair] = power_loss_full_current[capacitor_index[pair]] / in_parallel_needed[pair] ** 2
+            power_loss_total[pair] = power_loss_per_capacitor[pair] * in_parallel_needed[pair] * in_series_needed[pair]
+            delta_temperature[pair] = power_loss_total[pair] / g_in_w_degree_celsius[pair]
+            is_active &= is_valid_pair
+
+    # drop too high self-heated capacitors
+    is_valid_pair &= ~(delta_temperature > delta_temperature_max[requirement_index])
+
+    result_df = series_data.c_db.iloc[capacitor_index[is_valid_pair]]
+    result_columns = {
+        "V_op_max_virt": v_op_max_virt,
+        "voltage_lifetime": voltage_lifetime,
+        "factor_lifetime": factor_lifetime,
+        "in_series_needed": in_series_needed,
+        "in_parallel_needed": in_parallel_needed,
+        "volume_total": volume_total,
+        "f_res": f_res,
+        "power_loss_per_capacitor": power_loss_per_capacitor,
+        "power_loss_total": power_loss_total,
+        "g_in_W_degreeCelsius": g_in_w_degree_celsius,
+        "delta_temperature": delta_temperature,
+        "cost": cost_total,
+        "area_total": area_total}
+    if self_heating == "coupled":
+        result_columns["capacitor_temperature"] = capacitor_temperature
+    if achievable_lifetime:
+        # inverse of the series connection stage: the lifetime curve voltage at which the design just needs in_series_needed capacitors
+        lifetime_temperature = virtual_inner_max_temperature[requirement_index] if self_heating == "worst_case" else capacitor_temperature
+        curve_voltage = v_dc[requirement_index] / (in_series_needed * v_op_max_virt * (1 + safety_margin[requirement_index] / 100)) * \
+            voltage_rating[capacitor_index]
+        lifetime_achievable = np.full(len(capacitor_index), np.nan)
+        lifetime_achievable[is_valid_pair] = series_cache.lifetime_derating_surface.lifetime(
+            curve_voltage[is_valid_pair], np.maximum(lifetime_temperature[is_valid_pair], series_cache.lifetime_temperature_min),
+            voltage_rating[capacitor_index[is_valid_pair]])
+        result_columns["lifetime_achievable"] = lifetime_achievable
+    # add all result columns at once, as adding single columns dominates the runtime of memoized selections
+    result_df = pd.concat([result_df, pd.DataFrame({column_name: column_values[is_valid_pair] for column_name, column_values in result_columns.items()},
+                                                   index=result_df.index)], axis=1)
+
+    return result_df, requirement_index[is_valid_pair], is_series_stage_empty
+
+def _select_capacitor_series_worst_case(series_cache: _SeriesCache, c_requirements_list: list[CapacitorRequirements],
+                                        waveform_values_list: list[tuple[np.ndarray, float, np.ndarray, np.ndarray]],
+                                        constraints: SelectionConstraints | None = None) -> tuple[pd.DataFrame, bool]:
+    """
+    Select capacitors of a single capacitor series that fulfill the requirements of all operating points (worst case).
+
+    The operating points are an extra axis of (operating points x capacitors) arrays. Each design uses the maximum number
+    of series and parallel capacitors over all operating points. Lifetime, current capability and self-heating are checked
+    for each operating point using these numbers. For a single operating point, results are identical to
+    _select_capacitor_series_vectorized().
+
+    :param series_cache: per-capacitor values and memoized stage results of the capacitor series
+    :type series_cache: _SeriesCache
+    :param c_requirements_list: capacitor requirements for each operating point
+    :type c_requirements_list: list[CapacitorRequirements]
+    :param waveform_values_list: result of _calculate_waveform_values() for each operating point
+    :type waveform_values_list: list[tuple[np.ndarray, float, np.ndarray, np.ndarray]]
+    :param constraints: optional user constraints, e.g. maximum volume or cost
+    :type constraints: SelectionConstraints | None
+    :return: data frame with all possible capacitors, True in case no capacitor passes the series connection stage
+    :rtype: tuple[pd.DataFrame, bool]
+    """
+    # see _select_capacitor_series_apply() for the physical background of the single steps
+    series_data = series_cache.series_data
+
+    temperature_ambient = np.array([c_requirements.temperature_ambient for c_requirements in c_requirements_list], dtype=float)
+    lifetime_h = np.array([c_requirements.lifetime_h for c_requirements in c_requirements_list], dtype=float)
+    v_dc = np.array([c_requirements.v_dc_for_op_max_voltage for c_requirements in c_requirements_list], dtype=float)
+    safety_margin = np.array([c_requirements.voltage_safety_margin_percentage for c_requirements in c_requirements_list], dtype=float)
+    maximum_series = np.array([c_requirements.maximum_number_series_capacitors for c_requirements in c_requirements_list], dtype=float)
+    tolerance = np.array([c_requirements.capacitor_tolerance_percent for c_requirements in c_requirements_list], dtype=float)
+
+    # temperature derating and maximum inner temperature, per operating point
+    derating_factor = np.array([series_cache.derating_factor(temperature) for temperature in temperature_ambient], dtype=float)
+    delta_temperature_max = derating_factor ** 2 * series_data.delta_t_jc_max
+    virtual_inner_max_temperature = temperature_ambient + delta_temperature_max
+
+    # (operating points x capacitors) arrays
+    v_op_max_virt = _interpolate_rows(virtual_inner_max_temperature, [const.TEMPERATURE_85, const.TEMPERATURE_105, const.TEMPERATURE_125],
+                                      series_cache.voltage_points)
+    voltage_lifetime = np.array([series_cache.voltage_lifetime(float(lifetime), float(temperature))
+                                 for lifetime, temperature in zip(lifetime_h, virtual_inner_max_temperature, strict=True)])
+    factor_lifetime = voltage_lifetime / series_cache.voltage_rating
+
+    # voltage: the series connection must fulfill the voltage and lifetime requirements of all operating points
+    in_series_needed = np.max(np.ceil(v_dc[:, np.newaxis] / (v_op_max_virt * factor_lifetime * (1 + safety_margin[:, np.newaxis] / 100))), axis=0)
+    is_valid = np.all(~np.isnan(voltage_lifetime), axis=0) & ~(in_series_needed > np.min(maximum_series))
+    is_series_stage_empty = not np.any(is_valid)
+
+    # from here, only the remaining capacitors are evaluated
+    capacitor_index = np.nonzero(is_valid)[0]
+    in_series_needed = in_series_needed[capacitor_index]
+
+    # capacitance and dv/dt: maximum number of parallel capacitors over all operating points
+    requirement_c_min = np.array([waveform_values[0][0] for waveform_values in waveform_values_list], dtype=float)
+    in_parallel_needed_capacitance = np.ceil(requirement_c_min[:, np.newaxis] / (
+        series_cache.capacitance[capacitor_index] * (1 - tolerance[:, np.newaxis] / 100) / in_series_needed))
+    in_parallel_needed = in_parallel_needed_capacitance[0]
+    for in_parallel_needed_point in in_parallel_needed_capacitance[1:]:
+        in_parallel_needed = np.where(in_parallel_needed_point > in_parallel_needed, in_parallel_needed_point, in_parallel_needed)
+    for _, i_max, _, _ in waveform_values_list:
+        in_parallel_needed_dvdt = series_cache.parallel_capacitors_dvdt(i_max)[capacitor_index]
+        in_parallel_needed = np.where(in_parallel_needed_dvdt > in_parallel_needed, in_parallel_needed_dvdt, in_parallel_needed)
+
+    # cheap checks first: resonance frequency above the 1st harmonic frequency of all operating points, thermal data available
+    f_res = series_cache.f_res[capacitor_index]
+    g_in_w_degree_celsius = series_cache.g_in_w_degree_celsius[capacitor_index]
+    is_valid_pair = ~(f_res < max(waveform_values[2][0] for waveform_values in waveform_values_list)) & ~np.isnan(g_in_w_degree_celsius)
+
+    volume_per_capacitor = series_cache.volume[capacitor_index]
+    cost_per_capacitor = series_cache.cost[capacitor_index]
+    area_per_capacitor = series_cache.area[capacitor_index]
+    if constraints is not None:
+        # lower bounds, see _select_capacitor_series_vectorized()
+        is_valid_pair &= _is_within_constraints(
+            constraints, volume_total=in_parallel_needed * in_series_needed * volume_per_capacitor,
+            cost_total=np.where(cost_per_capacitor < 0, -np.inf, in_parallel_needed * in_series_needed * cost_per_capacitor),
+            area_total=area_per_capacitor * in_parallel_needed * in_series_needed, number_capacitors=in_parallel_needed * in_series_needed)
+
+    # current: maximum number of parallel capacitors over all operating points
+    needed_capacitors = np.unique(capacitor_index[is_valid_pair])
+    for (_, _, frequency_list, current_amplitude_list), point_derating_factor in zip(waveform_values_list, derating_factor, strict=True):
+        parallel_current_capacitors_needed = np.full(len(capacitor_index), np.nan)
+        parallel_current_capacitors_needed[is_valid_pair] = series_cache.parallel_capacitors_current(
+            frequency_list, current_amplitude_list, float(point_derating_factor), needed_capacitors)[capacitor_index[is_valid_pair]]
+        in_parallel_needed = np.where(parallel_current_capacitors_needed > in_parallel_needed, parallel_current_capacitors_needed, in_parallel_needed)
+
+    # volume, cost and minimum required PCB area calculation
+    volume_total = in_parallel_needed * in_series_needed * volume_per_capacitor
+    cost_total = in_parallel_needed * in_series_needed * cost_per_capacitor
+    area_total = area_per_capacitor * in_parallel_needed * in_series_needed
+    if constraints is not None:
+        is_valid_pair &= _is_within_constraints(constraints, volume_total=volume_total, cost_total=cost_total, area_total=area_total,
+                                                number_capacitors=in_parallel_needed * in_series_needed)
+
+    # loss calculation and self-heating check for each operating point
+    needed_capacitors = np.unique(capacitor_index[is_valid_pair])
+    power_loss_per_capacitor = np.full((len(c_requirements_list), len(capacitor_index)), np.nan)
+    power_loss_full_current = np.full(len(series_cache.capacitance), np.nan)
+    for count_point, (_, _, frequency_list, current_amplitude_list) in enumerate(waveform_values_list):
+        esr_matrix, _ = series_cache.limits_at_frequencies(frequency_list, needed_capacitors)
+        power_loss_full_current[needed_capacitors] = power_loss_film_capacitor_vectorized(esr_matrix[needed_capacitors], current_amplitude_list, 1)
+        power_loss_per_capacitor[count_point, is_valid_pair] = power_loss_full_current[capacitor_index[is_valid_pair]] / in_parallel_needed[is_valid_pair] ** 2
+    power_loss_total = power_loss_per_capacitor * in_parallel_needed * in_series_needed
+    delta_temperature = power_loss_total / g_in_w_degree_celsius
+    is_valid_pair &= np.all(~(delta_temperature > delta_temperature_max[:, np.newaxis]), axis=0)
+
+    result_df = series_data.c_db.iloc[capacitor_index[is_valid_pair]]
+    # worst case over all operating points: lowest voltages, highest losses and self-heating
+    result_columns = {
+        "V_op_max_virt": np.min(v_op_max_virt[:, capacitor_index], axis=0),
+        "voltage_lifetime": np.min(voltage_lifetime[:, capacitor_index], axis=0),
+        "factor_lifetime": np.min(factor_lifetime[:, capacitor_index], axis=0),
+        "in_series_needed": in_series_needed,
+        "in_parallel_needed": in_parallel_needed,
+        "volume_total": volume_total,
+        "f_res": f_res,
+        "power_loss_per_capacitor": np.max(power_loss_per_capacitor, axis=0),
+        "power_loss_total": np.max(power_loss_total, axis=0),
+        "g_in_W_degreeCelsius": g_in_w_degree_celsius,
+        "delta_temperature": np.max(delta_temperature, axis=0),
+        "cost": cost_total,
+        "area_total": area_total}
+    result_df = pd.concat([result_df, pd.DataFrame({column_name: column_values[is_valid_pair] for column_name, column_values in result_columns.items()},
+                                                   index=result_df.index)], axis=1)
+
+    return result_df, is_series_stage_empty
+
+def _calculate_spectra(current_waveform_list: list[np.ndarray]) -> list[tuple[np.ndarray, np.ndarray]]:
+    """
+    Calculate the current spectra of several waveforms by a single fft_batch() call.
+
+    The rows of the harmonic table are used by the power loss and current capability stages directly. A waveform gives the same
+    spectrum, no matter if it is calculated alone or together with other waveforms.
+
+    :param current_waveform_list: current waveforms [[time-vector[,[current-vector]]
+    :type current_waveform_list: list[np.ndarray]
+    :return: frequency list and current amplitude list for each waveform
+    :rtype: list[tuple[np.ndarray, np.ndarray]]
+    """
+    harmonic_table = fft_batch(current_waveform_list)
+    return [(harmonic_table.frequency[harmonic_table.offsets[k]:harmonic_table.offsets[k + 1]],
+             harmonic_table.amplitude[harmonic_table.offsets[k]:harmonic_table.offsets[k + 1]])
+            for k in range(len(current_waveform_list))]
+
+def _calculate_waveform_values(c_requirements_list: list[CapacitorRequirements], c_min_memory: dict | None = None,
+                               fft_memory: dict | None = None) -> tuple[np.ndarray, float, np.ndarray, np.ndarray]:
+    """
+    Calculate the waveform dependent values for requirements sharing the same current waveform.
+
+    The FFT is calculated once, the minimum capacitance once per unique maximum voltage ripple.
+
+    :param c_requirements_list: capacitor requirements, all with the same current waveform
+    :type c_requirements_list: list[CapacitorRequirements]
+    :param c_min_memory: optional memory of the calculated requirements by waveform and voltage ripple, kept between calls
+    :type c_min_memory: dict | None
+    :param fft_memory: optional memory of the current spectra by waveform, kept between calls
+    :type fft_memory: dict | None
+    :return: minimum required capacitance for each requirement, peak current, frequency list, current amplitude list
+    :rtype: tuple[np.ndarray, float, np.ndarray, np.ndarray]
+    """
+    c_min_memory = {} if c_min_memory is None else c_min_memory
+    fft_memory = {} if fft_memory is None else fft_memory
+    waveform_key = _waveform_key(c_requirements_list[0].current_waveform_for_op_max_current)
+
+    calculated_requirements_list = [_get_memoized(c_min_memory, (waveform_key, c_requirements.maximum_peak_to_peak_voltage_ripple),
+                                                  lambda c_requirements=c_requirements: calculate_from_requirements(c_requirements),
+                                                  _REQUIREMENT_MEMORY_SIZE)
+                                    for c_requirements in c_requirements_list]
+    requirement_c_min = np.array([calculated_requirements.requirement_c_min for calculated_requirements in calculated_requirements_list], dtype=float)
+    i_max = calculated_requirements_list[0].i_max
+
+    frequency_list, current_amplitude_list = _get_memoized(
+        fft_memory, waveform_key, lambda: _calculate_spectra([c_requirements_list[0].current_waveform_for_op_max_current])[0],
+        _WAVEFORM_MEMORY_SIZE)
+    return requirement_c_min, i_max, frequency_list, current_amplitude_list
+
+
+# per-capacitor values and ESR files of a process pool worker, loaded once per worker process on first use. The worker
+# processes end with the selection call, so the series caches never outlive changed capacitor data or ESR files.
+_worker_series_cache_dict: dict[tuple[CapacitorCatalog, str], _SeriesCache] = {}
+
+
+def _get_series_cache(capacitor_series_name: str, catalog: CapacitorCatalog | None = None,
+                      series_cache_dict: dict[tuple[CapacitorCatalog, str], _SeriesCache] | None = None) -> _SeriesCache:
+    """
+    Get the series cache of a capacitor series, load the capacitor series on first use.
+
+    :param capacitor_series_name: name of the capacitor series
+    :type capacitor_series_name: str
+    :param catalog: catalog of the capacitor series. Defaults to None: the TDK foil capacitor series of the package.
+    :type catalog: CapacitorCatalog | None
+    :param series_cache_dict: series caches of a single selection call. Defaults to None: the series caches of the process
+        pool worker. Not to be used outside of pool workers, as these series caches are never invalidated.
+    :type series_cache_dict: dict[tuple[CapacitorCatalog, str], _SeriesCache] | None
+    :return: per-capacitor values and memoized stage results of the capacitor series
+    :rtype: _SeriesCache
+    """
+    series_cache_dict = _worker_series_cache_dict if series_cache_dict is None else series_cache_dict
+    key = (FoilCapacitorCatalog() if catalog is None else catalog, capacitor_series_name)
+    if key not in series_cache_dict:
+        series_cache_dict[key] = _SeriesCache(key[0].load_series(capacitor_series_name))
+    return series_cache_dict[key]
+
+def _check_self_heating(self_heating: str) -> None:
+    """
+    Check the self-heating model name.
+
+    :param self_heating: self-heating model
+    :type self_heating: str
+    :raises ValueError: in case of an unknown self-heating model
+    """
+    if self_heating not in ["worst_case", "coupled"]:
+        raise ValueError(f"self_heating '{self_heating}' not available: Must be 'worst_case' or 'coupled'")
+
+def _select_capacitor_series_task(capacitor_series_name: str, c_requirements_list: list[CapacitorRequirements], requirement_id_list: list[int],
+                                  requirement_c_min: np.ndarray, i_max: float, frequency_list: np.ndarray,
+                                  current_amplitude_list: np.ndarray, constraints: SelectionConstraints | None,
+                                  self_heating: str = "worst_case", catalog: CapacitorCatalog | None = None,
+                                  achievable_lifetime: bool = False,
+                                  series_cache_dict: dict[tuple[CapacitorCatalog, str], _SeriesCache] | None = None) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Select suitable capacitors of a single capacitor series for a chunk of requirements in a process pool worker.
+
+    The capacitor series data, the ESR files and the memoized stage results are kept per worker process for the following tasks.
+    For the serial calculation in the calling process, they are kept in series_cache_dict for the tasks of the same call.
+
+    :param capacitor_series_name: name of the capacitor series
+    :type capacitor_series_name: str
+    :param c_requirements_list: capacitor requirements, all with the same current waveform
+    :type c_requirements_list: list[CapacitorRequirements]
+    :param requirement_id_list: requirement id for each requirement
+    :type requirement_id_list: list[int]
+    :param requirement_c_min: minimum required capacitance in F for each requirement
+    :type requirement_c_min: np.ndarray
+    :param i_max: peak current of the current waveform in A
+    :type i_max: float
+    :param frequency_list: frequencies of the current spectrum in Hz
+    :type frequency_list: np.ndarray
+    :param current_amplitude_list: current amplitudes of the current spectrum in A
+    :type current_amplitude_list: np.ndarray
+    :param constraints: optional user constraints, e.g. maximum volume or cost
+    :type constraints: SelectionConstraints | None
+    :param self_heating: 'worst_case'[default] or 'coupled', see _select_capacitor_series_vectorized()
+    :type self_heating: str
+    :param catalog: catalog of the capacitor series, defaults to the TDK foil capacitor series of the package
+    :type catalog: CapacitorCatalog | None
+    :param achievable_lifetime: True to add the column 'lifetime_achievable', see _select_capacitor_series_vectorized()
+    :type achievable_lifetime: bool
+    :param series_cache_dict: series caches of the calling process for a serial calculation. Defaults to None: the series
+        caches of the process pool worker.
+    :type series_cache_dict: dict[tuple[CapacitorCatalog, str], _SeriesCache] | None
+    :return: data frame with all possible capacitors including the 'requirement_id' and 'series' column,
+        True for each requirement where no capacitor passes the series connection stage
+    :rtype: tuple[pd.DataFrame, np.ndarray]
+    """
+    result_df, requirement_index, is_series_stage_empty = _select_capacitor_series_vectorized(
+        _get_series_cache(capacitor_series_name, catalog, series_cache_dict), c_requirements_list, requirement_c_min, i_max, frequency_list,
+        current_amplitude_list, constraints, self_heating, achievable_lifetime)
+    result_df.insert(0, "requirement_id", np.array(requirement_id_list, dtype=int)[requirement_index])
+    result_df.insert(1, "series", capacitor_series_name)
+
+    return result_df, is_series_stage_empty
+
+def _run_tasks(task_argument_list: list[tuple], number_of_workers: int) -> list[tuple[pd.DataFrame, np.ndarray]]:
+    """
+    Run the selection tasks, either serial or in a process pool. The results are returned in the order of the tasks.
+
+    :param task_argument_list: arguments of _select_capacitor_series_task() for each task
+    :type task_argument_list: list[tuple]
+    :param number_of_workers: number of worker processes, 1 for a serial calculation in the calling process
+    :type number_of_workers: int
+    :return: result of _select_capacitor_series_task() for each task
+    :rtype: list[tuple[pd.DataFrame, np.ndarray]]
+    """
+    if number_of_workers < 1:
+        raise ValueError(f"number_of_workers must be at least 1, but is {number_of_workers}.")
+    if number_of_workers == 1 or len(task_argument_list) == 1:
+        # series caches of this call only, so the next call reads changed capacitor data and ESR files again
+        select_task = functools.partial(_select_capacitor_series_task, series_cache_dict={})
+        return [select_task(*task_arguments) for task_arguments in task_argument_list]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(number_of_workers, len(task_argument_list))) as executor:
+        # executor.map() keeps the task order, so the results are deterministic
+        return list(executor.map(_select_capacitor_series_task, *zip(*task_argument_list, strict=True)))
+
+def _combine_batch_results(result_df_list: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Combine the results of all requirements to a long-format data frame.
+
+    :param result_df_list: result data frames including the 'requirement_id' and 'series' column
+    :type result_df_list: list[pd.DataFrame]
+    :return: long-format data frame with the index 'requirement_id'
+    :rtype: pd.DataFrame
+    """
+    result_df = pd.concat(result_df_list, ignore_index=True)
+    # sort by requirement, keep the series order and the database order within a requirement
+    return result_df.sort_values("requirement_id", kind="stable").set_index("requirement_id")
+
+def select_capacitors(c_requirements: CapacitorRequirements, engine: str = "vectorized", number_of_workers: int = 1,
+                      constraints: SelectionConstraints | None = None,
+                      result_sink: ResultSink | None = None, self_heating: str = "worst_case",
+                      catalog: CapacitorCatalog | None = None, achievable_lifetime: bool = False) -> tuple[list[str], list[pd.DataFrame]]:
     """
     Select suitable capacitors for the given application.
 
@@ -167,122 +1234,246 @@ def select_capacitors(c_requirements: CapacitorRequirements) -> tuple[list[str],
 
     :param c_requirements: capacitor requirements
     :type c_requirements: CapacitorRequirements
+    :param engine: 'vectorized'[default]: all stages as array operations over all capacitors.
+        'apply': row-by-row reference evaluation. Both engines select the same designs, the losses and the self-heating
+        differ by rounding only.
+    :type engine: str
+    :param number_of_workers: number of worker processes to evaluate the capacitor series in parallel. Defaults to 1 (serial).
+        Only available for the 'vectorized' engine.
+    :type number_of_workers: int
+    :param constraints: optional user limits for maximum volume in m³, cost in euro, PCB area in m² and number of capacitors.
+        The limits are checked as early as possible to skip the expensive evaluation of not suitable designs.
+        Only available for the 'vectorized' engine.
+    :type constraints: SelectionConstraints | None
+    :param result_sink: optional destination for the results of each capacitor series, e.g.
+        FileResultSink(c_requirements.results_directory) to write 'results_<series>.csv'. Defaults to None (not written).
+        The sink is not closed, e.g. to share a single sink between many calls. Use the sink as a context manager to close it.
+        A shared FileResultSink() keeps only the results of the last call per series, unless created with keep_all=True.
+        For sweeps, see select_capacitors_batch().
+    :type result_sink: ResultSink | None
+    :param self_heating: 'worst_case'[default]: temperature dependent voltages and lifetime at the maximum inner temperature.
+        'coupled': electro-thermal fixed point, the voltages and lifetime are evaluated at the capacitor temperature resulting
+        from the losses of each design. Adds the column 'capacitor_temperature'. Only available for the 'vectorized' engine.
+    :type self_heating: str
+    :param catalog: catalog of the capacitor series, e.g. a CombinedCatalog of several manufacturers. Defaults to None: the TDK
+        foil capacitor series of the package.
+    :type catalog: CapacitorCatalog | None
+    :param achievable_lifetime: True to add the column 'lifetime_achievable': the lifetime in hours each design reaches with its
+        number of series capacitors, at the temperature of the voltage evaluation (see self_heating). Designs with
+        lifetime_achievable >= lifetime also fulfill a longer required lifetime, so a lifetime sweep becomes a filter of a single
+        selection at the shortest lifetime, as far as the designs need no further series capacitors. Lifetimes are limited
+        to the range of the lifetime curves. Defaults to False. Only available for the 'vectorized' engine.
+    :type achievable_lifetime: bool
     :return: pandas data frame with all possible capacitors.
     :rtype: pandas.DataFrame
     """
+    if engine not in ["vectorized", "apply"]:
+        raise ValueError(f"engine '{engine}' not available: Must be 'vectorized' or 'apply'")
+    _check_self_heating(self_heating)
+    if engine == "apply" and (number_of_workers != 1 or constraints is not None or self_heating != "worst_case" or achievable_lifetime):
+        raise ValueError("Parallel evaluation, constraints, the coupled self-heating and the achievable lifetime are only available "
+                         "for the 'vectorized' engine.")
+
     # calculate minimum required capacitance and RMS current
     logger.info("Calculate requirements and values from given input data.")
     calculated_boundaries = calculate_from_requirements(c_requirements)
 
+    catalog = FoilCapacitorCatalog() if catalog is None else catalog
+    series_name_list = catalog.series_name_list()
     capacitor_df_list = []
 
     logger.info("FFT")
-    [frequency_list, current_amplitude_list, _] = fft(c_requirements.current_waveform_for_op_max_current, plot='no',
-                                                      mode='time', title='ffT input current')
+    [(frequency_list, current_amplitude_list)] = _calculate_spectra([c_requirements.current_waveform_for_op_max_current])
 
-    path = pathlib.Path(__file__)
-    capacitor_series_values_path = pathlib.PurePath(path.parents[0], const.FOIL_CAPACITOR_DATA_DIRECTORY, f"{const.FOIL_CAPACITOR_SERIES_VALUES}.csv")
-    series_values = pd.read_csv(capacitor_series_values_path, delimiter=';', decimal=',')
+    if engine == "vectorized":
+        task_argument_list = [(capacitor_series_name, [c_requirements], [0], np.array([calculated_boundaries.requirement_c_min]),
+                               calculated_boundaries.i_max, frequency_list, current_amplitude_list, constraints, self_heating, catalog,
+                               achievable_lifetime)
+                              for capacitor_series_name in series_name_list]
+        task_result_list = _run_tasks(task_argument_list, number_of_workers)
 
-    for capacitor_series_name in const.FOIL_CAPACITOR_SERIES_NAME_LIST:
+    for count_series, capacitor_series_name in enumerate(series_name_list):
         logger.info(f"Capacitor series: {capacitor_series_name}")
 
-        # select all suitable capacitors including derating and thermal information from the database
-        c_db, c_thermal, c_derating, dvdt_df, lt_dto_list = load_dc_film_capacitors(capacitor_series_name)
-
-        derating_factor = get_temperature_current_derating_factor(ambient_temperature=c_requirements.temperature_ambient, df_derating=c_derating)
-
-        # check for temperature derating depending on the capacitor series
-        delta_t_jc_max = series_values.loc[series_values["series"] == capacitor_series_name, "delta_t_jc"].values[0]
-        delta_temperature_max = derating_factor ** 2 * delta_t_jc_max
-
-        # The interpolation is made at the given datasheet temperatures of 85 °C, 105 °C and 125 °C. This is same for all capacitors in the database.
-        # the voltage rating is for t_op = t_ambient + delta_t_self_heating (see datasheet).
-        # This is the reason to estimate the maximum inner allowed operating temperature
-        virtual_inner_max_temperature = c_requirements.temperature_ambient + delta_temperature_max
-        c_db['V_op_max_virt'] = c_db.apply(
-            lambda x, v_i_t=virtual_inner_max_temperature:
-            np.interp(v_i_t, [const.TEMPERATURE_85, const.TEMPERATURE_105, const.TEMPERATURE_125],
-                      [x["V_R_85degree"], x["V_op_105degree"], x["V_op_125degree"]]), axis=1)
-
-        # voltage lifetime_h derating
-        c_db["voltage_lifetime"] = c_db.apply(lambda x, v_i_t=virtual_inner_max_temperature, lt_dto_list=lt_dto_list: voltage_rating_due_to_lifetime(
-            target_lifetime=c_requirements.lifetime_h, operating_temperature=float(v_i_t),
-            voltage_rating=x["V_R_85degree"], lt_dto_list=lt_dto_list), axis=1)
-        c_db = c_db.drop(c_db[np.isnan(c_db["voltage_lifetime"])].index)
-
-        c_db["factor_lifetime"] = c_db["voltage_lifetime"] / c_db["V_R_85degree"]
-
-        # voltage: calculate the number of needed capacitors in a series connection
-        # the voltage rating is for t_op = t_ambient + delta_t_self_heating (see datasheet)
-        c_db["in_series_needed"] = np.ceil(c_requirements.v_dc_for_op_max_voltage / (c_db['V_op_max_virt'] * c_db["factor_lifetime"] * \
-                                                                                     (1 + c_requirements.voltage_safety_margin_percentage / 100)))
-        # drop series connection capacitors more than specified
-        c_db = c_db.drop(c_db[c_db["in_series_needed"] > c_requirements.maximum_number_series_capacitors].index)
-
-        if len(c_db["capacitance"]) == 0:
-            # all capacitors are sorted out due to lifetime ratings. Add empty keys
-            c_db["volume_total"] = np.nan
-            c_db["power_loss_total"] = np.nan
+        if engine == "vectorized":
+            c_db, is_series_stage_empty = task_result_list[count_series]
+            c_db = c_db.drop(columns=["requirement_id", "series"])
+            if is_series_stage_empty[0]:
+                c_db = _empty_series_stage_result(c_db)
         else:
-            # capacitance: calculate the number of parallel capacitors needed to meet the capacitance requirement
-            c_db["in_parallel_needed"] = np.ceil(
-                calculated_boundaries.requirement_c_min / (c_db["capacitance"] * \
-                                                           (1 - c_requirements.capacitor_tolerance_percent / 100) / c_db["in_series_needed"]))
-
-            # dv/dt: calculate the number of parallel capacitors needed to meet the dv/dt requirement
-            c_db["in_parallel_needed_dvdt"] = c_db.apply(lambda x, dvdt_df=dvdt_df, i_peak=calculated_boundaries.i_max: calc_parallel_capacitors_dvdt(
-                x["capacitance"], x["V_R_85degree"], i_peak, dvdt_df, x["ordering code"], calculated_boundaries), axis=1)
-
-            # current: calculate the number of parallel capacitors needed to meet the current requirement
-            c_db["parallel_current_capacitors_needed"] = c_db.apply(lambda x, der_f=derating_factor: current_capability_film_capacitor(
-                order_number=x["ordering code"], frequency_list=frequency_list, current_amplitude_list=current_amplitude_list, derating_factor=der_f),
-                axis=1)
-
-            # check if parallel capacitors due to current needed is more than due to capacitance needed
-            index_dvdt = c_db["in_parallel_needed_dvdt"] > c_db["in_parallel_needed"]
-            c_db.loc[index_dvdt, "in_parallel_needed"] = c_db.loc[index_dvdt, "in_parallel_needed_dvdt"]
-
-            # check if parallel capacitors due to current needed is more than due to capacitance needed
-            index_ripple_current = c_db["parallel_current_capacitors_needed"] > c_db["in_parallel_needed"]
-            c_db.loc[index_ripple_current, "in_parallel_needed"] = c_db.loc[index_ripple_current, "parallel_current_capacitors_needed"]
-            c_db = c_db.drop(columns=["parallel_current_capacitors_needed", "in_parallel_needed_dvdt"])
-
-            # volume calculation
-            c_db["volume_total"] = c_db["in_parallel_needed"] * c_db["in_series_needed"] * c_db["volume"]
-
-            # filter by resonance frequency: drop capacitors with resonance frequency lower than the current 1st harmonic frequency.
-            # ESL_total = L * n_serial / n_parallel
-            # C_total = C * n_parallel / n_serial
-            # ESL_total * C_total = L * C !!! To estimate the resonance frequency, it does not matter how the series and parallel connection is.
-            c_db["f_res"] = 1 / (2 * np.pi * np.sqrt(c_db["capacitance"] * c_db["ESL_in_H"]))
-            c_db = c_db.drop(c_db[c_db["f_res"] < frequency_list[0]].index)
-
-            # loss calculation per capacitor
-            c_db["power_loss_per_capacitor"] = c_db.apply(lambda x: power_loss_film_capacitor(x["ordering code"], frequency_list, current_amplitude_list,
-                                                                                              x["in_parallel_needed"]), axis=1)
-            # loss calculation for all capacitors
-            c_db.loc[:, 'power_loss_total'] = c_db.loc[:, 'power_loss_per_capacitor'] * c_db["in_parallel_needed"] * c_db["in_series_needed"]
-
-            # self heating calculation
-            # g_in_W_degreeCelsius is the equivalent heat coefficient according to the data sheet
-            c_db['g_in_W_degreeCelsius'] = c_db.apply(lambda x, c_th=c_thermal: get_equivalent_heat_coefficient(
-                c_th, x["width_in_m"], x["length_in_m"], x["height_in_m"]), axis=1)
-            c_db = c_db.drop(c_db[np.isnan(c_db["g_in_W_degreeCelsius"])].index)
-            c_db["delta_temperature"] = c_db['power_loss_total'] / c_db['g_in_W_degreeCelsius']
-
-            # drop too high self-heated capacitors
-            c_db = c_db.drop(c_db[c_db["delta_temperature"] > delta_temperature_max].index)
-
-            # calculate component cost according to cost models
-            c_db["cost"] = c_db["in_parallel_needed"] * c_db["in_series_needed"] * \
-                c_db.apply(lambda x: cost.cost_film_capacitor(x["V_R_85degree"], x["capacitance"]), axis=1)
-
-            # calculate minimum required PCB area
-            c_db["area_total"] = c_db["area"] * c_db["in_parallel_needed"] * c_db["in_series_needed"]
-
-        c_db.to_csv(f"results_{capacitor_series_name}.csv")
+            # select all suitable capacitors including derating and thermal information from the database
+            series_data = catalog.load_series(capacitor_series_name)
+
+            derating_factor = get_temperature_current_derating_factor(ambient_temperature=c_requirements.temperature_ambient,
+                                                                      df_derating=series_data.c_derating)
+
+            # check for temperature derating depending on the capacitor series
+            delta_temperature_max = derating_factor ** 2 * series_data.delta_t_jc_max
+
+            c_db = _select_capacitor_series_apply(series_data.c_db, series_data.c_thermal, series_data.dvdt_df, series_data.lt_dto_list,
+                                                  c_requirements, calculated_boundaries, frequency_list, current_amplitude_list,
+                                                  derating_factor, delta_temperature_max)
+
+        if result_sink is not None:
+            result_sink.write(capacitor_series_name, c_db)
 
         capacitor_df_list.append(c_db)
 
-    return const.FOIL_CAPACITOR_SERIES_NAME_LIST, capacitor_df_list
+    return series_name_list, capacitor_df_list
+
+def select_capacitors_worst_case(c_requirements_list: list[CapacitorRequirements], constraints: SelectionConstraints | None = None,
+                                 result_sink: ResultSink | None = None, catalog: CapacitorCatalog | None = None) -> tuple[list[str], list[pd.DataFrame]]:
+    """
+    Select suitable capacitors fulfilling the requirements of several operating points (worst case) in one pass.
+
+    Each operating point is given as capacitor requirements, e.g. with different current waveforms, DC voltages or ambient
+    temperatures. Each design uses the maximum number of series and parallel capacitors over all operating points.
+    Lifetime, current capability and self-heating are checked for every operating point. The result contains the
+    lowest voltages and the highest losses and self-heating over all operating points.
+
+    :Minimal Example:
+
+    >>> import pecst
+    >>> operating_point_list = pecst.requirements_grid(c_requirements, v_dc_for_op_max_voltage=[600, 800])
+    >>> operating_point_list[1].current_waveform_for_op_max_current = current_waveform_full_load
+    >>> series_name_list, c_db_list = pecst.select_capacitors_worst_case(operating_point_list)
+
+    :param c_requirements_list: capacitor requirements for each operating point
+    :type c_requirements_list: list[CapacitorRequirements]
+    :param constraints: optional user limits for maximum volume in m³, cost in euro, PCB area in m² and number of capacitors
+    :type constraints: SelectionConstraints | None
+    :param result_sink: optional destination for the results of each capacitor series. Defaults to None (not written).
+        The sink is not closed.
+    :type result_sink: ResultSink | None
+    :param catalog: catalog of the capacitor series, defaults to the TDK foil capacitor series of the package
+    :type catalog: CapacitorCatalog | None
+    :return: capacitor series names, data frame with all possible capacitors for each capacitor series
+    :rtype: tuple[list[str], list[pd.DataFrame]]
+    """
+    if len(c_requirements_list) == 0:
+        raise ValueError("At least one operating point must be given.")
+
+    waveform_values_list = [_calculate_waveform_values([c_requirements]) for c_requirements in c_requirements_list]
+
+    catalog = FoilCapacitorCatalog() if catalog is None else catalog
+    series_name_list = catalog.series_name_list()
+    capacitor_df_list = []
+    for capacitor_series_name in series_name_list:
+        logger.info(f"Capacitor series: {capacitor_series_name}")
+        c_db, is_series_stage_empty = _select_capacitor_series_worst_case(_SeriesCache(catalog.load_series(capacitor_series_name)), c_requirements_list,
+                                                                          waveform_values_list, constraints)
+        if is_series_stage_empty:
+            c_db = _empty_series_stage_result(c_db)
+        if result_sink is not None:
+            result_sink.write(capacitor_series_name, c_db)
+        capacitor_df_list.append(c_db)
+
+    return series_name_list, capacitor_df_list
+
+def select_capacitors_batch(c_requirements_list: list[CapacitorRequirements], number_of_workers: int = 1,
+                            chunk_size: int | None = None, constraints: SelectionConstraints | None = None,
+                            result_sink: ResultSink | None = None, self_heating: str = "worst_case",
+                            catalog: CapacitorCatalog | None = None, achievable_lifetime: bool = False) -> pd.DataFrame:
+    """
+    Select suitable capacitors for many requirements in a single call, e.g. for parameter sweeps.
+
+    The capacitor database and the ESR files are loaded once for all requirements (once per worker process).
+    Requirements with the same current waveform share the minimum capacitance calculation, the spectra of all current waveforms
+    are calculated by a single fft_batch() call.
+    All requirements of the same waveform are evaluated at once in the vectorized engine. Per requirement, the results
+    are identical to select_capacitors().
+
+    For a parallel evaluation, the requirements are split into chunks. Each pair of chunk and capacitor series is a task
+    for the process pool. The result does not depend on number_of_workers or chunk_size.
+
+    :Minimal Example:
+
+    >>> import pecst
+    >>> c_requirements_list = pecst.requirements_grid(c_requirements, temperature_ambient=[70, 80, 90], lifetime_h=[10_000, 30_000])
+    >>> results_df = pecst.select_capacitors_batch(c_requirements_list, number_of_workers=4)
+    >>> results_df.loc[3]  # all designs for c_requirements_list[3]
+
+    :param c_requirements_list: list of capacitor requirements
+    :type c_requirements_list: list[CapacitorRequirements]
+    :param number_of_workers: number of worker processes. Defaults to 1 (serial).
+    :type number_of_workers: int
+    :param chunk_size: maximum number of requirements per task. Defaults to None: one chunk per worker and current waveform.
+    :type chunk_size: int | None
+    :param constraints: optional user limits for maximum volume in m³, cost in euro, PCB area in m² and number of capacitors,
+        same for all requirements
+    :type constraints: SelectionConstraints | None
+    :param result_sink: optional destination for the long-format result, written with the name 'batch'. Defaults to None (not written).
+    :type result_sink: ResultSink | None
+    :param self_heating: 'worst_case'[default] or 'coupled', see select_capacitors()
+    :type self_heating: str
+    :param catalog: catalog of the capacitor series, defaults to the TDK foil capacitor series of the package
+    :type catalog: CapacitorCatalog | None
+    :param achievable_lifetime: True to add the column 'lifetime_achievable', see select_capacitors(). Defaults to False.
+    :type achievable_lifetime: bool
+    :return: long-format data frame with all possible capacitors of all requirements. The index 'requirement_id' is the position
+        in c_requirements_list, the column 'series' contains the capacitor series name.
+    :rtype: pandas.DataFrame
+    """
+    if len(c_requirements_list) == 0:
+        raise ValueError("At least one capacitor requirement must be given.")
+    _check_self_heating(self_heating)
+    if number_of_workers < 1:
+        raise ValueError(f"number_of_workers must be at least 1, but is {number_of_workers}.")
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, but is {chunk_size}.")
+
+    # group the requirements by their current waveform
+    waveform_groups: dict[tuple, list[int]] = {}
+    for requirement_id, c_requirements in enumerate(c_requirements_list):
+        waveform_groups.setdefault(_waveform_key(c_requirements.current_waveform_for_op_max_current), []).append(requirement_id)
+
+    # spectra of all current waveforms in a single FFT
+    fft_memory = dict(zip(waveform_groups.keys(), _calculate_spectra(
+        [c_requirements_list[requirement_id_list[0]].current_waveform_for_op_max_current for requirement_id_list in waveform_groups.values()]),
+        strict=True))
+
+    series_name_list = (FoilCapacitorCatalog() if catalog is None else catalog).series_name_list()
+    task_argument_list = []
+    for requirement_id_list in waveform_groups.values():
+        group_requirements_list = [c_requirements_list[requirement_id] for requirement_id in requirement_id_list]
+        logger.info(f"Evaluate {len(group_requirements_list)} requirements with the same current waveform.")
+        requirement_c_min, i_max, frequency_list, current_amplitude_list = _calculate_waveform_values(group_requirements_list,
+                                                                                                      fft_memory=fft_memory)
+
+        group_chunk_size = chunk_size if chunk_size is not None else int(np.ceil(len(requirement_id_list) / number_of_workers))
+        for chunk_start in range(0, len(requirement_id_list), group_chunk_size):
+            chunk = slice(chunk_start, chunk_start + group_chunk_size)
+            for capacitor_series_name in series_name_list:
+                task_argument_list.append((capacitor_series_name, group_requirements_list[chunk], requirement_id_list[chunk],
+                                           requirement_c_min[chunk], i_max, frequency_list, current_amplitude_list, constraints,
+                                           self_heating, catalog, achievable_lifetime))
+
+    task_result_list = _run_tasks(task_argument_list, number_of_workers)
+
+    result_df = _combine_batch_results([result_df for result_df, _ in task_result_list])
+
+    if result_sink is not None:
+        result_sink.write("batch", result_df)
+
+    return result_df
+
+def requirements_grid(c_requirements: CapacitorRequirements, **parameter_values: list) -> list[CapacitorRequirements]:
+    """
+    Generate a full-factorial grid of capacitor requirements, e.g. as input for select_capacitors_batch().
+
+    :Minimal Example:
+
+    >>> c_requirements_list = requirements_grid(c_requirements, v_dc_for_op_max_voltage=[600, 700, 800], temperature_ambient=[70, 90])
+    >>> len(c_requirements_list)
+    6
+
+    :param c_requirements: base requirements. All parameters not given in parameter_values are taken from here.
+    :type c_requirements: CapacitorRequirements
+    :param parameter_values: parameter name and list of values to sweep, for each parameter to sweep
+    :type parameter_values: list
+    :return: list of capacitor requirements, last given parameter changes fastest
+    :rtype: list[CapacitorRequirements]
+    """
+    parameter_names = list(parameter_values.keys())
+    return [dataclasses.replace(c_requirements, **dict(zip(parameter_names, values, strict=True)))
+            for values in itertools.product(*parameter_values.values())]
@@ -0,0 +1,194 @@
+"""Reusable selection session for many consecutive selections."""
+# python libraries
+import logging
+
+# 3rd party libraries
+import numpy as np
+import pandas as pd
+
+# own libraries
+from pecst.catalog import CapacitorCatalog, FoilCapacitorCatalog
+from pecst.cst_dataclasses import CapacitorRequirements, SelectionConstraints
+from pecst.result_sink import ResultSink
+from pecst.esr_store import get_esr_store
+from pecst.bank_optimization import _select_mixed_capacitor_banks
+from pecst.selection import (_SeriesCache, _calculate_waveform_values,
+                             _select_capacitor_series_vectorized, _select_capacitor_series_worst_case, _empty_series_stage_result,
+                             _waveform_key, _combine_batch_results, _check_self_heating)
+
+logger = logging.getLogger(__name__)
+
+
+class SelectionSession:
+    """
+    Reusable selection session, e.g. for consecutive selections inside an optimizer loop.
+
+    The capacitor database is loaded once when the session is created. Per-capacitor values (volume, area, resonance
+    frequency, cost, heat coefficient, voltage curves) are calculated once. The waveform dependent values (FFT, minimum
+    capacitance, ESR and current capability at the spectrum frequencies) and the lifetime and temperature dependent values
+    are memoized by the requirement fields they depend on. A following selection with e.g. a changed temperature_ambient
+    or lifetime_h only recalculates the stages depending on the changed field.
+
+    Results are identical to select_capacitors() and select_capacitors_batch(), but are not written to files by default.
+
+    :Minimal Example:
+
+    >>> import pecst
+    >>> session = pecst.SelectionSession()
+    >>> for temperature_ambient in [60, 70, 80]:
+    >>>     c_requirements.temperature_ambient = temperature_ambient
+    >>>     series_name_list, c_db_list = session.select_capacitors(c_requirements)
+    """
+
+    def __init__(self, constraints: SelectionConstraints | None = None, result_sink: ResultSink | None = None,
+                 self_heating: str = "worst_case", catalog: CapacitorCatalog | None = None, achievable_lifetime: bool = False) -> None:
+        """
+        Load the capacitor database and calculate the per-capacitor values.
+
+        :param constraints: optional user limits for maximum volume in m³, cost in euro, PCB area in m² and number of capacitors,
+            used for all selections of the session
+        :type constraints: SelectionConstraints | None
+        :param result_sink: optional destination for the results of each selection. Defaults to None (not written).
+            The sink is not closed by the session.
+        :type result_sink: ResultSink | None
+        :param self_heating: 'worst_case'[default] or 'coupled' self-heating model of select_capacitors() and select_capacitors_batch(),
+            see select_capacitors()
+        :type self_heating: str
+        :param catalog: catalog of the capacitor series, defaults to the TDK foil capacitor series of the package
+        :type catalog: CapacitorCatalog | None
+        :param achievable_lifetime: True to add the column 'lifetime_achievable' in select_capacitors() and select_capacitors_batch(),
+            see select_capacitors()
+        :type achievable_lifetime: bool
+        """
+        _check_self_heating(self_heating)
+        self.constraints = constraints
+        self.result_sink = result_sink
+        self.self_heating = self_heating
+        self.achievable_lifetime = achievable_lifetime
+
+        catalog = FoilCapacitorCatalog() if catalog is None else catalog
+        self._series_cache_dict = {capacitor_series_name: _SeriesCache(catalog.load_series(capacitor_series_name))
+                                   for capacitor_series_name in catalog.series_name_list()}
+        self._c_min_memory: dict = {}
+        self._fft_memory: dict = {}
+
+    def clear(self) -> None:
+        """Drop all memoized results and ESR files, e.g. after downloading new ESR files. The capacitor database is kept."""
+        self._series_cache_dict = {capacitor_series_name: _SeriesCache(series_cache.series_data)
+                                   for capacitor_series_name, series_cache in self._series_cache_dict.items()}
+        self._c_min_memory = {}
+        self._fft_memory = {}
+        get_esr_store().clear()
+
+    def _select_waveform_group(self, c_requirements_list: list[CapacitorRequirements]) -> list[tuple[pd.DataFrame, np.ndarray, np.ndarray]]:
+        """
+        Select suitable capacitors of all capacitor series for requirements sharing the same current waveform.
+
+        :param c_requirements_list: capacitor requirements, all with the same current waveform
+        :type c_requirements_list: list[CapacitorRequirements]
+        :return: result of _select_capacitor_series_vectorized() for each capacitor series
+        :rtype: list[tuple[pd.DataFrame, np.ndarray, np.ndarray]]
+        """
+        requirement_c_min, i_max, frequency_list, current_amplitude_list = _calculate_waveform_values(
+            c_requirements_list, self._c_min_memory, self._fft_memory)
+
+        return [_select_capacitor_series_vectorized(series_cache, c_requirements_list, requirement_c_min, i_max, frequency_list,
+                                                    current_amplitude_list, self.constraints, self.self_heating, self.achievable_lifetime)
+                for series_cache in self._series_cache_dict.values()]
+
+    def select_capacitors(self, c_requirements: CapacitorRequirements) -> tuple[list[str], list[pd.DataFrame]]:
+        """
+        Select suitable capacitors for the given application, see select_capacitors().
+
+        :param c_requirements: capacitor requirements
+        :type c_requirements: CapacitorRequirements
+        :return: capacitor series names, data frame with all possible capacitors for each capacitor series
+        :rtype: tuple[list[str], list[pd.DataFrame]]
+        """
+        capacitor_df_list = []
+        for capacitor_series_name, (c_db, _, is_series_stage_empty) in zip(self._series_cache_dict.keys(),
+                                                                           self._select_waveform_group([c_requirements]), strict=True):
+            if is_series_stage_empty[0]:
+                c_db = _empty_series_stage_result(c_db)
+            if self.result_sink is not None:
+                self.result_sink.write(capacitor_series_name, c_db)
+            capacitor_df_list.append(c_db)
+
+        return list(self._series_cache_dict.keys()), capacitor_df_list
+
+    def select_capacitors_worst_case(self, c_requirements_list: list[CapacitorRequirements]) -> tuple[list[str], list[pd.DataFrame]]:
+        """
+        Select suitable capacitors fulfilling the requirements of several operating points, see select_capacitors_worst_case().
+
+        :param c_requirements_list: capacitor requirements for each operating point
+        :type c_requirements_list: list[CapacitorRequirements]
+        :return: capacitor series names, data frame with all possible capacitors for each capacitor series
+        :rtype: tuple[list[str], list[pd.DataFrame]]
+        """
+        if len(c_requirements_list) == 0:
+            raise ValueError("At least one operating point must be given.")
+
+        waveform_values_list = [_calculate_waveform_values([c_requirements], self._c_min_memory, self._fft_memory)
+                                for c_requirements in c_requirements_list]
+        capacitor_df_list = []
+        for capacitor_series_name, series_cache in self._series_cache_dict.items():
+            c_db, is_series_stage_empty = _select_capacitor_series_worst_case(series_cache, c_requirements_list, waveform_values_list,
+                                                                              self.constraints)
+            if is_series_stage_empty:
+                c_db = _empty_series_stage_result(c_db)
+            if self.result_sink is not None:
+                self.result_sink.write(capacitor_series_name, c_db)
+            capacitor_df_list.append(c_db)
+
+        return list(self._series_cache_dict.keys()), capacitor_df_list
+
+    def select_mixed_capacitor_banks(self, c_requirements: CapacitorRequirements, maximum_part_types: int = 2, objective: str = "volume",
+                                     number_of_results: int = 10) -> pd.DataFrame:
+        """
+        Search the best capacitor banks combining different capacitors of a series, see select_mixed_capacitor_banks().
+
+        :param c_requirements: capacitor requirements
+        :type c_requirements: CapacitorRequirements
+        :param maximum_part_types: maximum number of different capacitor types per bank. Defaults to 2.
+        :type maximum_part_types: int
+        :param objective: 'volume'[default], 'cost' or 'area' to minimize
+        :type objective: str
+        :param number_of_results: number of banks to return. Defaults to 10.
+        :type number_of_results: int
+        :return: best capacitor banks, best objective first
+        :rtype: pd.DataFrame
+        """
+        return _select_mixed_capacitor_banks(list(self._series_cache_dict.values()), c_requirements,
+                                             _calculate_waveform_values([c_requirements], self._c_min_memory, self._fft_memory),
+                                             maximum_part_types, objective, number_of_results, self.constraints)
+
+    def select_capacitors_batch(self, c_requirements_list: list[CapacitorRequirements]) -> pd.DataFrame:
+        """
+        Select suitable capacitors for many requirements in a single call, see select_capacitors_batch().
+
+        :param c_requirements_list: list of capacitor requirements
+        :type c_requirements_list: list[CapacitorRequirements]
+        :return: long-format data frame with all possible capacitors of all requirements. The index 'requirement_id' is the position
+            in c_requirements_list, the column 'series' contains the capacitor series name.
+        :rtype: pandas.DataFrame
+        """
+        if len(c_requirements_list) == 0:
+            raise ValueError("At least one capacitor requirement must be given.")
+
+        waveform_groups: dict[tuple, list[int]] = {}
+        for requirement_id, c_requirements in enumerate(c_requirements_list):
+            waveform_groups.setdefault(_waveform_key(c_requirements.current_waveform_for_op_max_current), []).append(requirement_id)
+
+        result_df_list = []
+        for requirement_id_list in waveform_groups.values():
+            series_result_list = self._select_waveform_group([c_requirements_list[requirement_id] for requirement_id in requirement_id_list])
+            for capacitor_series_name, (result_df, requirement_index, _) in zip(self._series_cache_dict.keys(), series_result_list, strict=True):
+                result_df.insert(0, "requirement_id", np.array(requirement_id_list, dtype=int)[requirement_index])
+                result_df.insert(1, "series", capacitor_series_name)
+                result_df_list.append(result_df)
+
+        result_df = _combine_batch_results(result_df_list)
+        if self.result_sink is not None:
+            self.result_sink.write("batch", result_df)
+
+        return result_df
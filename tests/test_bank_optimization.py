@@ -0,0 +1,124 @@
+"""Unit tests for the mixed capacitor bank optimization."""
+
+# python libraries
+import dataclasses
+import itertools
+
+# 3rd party libraries
+import numpy as np
+import pytest
+
+# own libraries
+import pecst
+import pecst.constants as const
+from pecst.bank_optimization import _BestBanks, _select_mixed_capacitor_banks
+from pecst.catalog import FoilCapacitorCatalog
+from pecst.selection import _SeriesCache, _calculate_waveform_values
+
+
+def test_mixed_power_loss_same_capacitors() -> None:
+    """Same-value parallel capacitors share the current equally, same as power_loss_film_capacitor_vectorized()."""
+    frequency_list = np.array([0, 20e3, 40e3, 60e3])
+    current_amplitude_list = np.array([1.0, 30.0, 5.0, 2.0])
+    esr_matrix = np.array([[5e-3, 4e-3, 3e-3, 3e-3]] * 2)
+
+    loss, current_amplitude_per_capacitor = pecst.power_loss_film_capacitor_mixed(
+        esr_matrix, np.array([20e-6, 20e-6]), np.array([20e-9, 20e-9]), np.array([1, 2]), frequency_list, current_amplitude_list)
+
+    np.testing.assert_allclose(current_amplitude_per_capacitor, np.array([current_amplitude_list / 3] * 2), rtol=1e-12)
+    np.testing.assert_allclose(loss, pecst.power_loss_film_capacitor_vectorized(esr_matrix, current_amplitude_list, np.array([3, 3])), rtol=1e-12)
+
+
+def test_mixed_power_loss_current_share() -> None:
+    """At low frequencies, the current is shared according to the capacitance."""
+    loss, current_amplitude_per_capacitor = pecst.power_loss_film_capacitor_mixed(
+        np.array([[1e-3], [1e-3]]), np.array([30e-6, 10e-6]), np.array([0.0, 0.0]), np.array([1, 1]), np.array([100.0]), np.array([4.0]))
+
+    np.testing.assert_allclose(current_amplitude_per_capacitor[:, 0], [3.0, 1.0], rtol=1e-6)
+    np.testing.assert_allclose(loss, 0.5 * 1e-3 * np.array([3.0, 1.0]) ** 2, rtol=1e-5)
+
+
+def test_best_banks() -> None:
+    """Only the best banks are kept, ties keep the bank found first."""
+    best_banks = _BestBanks(number_of_results=2)
+    assert best_banks.bound == np.inf
+
+    for objective, name in [(3.0, "a"), (1.0, "b"), (2.0, "c"), (1.0, "d"), (2.0, "e")]:
+        best_banks.add(objective, {"name": name})
+
+    assert best_banks.bound == 1.0
+    assert [bank["name"] for bank in best_banks.sorted_banks()] == ["b", "d"]
+
+
+def _lowest_volume_brute_force(series_cache: _SeriesCache, c_requirements: pecst.CapacitorRequirements, maximum_part_types: int) -> tuple[float, int]:
+    """
+    Find the lowest bank volume by checking all banks of a single series capacitor, without any pruning of the search.
+
+    :param series_cache: per-capacitor values of the capacitor series
+    :type series_cache: _SeriesCache
+    :param c_requirements: capacitor requirements, with a voltage needing a single series capacitor for all capacitors
+    :type c_requirements: pecst.CapacitorRequirements
+    :param maximum_part_types: maximum number of different capacitor types per bank
+    :type maximum_part_types: int
+    :return: lowest volume in m³, number of capacitor types of the bank with the lowest volume
+    :rtype: tuple[float, int]
+    """
+    requirement_c_min, i_max, frequency_list, current_amplitude_list = _calculate_waveform_values([c_requirements])
+    derating_factor = series_cache.derating_factor(c_requirements.temperature_ambient)
+    delta_temperature_max = derating_factor ** 2 * series_cache.series_data.delta_t_jc_max
+    capacitor_index = np.nonzero(~(series_cache.f_res < frequency_list[0]) & ~np.isnan(series_cache.g_in_w_degree_celsius))[0]
+    esr_matrix, current_capability_matrix = series_cache.limits_at_frequencies(frequency_list, capacitor_index)
+
+    def is_feasible(type_index: np.ndarray, count: np.ndarray) -> bool:
+        capacitance = np.sum(count * series_cache.capacitance[type_index])
+        if capacitance < requirement_c_min[0] / (1 - c_requirements.capacitor_tolerance_percent / 100):
+            return False
+        if i_max / capacitance > np.min(np.nan_to_num(series_cache.dvdt_max[type_index], nan=np.inf)):
+            return False
+        loss, current_amplitude_per_capacitor = pecst.power_loss_film_capacitor_mixed(
+            esr_matrix[type_index], series_cache.capacitance[type_index], series_cache.esl[type_index], count, frequency_list, current_amplitude_list)
+        if np.any(current_amplitude_per_capacitor > derating_factor * np.sqrt(2) * current_capability_matrix[type_index]):
+            return False
+        return bool(np.sum(count * loss) / np.min(series_cache.g_in_w_degree_celsius[type_index]) <= delta_temperature_max)
+
+    # single-type banks: the lowest feasible count
+    volume_min, number_part_types = np.inf, 0
+    for type_index in capacitor_index:
+        count = next((count for count in range(1, 1_000) if is_feasible(np.array([type_index]), np.array([count]))), np.inf)
+        if count * series_cache.volume[type_index] < volume_min:
+            volume_min, number_part_types = count * series_cache.volume[type_index], 1
+
+    # mixed banks: all counts with a volume below the best bank found so far
+    for number_types in range(2, maximum_part_types + 1):
+        for type_tuple in itertools.combinations(capacitor_index, number_types):
+            type_index = np.array(type_tuple)
+            for count_tuple in itertools.product(*[range(1, int(volume_min / series_cache.volume[index]) + 1) for index in type_index]):
+                volume = np.sum(np.array(count_tuple) * series_cache.volume[type_index])
+                if volume < volume_min and is_feasible(type_index, np.array(count_tuple)):
+                    volume_min, number_part_types = volume, number_types
+    return float(volume_min), number_part_types
+
+
+def test_bank_search_equals_brute_force() -> None:
+    """The branch-and-bound search finds the same lowest volume as checking all banks of a three-capacitor catalog."""
+    c_requirements = pecst.CapacitorRequirements(
+        maximum_peak_to_peak_voltage_ripple=1, current_waveform_for_op_max_current=np.array([[0, 25e-6, 50e-6], [20, -20, 20]]),
+        v_dc_for_op_max_voltage=100, temperature_ambient=80, voltage_safety_margin_percentage=10,
+        capacitor_type_list=[pecst.CapacitorType.FilmCapacitor], maximum_number_series_capacitors=1,
+        capacitor_tolerance_percent=pecst.CapacitanceTolerance.TenPercent, lifetime_h=30_000, results_directory="")
+    series_data = FoilCapacitorCatalog().load_series(const.FOIL_CAPACITOR_SERIES_NAME_LIST[0])
+    rng = np.random.default_rng(0)
+
+    number_part_types_list = []
+    for _ in range(6):
+        capacitor_index = np.sort(rng.choice(len(series_data.c_db), 3, replace=False))
+        series_cache = _SeriesCache(dataclasses.replace(series_data, c_db=series_data.c_db.iloc[capacitor_index].reset_index(drop=True)))
+
+        result_df = _select_mixed_capacitor_banks([series_cache], c_requirements, _calculate_waveform_values([c_requirements]),
+                                                  maximum_part_types=3, objective="volume", number_of_results=1, constraints=None)
+        volume_min, number_part_types = _lowest_volume_brute_force(series_cache, c_requirements, maximum_part_types=3)
+        assert result_df["volume_total"].iloc[0] == pytest.approx(volume_min, rel=1e-12)
+        number_part_types_list.append(number_part_types)
+
+    # the catalogs include banks where mixing capacitor types pays off
+    assert 1 in number_part_types_list and max(number_part_types_list) > 1
@@ -0,0 +1,110 @@
+"""Unit tests for the capacitor catalogs and the sorted indexes."""
+
+# python libraries
+import pathlib
+import shutil
+
+# 3rd party libraries
+import numpy as np
+import pandas as pd
+import pytest
+
+# own libraries
+import pecst
+import pecst.constants as const
+from pecst.selection import _get_series_cache
+
+
+def _c_requirements(**parameter_values: float) -> pecst.CapacitorRequirements:
+    """
+    Get capacitor requirements for the selection tests.
+
+    :param parameter_values: changed requirement values
+    :type parameter_values: float
+    :return: capacitor requirements
+    :rtype: pecst.CapacitorRequirements
+    """
+    c_requirements = pecst.CapacitorRequirements(
+        maximum_peak_to_peak_voltage_ripple=1, current_waveform_for_op_max_current=np.array([[0, 2.5e-6, 5e-6], [10, -10, 10]]),
+        v_dc_for_op_max_voltage=700, temperature_ambient=80, voltage_safety_margin_percentage=10,
+        capacitor_type_list=[pecst.CapacitorType.FilmCapacitor], maximum_number_series_capacitors=2,
+        capacitor_tolerance_percent=pecst.CapacitanceTolerance.TenPercent, lifetime_h=30_000, results_directory="")
+    return pecst.requirements_grid(c_requirements, **{name: [value] for name, value in parameter_values.items()})[0]
+
+
+def test_sorted_index_range() -> None:
+    """Range queries equal the brute force comparison, NaN values are never part of a range."""
+    values = np.array([3.0, 1.0, np.nan, 2.0, 3.0, 5.0, np.nan, 4.0])
+    sorted_index = pecst.SortedIndex(values)
+
+    for minimum, maximum in [(-np.inf, np.inf), (2.0, 3.0), (3.0, 3.0), (2.5, 10.0), (6.0, 7.0), (4.0, 2.0)]:
+        expected_index = np.nonzero((values >= minimum) & (values <= maximum))[0]
+        np.testing.assert_array_equal(np.sort(sorted_index.range(minimum, maximum)), expected_index)
+        assert sorted_index.count(minimum, maximum) == len(expected_index)
+        np.testing.assert_array_equal(sorted_index.is_in_range(np.arange(len(values)), minimum, maximum), (values >= minimum) & (values <= maximum))
+
+
+def test_candidate_capacitors() -> None:
+    """Candidate capacitors equal the brute force comparison of all ranges."""
+    series_cache = _get_series_cache(const.FOIL_CAPACITOR_SERIES_NAME_LIST[0], series_cache_dict={})
+
+    np.testing.assert_array_equal(series_cache.candidate_capacitors(), np.arange(len(series_cache.capacitance)))
+    for voltage_rating_min, capacitance_min, volume_max in [(500, -np.inf, np.inf), (800, 10e-6, np.inf), (-np.inf, 5e-6, 1e-4), (1000, 20e-6, 2e-4)]:
+        is_expected = (series_cache.voltage_rating >= voltage_rating_min) & (series_cache.capacitance >= capacitance_min) & \
+            (series_cache.volume <= volume_max)
+        np.testing.assert_array_equal(series_cache.candidate_capacitors(voltage_rating_min, capacitance_min, volume_max), np.nonzero(is_expected)[0])
+
+
+def test_range_queries_keep_results() -> None:
+    """Narrowing down the capacitors by range queries gives the same designs as checking the constraints for all capacitors."""
+    c_requirements_list = pecst.requirements_grid(_c_requirements(), v_dc_for_op_max_voltage=[400, 700, 1100], maximum_number_series_capacitors=[1, 3])
+    constraints = pecst.SelectionConstraints(maximum_volume=1e-4, maximum_number_capacitors=6)
+
+    result_df = pecst.select_capacitors_batch(c_requirements_list)
+    is_within_constraints = ~(result_df["volume_total"] > constraints.maximum_volume) & \
+        ~(result_df["in_parallel_needed"] * result_df["in_series_needed"] > constraints.maximum_number_capacitors)
+    pd.testing.assert_frame_equal(pecst.select_capacitors_batch(c_requirements_list, constraints=constraints), result_df[is_within_constraints])
+
+
+def test_combined_catalog(tmp_path: pathlib.Path) -> None:
+    """
+    Capacitor series of several data directories are selected like the capacitor series of the package.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: pathlib.Path
+    """
+    package_data_directory = pathlib.Path(pecst.__file__).parent / const.FOIL_CAPACITOR_DATA_DIRECTORY
+    package_cache_file_set = set((pathlib.Path(pecst.__file__).parent / const.CATALOG_CACHE_DIRECTORY).glob("*.pkl"))
+    series_values = pd.read_csv(package_data_directory / f"{const.FOIL_CAPACITOR_SERIES_VALUES}.csv", delimiter=';', decimal=',')
+    catalog_list = []
+    for count_catalog, capacitor_series_name_list in enumerate([["B3277*P"], ["B3271*P", "B3272*AGT"]]):
+        data_directory = tmp_path / f"manufacturer_{count_catalog}"
+        for capacitor_series_name in capacitor_series_name_list:
+            shutil.copytree(package_data_directory / capacitor_series_name, data_directory / capacitor_series_name)
+        series_values[series_values["series"].isin(capacitor_series_name_list)].to_csv(
+            data_directory / f"{const.FOIL_CAPACITOR_SERIES_VALUES}.csv", sep=';', decimal=',', index=False)
+        catalog_list.append(pecst.FoilCapacitorCatalog(data_directory))
+    catalog = pecst.CombinedCatalog(tuple(catalog_list))
+
+    c_requirements = _c_requirements()
+    series_name_list, c_db_list = pecst.select_capacitors(c_requirements, result_sink=pecst.NoResultSink(), catalog=catalog)
+    assert series_name_list == ["B3277*P", "B3271*P", "B3272*AGT"]
+    expected_series_name_list, expected_c_db_list = pecst.select_capacitors(c_requirements, result_sink=pecst.NoResultSink())
+    for capacitor_series_name, c_db in zip(series_name_list, c_db_list, strict=True):
+        pd.testing.assert_frame_equal(c_db, expected_c_db_list[expected_series_name_list.index(capacitor_series_name)])
+
+    with pytest.raises(ValueError):
+        pecst.CombinedCatalog((catalog, pecst.FoilCapacitorCatalog()))
+
+    # own capacitor data is cached inside its data directory, not in the package
+    assert set((pathlib.Path(pecst.__file__).parent / const.CATALOG_CACHE_DIRECTORY).glob("*.pkl")) <= package_cache_file_set
+    assert len(list(tmp_path.glob(f"manufacturer_*/{const.CATALOG_CACHE_DIRECTORY}/*.pkl"))) == 3
+
+
+def test_incomplete_catalog() -> None:
+    """Catalogs without series_name_list() and load_series() can not be created."""
+    class IncompleteCatalog(pecst.CapacitorCatalog):
+        """Catalog without series_name_list() and load_series()."""
+
+    with pytest.raises(TypeError):
+        IncompleteCatalog()  # type: ignore[abstract]
@@ -0,0 +1,165 @@
+"""Unit tests for the ESR file downloads against a local HTTP server."""
+
+# python libraries
+import collections
+import hashlib
+import http.server
+import json
+import pathlib
+import threading
+from collections.abc import Iterator
+
+# 3rd party libraries
+import pytest
+
+# own libraries
+import pecst
+
+
+class _EsrRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Local stand-in for the manufacturer server.
+
+    '/ok/<name>' works, '/flaky/<name>' fails twice with 503, '/missing' returns 404. '/etag/<name>' sends the ETag of
+    file_version and answers conditional requests of the same version with 304.
+    """
+
+    request_count: collections.Counter = collections.Counter()
+    file_version = 1
+
+    def do_GET(self) -> None:
+        """Answer a GET request."""
+        self.request_count[self.path] += 1
+        etag = f'"v{self.file_version}"'
+        if self.path.startswith("/etag/") and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+        elif self.path.startswith(("/ok/", "/etag/")) or (self.path.startswith("/flaky/") and self.request_count[self.path] > 2):
+            body = f"F_HZ,ESR_FINAL\n100,{self.path} {self.file_version}\n".encode()
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_response(503 if self.path.startswith("/flaky/") else 404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def log_message(self, log_format: str, *args: object) -> None:
+        """
+        Suppress the request log.
+
+        :param log_format: format string of the log message
+        :type log_format: str
+        :param args: arguments of the log message
+        :type args: object
+        """
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    """
+    Start the local HTTP server in a background thread.
+
+    :return: base URL of the server
+    :rtype: Iterator[str]
+    """
+    _EsrRequestHandler.request_count.clear()
+    _EsrRequestHandler.file_version = 1
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _EsrRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_files(server_url: str, tmp_path: pathlib.Path) -> None:
+    """
+    Concurrent downloads with retries of server errors, failed downloads are reported and existing files are skipped.
+
+    :param server_url: base URL of the local HTTP server
+    :type server_url: str
+    :param tmp_path: temporary directory
+    :type tmp_path: pathlib.Path
+    """
+    (tmp_path / "existing.csv").write_text("old")
+    url_path_list = [(f"{server_url}/ok/{index}", tmp_path / f"{index}.csv") for index in range(10)]
+    url_path_list += [(f"{server_url}/flaky/a", tmp_path / "flaky.csv"), (f"{server_url}/missing", tmp_path / "missing.csv"),
+                      (f"{server_url}/ok/existing", tmp_path / "existing.csv")]
+
+    result_list = pecst.download_files(url_path_list, number_of_workers=4, timeout=5, maximum_retries=3, backoff_factor=0)
+
+    assert [result.url for result in result_list] == [url for url, _ in url_path_list]
+    for index, result in enumerate(result_list[:10]):
+        assert (result.status, result.status_code, result.attempts) == ("downloaded", 200, 1)
+        assert (tmp_path / f"{index}.csv").read_text() == f"F_HZ,ESR_FINAL\n100,/ok/{index} 1\n"
+    assert (result_list[10].status, result_list[10].attempts) == ("downloaded", 3)
+    # 404 is not retried
+    assert (result_list[11].status, result_list[11].status_code, result_list[11].attempts) == ("failed", 404, 1)
+    assert not (tmp_path / "missing.csv").exists()
+    assert result_list[12].status == "skipped"
+    assert (tmp_path / "existing.csv").read_text() == "old"
+
+
+def test_download_files_retries_exhausted(server_url: str, tmp_path: pathlib.Path) -> None:
+    """
+    Retries stop after maximum_retries, unreachable servers are reported as failed.
+
+    :param server_url: base URL of the local HTTP server
+    :type server_url: str
+    :param tmp_path: temporary directory
+    :type tmp_path: pathlib.Path
+    """
+    result_list = pecst.download_files([(f"{server_url}/flaky/b", tmp_path / "b.csv")], maximum_retries=1, backoff_factor=0)
+    assert (result_list[0].status, result_list[0].status_code, result_list[0].attempts) == ("failed", 503, 2)
+    assert _EsrRequestHandler.request_count["/flaky/b"] == 2
+
+    # closed port
+    result_list = pecst.download_files([("http://127.0.0.1:1/c", tmp_path / "c.csv")], timeout=1, maximum_retries=1, backoff_factor=0)
+    assert (result_list[0].status, result_list[0].status_code, result_list[0].attempts) == ("failed", None, 2)
+    assert result_list[0].error is not None
+
+
+def test_download_files_manifest(server_url: str, tmp_path: pathlib.Path) -> None:
+    """
+    Damaged files are detected by the manifest and downloaded again, a refresh only transfers changed files.
+
+    :param server_url: base URL of the local HTTP server
+    :type server_url: str
+    :param tmp_path: temporary directory
+    :type tmp_path: pathlib.Path
+    """
+    manifest_file = tmp_path / "manifest.json"
+    url_path_list = [(f"{server_url}/etag/{index}", tmp_path / f"{index}.csv") for index in range(3)]
+
+    result_list = pecst.download_files(url_path_list, manifest_file=manifest_file)
+    assert [result.status for result in result_list] == ["downloaded"] * 3
+    manifest = json.loads(manifest_file.read_text())["files"]
+    content = (tmp_path / "0.csv").read_bytes()
+    assert manifest["0.csv"]["size"] == len(content)
+    assert manifest["0.csv"]["sha256"] == hashlib.sha256(content).hexdigest()
+    assert (manifest["0.csv"]["url"], manifest["0.csv"]["etag"]) == (url_path_list[0][0], '"v1"')
+    assert pecst.verify_files(manifest_file) == {"0.csv": "ok", "1.csv": "ok", "2.csv": "ok"}
+    assert list(tmp_path.glob("*.tmp")) == []
+
+    # truncated and deleted files
+    (tmp_path / "1.csv").write_bytes(content[:5])
+    (tmp_path / "2.csv").unlink()
+    assert pecst.verify_files(manifest_file) == {"0.csv": "ok", "1.csv": "modified", "2.csv": "missing"}
+    result_list = pecst.download_files(url_path_list, manifest_file=manifest_file)
+    assert [result.status for result in result_list] == ["skipped", "downloaded", "downloaded"]
+    assert pecst.verify_files(manifest_file) == {"0.csv": "ok", "1.csv": "ok", "2.csv": "ok"}
+
+    # refresh with conditional requests: unchanged files are not transferred
+    result_list = pecst.download_files(url_path_list, manifest_file=manifest_file, refresh=True)
+    assert [result.status for result in result_list] == ["not_modified"] * 3
+    assert (tmp_path / "0.csv").read_bytes() == content
+
+    _EsrRequestHandler.file_version = 2
+    result_list = pecst.download_files(url_path_list[:1], manifest_file=manifest_file, refresh=True)
+    assert result_list[0].status == "downloaded"
+    assert (tmp_path / "0.csv").read_text().endswith(" 2\n")
+    assert json.loads(manifest_file.read_text())["files"]["0.csv"]["etag"] == '"v2"'
+    assert pecst.verify_files(manifest_file) == {"0.csv": "ok", "1.csv": "ok", "2.csv": "ok"}
@@ -0,0 +1,91 @@
+"""Unit tests for the ESR store."""
+
+# python libraries
+import os
+import pathlib
+import sys
+
+# 3rd party libraries
+import numpy as np
+import pytest
+
+# own libraries
+import pecst
+
+
+def _write_esr_file(file_path: pathlib.Path, esr_milli_ohm: float, modification_time_ns: int) -> None:
+    """
+    Write an ESR file with constant ESR.
+
+    :param file_path: file path
+    :type file_path: pathlib.Path
+    :param esr_milli_ohm: ESR in mOhm
+    :type esr_milli_ohm: float
+    :param modification_time_ns: modification time of the file in ns
+    :type modification_time_ns: int
+    """
+    file_path.write_text(f"F_HZ,ESR_FINAL,EDITION_DATE,IRMS_FINAL_AT_TOP\n100,{esr_milli_ohm},2024-01-01,1.5\n1000,{esr_milli_ohm},2024-01-01,2.5\n")
+    os.utime(file_path, ns=(modification_time_ns, modification_time_ns))
+
+
+def test_esr_store_reload_and_eviction(tmp_path: pathlib.Path) -> None:
+    """
+    Changed files are read again, the least recently used file is dropped first.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: pathlib.Path
+    """
+    for order_number in ["A1K0", "B2K0", "C3K0"]:
+        _write_esr_file(tmp_path / f"{order_number}.csv", 10, 1_000_000_000)
+    esr_store = pecst.EsrStore(tmp_path, maximum_size=2)
+
+    limits = esr_store.get("A1+0")
+    np.testing.assert_array_equal(limits.frequency, [100, 1000])
+    np.testing.assert_array_equal(limits.esr, [10e-3, 10e-3])
+    np.testing.assert_array_equal(limits.current_capability, [1.5, 2.5])
+    assert esr_store.get("A1K0") is limits
+
+    _write_esr_file(tmp_path / "A1K0.csv", 20, 2_000_000_000)
+    np.testing.assert_array_equal(esr_store.get("A1K0").esr, [20e-3, 20e-3])
+
+    esr_store.get("B2K0")
+    esr_store.get("A1K0")
+    esr_store.get("C3K0")
+    assert len(esr_store) == 2
+    assert "A1K0" in esr_store and "B2K0" not in esr_store
+
+    esr_matrix, current_capability_matrix = esr_store.at_frequencies(["A1K0", "C3K0"], np.array([100, 550]))
+    np.testing.assert_allclose(esr_matrix, [[20e-3, 20e-3], [10e-3, 10e-3]])
+    np.testing.assert_allclose(current_capability_matrix, [[1.5, 2.0], [1.5, 2.0]])
+
+
+def test_esr_database(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    The ESR store reads the curves from the database, except for ESR files changed after building the database.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: pathlib.Path
+    :param monkeypatch: pytest monkeypatch fixture
+    :type monkeypatch: pytest.MonkeyPatch
+    """
+    _write_esr_file(tmp_path / "A1K0.csv", 10, 1_000_000_000)
+    _write_esr_file(tmp_path / "B2K0.csv", 30, 1_000_000_000)
+    monkeypatch.setattr(sys, "argv", ["pecst-build-esr-database", "--esr-directory", str(tmp_path)])
+    pecst.esr_database.main()
+
+    esr_database = pecst.EsrDatabase(tmp_path / "esr_database.bin")
+    assert len(esr_database) == 2
+    limits = esr_database.get("B2K0")
+    assert limits is not None
+    np.testing.assert_array_equal(limits.esr, [30e-3, 30e-3])
+    assert esr_database.get("B2K0", modification_time=2_000_000_000) is None
+    assert esr_database.get("C3K0") is None
+
+    # database only, newer ESR file
+    (tmp_path / "A1K0.csv").unlink()
+    _write_esr_file(tmp_path / "B2K0.csv", 40, 2_000_000_000)
+    esr_store = pecst.EsrStore(tmp_path)
+    np.testing.assert_array_equal(esr_store.get("A1K0").esr, [10e-3, 10e-3])
+    np.testing.assert_array_equal(esr_store.get("B2K0").esr, [40e-3, 40e-3])
+    with pytest.raises(FileNotFoundError):
+        esr_store.get("C3K0")
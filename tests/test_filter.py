@@ -0,0 +1,131 @@
+"""Unit tests for the Pareto filter."""
+
+# 3rd party libraries
+import numpy as np
+import pandas as pd
+
+# own libraries
+import pecst
+from pecst.filter import _is_pareto_efficient, _non_dominated_ranks, _pareto_front_from_df
+
+
+def _random_batch(rng: np.random.Generator, size: int) -> pd.DataFrame:
+    """
+    Create random designs with rounded objective values, so equal values occur.
+
+    :param rng: random number generator
+    :type rng: np.random.Generator
+    :param size: number of designs
+    :type size: int
+    :return: designs
+    :rtype: pd.DataFrame
+    """
+    return pd.DataFrame({"volume_total": np.round(rng.random(size), 1), "power_loss_total": np.round(rng.random(size), 1),
+                         "ordering code": rng.integers(0, 1000, size)})
+
+
+def _is_pareto_efficient_brute_force(costs: np.ndarray) -> np.ndarray:
+    """
+    Compare all designs with each other: a design is efficient if no other design dominates it and no design before is equal.
+
+    :param costs: An (n_points, n_costs) array
+    :type costs: np.ndarray
+    :return: True for each pareto-efficient point
+    :rtype: np.ndarray
+    """
+    is_complete = ~np.any(np.isnan(costs), axis=1)
+    is_weakly_dominated = np.all(costs[:, np.newaxis, :] <= costs[np.newaxis, :, :], axis=2) & is_complete[:, np.newaxis]
+    is_dominated = is_weakly_dominated & np.any(costs[:, np.newaxis, :] < costs[np.newaxis, :, :], axis=2)
+    is_equal_before = np.triu(is_weakly_dominated & ~is_dominated, k=1)
+    is_efficient: np.ndarray = is_complete & ~np.any(is_dominated | is_equal_before, axis=0)
+    return is_efficient
+
+
+def test_pareto_efficient_equals_brute_force() -> None:
+    """Sort and sweep (2 costs) and Kung's algorithm (more costs) equal the brute force front, also with ties, infinite and NaN costs."""
+    rng = np.random.default_rng(0)
+    for number_of_costs in [1, 2, 3, 4]:
+        for size in [0, 1, 50, 700, 1_500]:
+            costs = np.round(rng.random((size, number_of_costs)) * 5)
+            costs[rng.random(costs.shape) < 0.02] = np.nan
+            costs[rng.random(costs.shape) < 0.02] = np.inf
+            is_efficient = _is_pareto_efficient(costs)
+            np.testing.assert_array_equal(is_efficient, _is_pareto_efficient_brute_force(costs))
+            np.testing.assert_array_equal(_is_pareto_efficient(costs, return_mask=False), np.nonzero(is_efficient)[0])
+
+            # the ranks are the fronts peeled off one after another
+            rank = _non_dominated_ranks(costs)
+            expected_rank = np.full(size, -1)
+            remaining_index = np.nonzero(~np.any(np.isnan(costs), axis=1))[0]
+            count_rank = 0
+            while len(remaining_index) > 0:
+                is_front = _is_pareto_efficient(costs[remaining_index])
+                expected_rank[remaining_index[is_front]] = count_rank
+                remaining_index = remaining_index[~is_front]
+                count_rank += 1
+            np.testing.assert_array_equal(rank, expected_rank)
+            np.testing.assert_array_equal(_non_dominated_ranks(costs, number_of_ranks=2), np.where(expected_rank < 2, expected_rank, -1))
+
+
+def test_pareto_front_and_non_dominated_sorting() -> None:
+    """Fronts of data frames for any number of objectives, designs with missing objective values are dropped."""
+    df = pd.DataFrame({"volume_total": [1.0, 2.0, 2.0, np.nan, 1.0, 3.0], "power_loss_total": [3.0, 2.0, 2.0, 0.0, 3.0, 3.0],
+                       "cost": [5.0, 6.0, 1.0, 0.0, 5.0, 1.0]})
+
+    pd.testing.assert_frame_equal(_pareto_front_from_df(df, x="volume_total", y="power_loss_total"), df.iloc[[0, 1]])
+    pd.testing.assert_frame_equal(pecst.pareto_front(df, objectives=("volume_total", "power_loss_total", "cost")), df.iloc[[0, 2]])
+
+    sorted_df = pecst.non_dominated_sorting(df, objectives=("volume_total", "power_loss_total", "cost"))
+    assert sorted_df.index.tolist() == [0, 1, 2, 4, 5]
+    assert sorted_df["pareto_rank"].tolist() == [0, 1, 0, 1, 1]
+    assert pecst.non_dominated_sorting(df, number_of_ranks=1, rank_column="rank")["rank"].index.tolist() == [0, 1]
+
+
+def test_pareto_archive_equals_full_front() -> None:
+    """The incremental front is identical to the front of all batches concatenated."""
+    rng = np.random.default_rng(0)
+    batch_list = [_random_batch(rng, 50) for _ in range(8)]
+
+    archive = pecst.ParetoArchive()
+    for batch_df in batch_list:
+        archive.add(batch_df)
+
+    full_front_df = _pareto_front_from_df(pd.concat(batch_list), x="volume_total", y="power_loss_total")
+    pd.testing.assert_frame_equal(archive.front.drop(columns="batch"), full_front_df)
+    assert len(archive) == len(full_front_df)
+
+
+def test_pareto_archive_merge_and_changed_batches() -> None:
+    """Merged archives give the same front as a single archive, batches not changing the front are not reported."""
+    batch_a = pd.DataFrame({"volume_total": [1.0, 3.0], "power_loss_total": [3.0, 1.0]})
+    batch_b = pd.DataFrame({"volume_total": [2.0, 4.0, np.nan], "power_loss_total": [2.0, 4.0, 0.0]})
+    batch_c = pd.DataFrame({"volume_total": [0.5, 3.0], "power_loss_total": [3.0, 1.0]})
+
+    archive = pecst.ParetoArchive()
+    assert archive.add(batch_a, batch="a") == 2
+    assert archive.add(batch_b, batch="b") == 1
+    assert archive.add(batch_a, batch="d") == 0
+    worker_archive = pecst.ParetoArchive()
+    worker_archive.add(batch_c, batch="c")
+    assert archive.merge(worker_archive) == 1
+
+    assert archive.changed_batches == ["a", "b", "c"]
+    assert archive.front["batch"].tolist() == ["a", "b", "c"]
+    np.testing.assert_array_equal(archive.front[["volume_total", "power_loss_total"]].to_numpy(), [[3.0, 1.0], [2.0, 2.0], [0.5, 3.0]])
+
+
+def test_pareto_archive_result_sink_with_empty_series() -> None:
+    """Capacitor series without designs lack the cost and area columns, the archive skips them as result sink."""
+    c_requirements = pecst.CapacitorRequirements(
+        maximum_peak_to_peak_voltage_ripple=1, current_waveform_for_op_max_current=np.array([[0, 2.5e-6, 5e-6], [10, -10, 10]]),
+        v_dc_for_op_max_voltage=1100, temperature_ambient=80, voltage_safety_margin_percentage=10,
+        capacitor_type_list=[pecst.CapacitorType.FilmCapacitor], maximum_number_series_capacitors=1,
+        capacitor_tolerance_percent=pecst.CapacitanceTolerance.TenPercent, lifetime_h=30_000, results_directory="")
+
+    archive = pecst.ParetoArchive(objectives=("volume_total", "cost"))
+    series_name_list, c_db_list = pecst.select_capacitors(c_requirements, result_sink=archive)
+
+    assert any(len(c_db) == 0 and "cost" not in c_db.columns for c_db in c_db_list)
+    full_front_df = _pareto_front_from_df(pd.concat([c_db for c_db in c_db_list if len(c_db) > 0]), x="volume_total", y="cost")
+    assert len(archive) == len(full_front_df) > 0
+    assert set(archive.changed_batches) < set(series_name_list)
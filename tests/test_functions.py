@@ -0,0 +1,51 @@
+"""Unit tests for the helper functions."""
+
+# 3rd party libraries
+import numpy as np
+
+# own libraries
+import pecst
+
+
+def test_fft_analytic_triangle() -> None:
+    """Analytic spectrum of a triangular current: odd harmonics with 8 * amplitude / (pi * n)^2."""
+    triangle = np.array([[0, 5e-6, 10e-6], [-10, 10, -10]])
+
+    frequency_list, amplitude_list, _ = pecst.fft(triangle, mode='time', method='analytic', filter_type='disabled')
+
+    assert len(frequency_list) == 501
+    np.testing.assert_allclose(frequency_list[:4], [0, 100e3, 200e3, 300e3])
+    harmonic = np.arange(1, 501)
+    expected = np.where(harmonic % 2 == 1, 80 / (np.pi * harmonic) ** 2, 0)
+    np.testing.assert_allclose(amplitude_list[1:], expected, atol=1e-12)
+    assert abs(amplitude_list[0]) < 1e-12
+
+
+def test_fft_analytic_steps_and_filter() -> None:
+    """Steps are given by equal consecutive times, the filter is applied to the analytic spectrum as well."""
+    square = np.array([[0, 0, 5e-6, 5e-6, 10e-6], [0, 1, 1, -1, -1]], dtype=float)
+
+    frequency_list, amplitude_list, _ = pecst.fft(square, mode='time', method='analytic', filter_type='harmonic', filter_value_harmonic=6)
+
+    np.testing.assert_allclose(frequency_list, [0, 100e3, 200e3, 300e3, 400e3, 500e3])
+    np.testing.assert_allclose(amplitude_list, [0, 4 / np.pi, 0, 4 / (3 * np.pi), 0, 4 / (5 * np.pi)], atol=1e-12)
+
+
+def test_fft_batch_equals_fft() -> None:
+    """Batched spectra of waveforms with different lengths and periods equal the single waveform spectra, in both layouts."""
+    waveform_list = [np.array([[0, 5e-6, 10e-6], [-10, 10, -10]]), np.array([[0, 2e-6, 3e-6, 20e-6], [-5, 5, 1, -5]]),
+                     np.array([[0, 0, 5e-6, 5e-6, 10e-6], [0, 1, 1, -1, -1]])]
+
+    csr_table = pecst.fft_batch(waveform_list)
+    padded_table = pecst.fft_batch(waveform_list, output='padded')
+
+    np.testing.assert_array_equal(csr_table.offsets, np.concatenate([[0], np.cumsum(csr_table.number_of_harmonics)]))
+    for count, waveform in enumerate(waveform_list):
+        frequency_list, amplitude_list, _ = pecst.fft(waveform.copy(), mode='time')
+        number_of_harmonics = len(frequency_list)
+        np.testing.assert_array_equal(csr_table.frequency[csr_table.offsets[count]:csr_table.offsets[count + 1]], frequency_list)
+        np.testing.assert_allclose(csr_table.amplitude[csr_table.offsets[count]:csr_table.offsets[count + 1]], amplitude_list, atol=1e-12)
+        np.testing.assert_array_equal(padded_table.frequency[count, :number_of_harmonics], frequency_list)
+        np.testing.assert_allclose(padded_table.amplitude[count, :number_of_harmonics], amplitude_list, atol=1e-12)
+        assert np.all(np.isnan(padded_table.frequency[count, number_of_harmonics:]))
+        assert np.all(padded_table.amplitude[count, number_of_harmonics:] == 0)
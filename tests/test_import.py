@@ -0,0 +1,47 @@
+"""Unit tests for the lazy package import."""
+
+# python libraries
+import importlib
+import subprocess
+import sys
+
+# 3rd party libraries
+import pytest
+
+# own libraries
+import pecst
+
+# dependencies to be imported only when used: plotting, interpolation for lifetime curves and downloads
+_ON_DEMAND_MODULES = ["matplotlib", "scipy", "requests"]
+
+
+def _imported_modules(code: str) -> list[str]:
+    """
+    Run code in a new interpreter and list the imported on-demand dependencies.
+
+    :param code: python code to run
+    :type code: str
+    :return: imported modules of _ON_DEMAND_MODULES
+    :rtype: list[str]
+    """
+    output = subprocess.run([sys.executable, "-c", f"import sys\n{code}\nprint(' '.join(m for m in {_ON_DEMAND_MODULES} if m in sys.modules))"],
+                            capture_output=True, text=True, check=True).stdout
+    return output.split()
+
+
+def test_import_without_on_demand_dependencies() -> None:
+    """Importing the package and the selection API does not import matplotlib, scipy and requests."""
+    assert _imported_modules("import pecst") == []
+    assert _imported_modules("import pecst\npecst.select_capacitors, pecst.select_capacitors_batch, pecst.SelectionSession, pecst.ParetoArchive") == []
+    assert _imported_modules("from pecst import select_capacitors, CapacitorRequirements") == []
+    assert _imported_modules("import pecst\npecst.download_esr_csv_files") == ["requests"]
+
+
+def test_lazy_public_names() -> None:
+    """All public names are available and identical to the objects of their submodules."""
+    for name in pecst.__all__:
+        assert getattr(pecst, name) is getattr(importlib.import_module(pecst._NAME_SUBMODULE[name]), name)
+    assert set(pecst.__all__) <= set(dir(pecst))
+
+    with pytest.raises(AttributeError):
+        _ = pecst.not_existing_name
@@ -0,0 +1,93 @@
+"""Unit tests for the lifetime derating."""
+
+# 3rd party libraries
+import numpy as np
+
+# own libraries
+import pecst
+
+
+def _lifetime_curve(lt_dto_list: list[pecst.LifetimeDerating], voltage_rating: float, temperature: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get a lifetime curve of the datasheet.
+
+    :param lt_dto_list: lifetime_h DTO list
+    :type lt_dto_list: list[LifetimeDerating]
+    :param voltage_rating: voltage rating in V
+    :type voltage_rating: float
+    :param temperature: temperature of the lifetime curve in degree Celsius
+    :type temperature: float
+    :return: lifetime in hours, voltage in V
+    :rtype: tuple[np.ndarray, np.ndarray]
+    """
+    lt_dto = next(lt_dto for lt_dto in lt_dto_list if lt_dto.voltage == voltage_rating and lt_dto.temperature == temperature)
+    return lt_dto.lifetime["lifetime"].to_numpy(), lt_dto.lifetime["voltage"].to_numpy()
+
+
+def test_lifetime_derating_surface() -> None:
+    """The surface interpolates the datasheet curves, geometric between temperatures and semilogarithmic over the lifetime."""
+    lt_dto_list = pecst.load_dc_film_capacitors("B3277*P")[4]
+    lifetime_derating_surface = pecst.LifetimeDeratingSurface(lt_dto_list)
+    lifetime_list = np.geomspace(2_000, 100_000, 7)
+
+    # datasheet curve temperature and first bisection temperature between the 85 °C and 95 °C curves
+    lifetime_85, voltage_85 = _lifetime_curve(lt_dto_list, 630, 85)
+    np.testing.assert_array_equal(lifetime_derating_surface.voltage(lifetime_list, 85, 630),
+                                  np.interp(np.log10(lifetime_list), np.log10(lifetime_85), voltage_85))
+    lifetime_95, voltage_95 = _lifetime_curve(lt_dto_list, 630, 95)
+    np.testing.assert_array_equal(lifetime_derating_surface.voltage(lifetime_list, 90, 630), np.interp(
+        np.log10(lifetime_list), np.log10(np.sqrt(lifetime_85 * lifetime_95)), np.sqrt(voltage_85 * voltage_95)))
+
+    # temperatures outside the curves use the curve of the lowest or highest temperature, no extrapolation over the lifetime
+    np.testing.assert_array_equal(lifetime_derating_surface.voltage(lifetime_list, 60, 630), lifetime_derating_surface.voltage(lifetime_list, 85, 630))
+    np.testing.assert_array_equal(lifetime_derating_surface.voltage(lifetime_list, 140, 630), lifetime_derating_surface.voltage(lifetime_list, 125, 630))
+    assert np.isnan(lifetime_derating_surface.voltage(1e12, 90, 630))
+    assert np.isnan(lifetime_derating_surface.voltage(30_000, 90, 123))
+
+    # vectorized lookup for (lifetime, temperature, voltage rating) triples equals the single lookups
+    temperature_list = np.array([70, 85, 86.3, 93.7, 101.1, 117.9, 125, 130])
+    voltage_rating_list = np.array([630, 700, 840, 630, 700, 840, 630, 700])
+    voltage_list = lifetime_derating_surface.voltage(lifetime_list[:, np.newaxis], temperature_list, voltage_rating_list)
+    np.testing.assert_array_equal(voltage_list, [[pecst.voltage_rating_due_to_lifetime(lifetime, temperature, voltage_rating, lt_dto_list)
+                                                  for temperature, voltage_rating in zip(temperature_list, voltage_rating_list, strict=True)]
+                                                 for lifetime in lifetime_list])
+    assert np.count_nonzero(np.isnan(voltage_list)) < voltage_list.size / 2
+
+
+def test_lifetime_derating_surface_achievable_lifetime() -> None:
+    """The achievable lifetime is the longest lifetime with at least the given voltage on the interpolated lifetime curve."""
+    lt_dto_list = pecst.load_dc_film_capacitors("B3277*P")[4]
+    lifetime_derating_surface = pecst.LifetimeDeratingSurface(lt_dto_list)
+    rng = np.random.default_rng(0)
+    lifetime_list = 10 ** rng.uniform(3, 6, 1_000)
+    temperature_list = rng.uniform(70, 130, 1_000)
+    voltage_rating_list = rng.choice(lifetime_derating_surface.voltage_rating, 1_000)
+
+    voltage_list = lifetime_derating_surface.voltage(lifetime_list, temperature_list, voltage_rating_list)
+    lifetime_achievable = lifetime_derating_surface.lifetime(voltage_list, temperature_list, voltage_rating_list)
+    is_on_curve = ~np.isnan(voltage_list)
+    assert np.all(lifetime_achievable[is_on_curve] >= lifetime_list[is_on_curve] * (1 - 1e-12))
+    voltage_achievable = lifetime_derating_surface.voltage(lifetime_achievable[is_on_curve], temperature_list[is_on_curve],
+                                                           voltage_rating_list[is_on_curve])
+    assert np.all(voltage_achievable >= voltage_list[is_on_curve] * (1 - 1e-12))
+
+    # voltages below the curve give the longest lifetime of the curve, voltages above the curve give NaN
+    _, lifetime_85, voltage_85 = lifetime_derating_surface.curve(85, 630)
+    assert lifetime_derating_surface.lifetime(np.min(voltage_85) / 2, 85, 630) == np.max(lifetime_85)
+    assert np.isnan(lifetime_derating_surface.lifetime(np.max(voltage_85) * 2, 85, 630))
+    assert np.isnan(lifetime_derating_surface.lifetime(100, 85, 123))
+
+
+def test_lifetime_derating_surface_equals_bisection() -> None:
+    """The surface equals the bisection per capacitor for all series, voltage ratings and temperatures, including NaN and outside the curves."""
+    lifetime_list = np.array([1, 2_000, 30_000, 250_000, 1e12])
+    for capacitor_series_name in pecst.FoilCapacitorCatalog().series_name_list():
+        lt_dto_list = pecst.load_dc_film_capacitors(capacitor_series_name)[4]
+        lifetime_derating_surface = pecst.LifetimeDeratingSurface(lt_dto_list)
+        curve_temperature_list = sorted({lt_dto.temperature for lt_dto in lt_dto_list})
+        temperature_list = np.concatenate([np.arange(curve_temperature_list[0] - 10, curve_temperature_list[-1] + 10, 3.1),
+                                           curve_temperature_list, [np.nan]])
+        for voltage_rating in sorted({lt_dto.voltage for lt_dto in lt_dto_list}) + [1]:
+            voltage_list = lifetime_derating_surface.voltage(lifetime_list[:, np.newaxis], temperature_list, voltage_rating)
+            np.testing.assert_array_equal(voltage_list, [[pecst.voltage_rating_due_to_lifetime(lifetime, temperature, voltage_rating, lt_dto_list)
+                                                          for temperature in temperature_list] for lifetime in lifetime_list])
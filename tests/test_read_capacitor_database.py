@@ -0,0 +1,73 @@
+"""Unit tests for reading the capacitor database."""
+
+# python libraries
+import os
+import pathlib
+import shutil
+
+# 3rd party libraries
+import pandas as pd
+
+# own libraries
+import pecst
+import pecst.constants as const
+from pecst.read_capacitor_database import _catalog_memory, _load_catalog, _parse_dc_film_capacitors
+
+
+def _assert_catalog_equal(catalog: tuple, expected_catalog: tuple) -> None:
+    """
+    Assert two compiled capacitor series to be equal.
+
+    :param catalog: compiled capacitor series
+    :type catalog: tuple
+    :param expected_catalog: expected compiled capacitor series
+    :type expected_catalog: tuple
+    """
+    for df, expected_df in zip(catalog[:4], expected_catalog[:4], strict=True):
+        pd.testing.assert_frame_equal(df, expected_df)
+    assert len(catalog[4]) == len(expected_catalog[4])
+    for lt_dto, expected_lt_dto in zip(catalog[4], expected_catalog[4], strict=True):
+        assert (lt_dto.temperature, lt_dto.voltage) == (expected_lt_dto.temperature, expected_lt_dto.voltage)
+        pd.testing.assert_frame_equal(lt_dto.lifetime, expected_lt_dto.lifetime)
+
+
+def test_load_dc_film_capacitors_cache() -> None:
+    """Cached capacitor series equal the parsed csv files, modifying the returned data does not change the cache."""
+    for capacitor_series_name in const.FOIL_CAPACITOR_SERIES_NAME_LIST:
+        catalog = pecst.load_dc_film_capacitors(capacitor_series_name)
+        _assert_catalog_equal(catalog, pecst.load_dc_film_capacitors(capacitor_series_name, use_cache=False))
+
+        catalog[0]["volume"] = 0.0
+        catalog[4][0].lifetime["voltage"] = 0.0
+        _assert_catalog_equal(pecst.load_dc_film_capacitors(capacitor_series_name), pecst.load_dc_film_capacitors(capacitor_series_name, use_cache=False))
+
+
+def test_catalog_cache_invalidation(tmp_path: pathlib.Path) -> None:
+    """
+    The cache file is used by a new process and invalidated in case a csv file changes.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: pathlib.Path
+    """
+    capacitor_series_name = "B3271*P"
+    film_capacitor_series_path = tmp_path / "data"
+    shutil.copytree(pathlib.Path(pecst.__file__).parent / const.FOIL_CAPACITOR_DATA_DIRECTORY / capacitor_series_name, film_capacitor_series_path)
+    cache_directory = tmp_path / "cache"
+
+    catalog = _load_catalog(capacitor_series_name, film_capacitor_series_path, cache_directory)
+    _assert_catalog_equal(catalog, _parse_dc_film_capacitors(capacitor_series_name, film_capacitor_series_path))
+    assert len(list(cache_directory.glob("*.pkl"))) == 1
+    assert _load_catalog(capacitor_series_name, film_capacitor_series_path, cache_directory) is catalog
+
+    # new process: the in-process memory is empty, the cache file is read
+    _catalog_memory.pop(str(film_capacitor_series_path.absolute()))
+    _assert_catalog_equal(_load_catalog(capacitor_series_name, film_capacitor_series_path, cache_directory), catalog)
+
+    # changed datasheet: drop the last capacitor
+    database_file = film_capacitor_series_path / f"{capacitor_series_name}.csv"
+    modification_time_ns = database_file.stat().st_mtime_ns
+    database_file.write_text("".join(database_file.read_text().splitlines(keepends=True)[:-1]))
+    os.utime(database_file, ns=(modification_time_ns + 1_000_000_000, modification_time_ns + 1_000_000_000))
+    changed_catalog = _load_catalog(capacitor_series_name, film_capacitor_series_path, cache_directory)
+    assert len(changed_catalog[0]) == len(catalog[0]) - 1
+    _assert_catalog_equal(changed_catalog, _parse_dc_film_capacitors(capacitor_series_name, film_capacitor_series_path))
@@ -0,0 +1,97 @@
+"""Unit tests for the result sinks."""
+
+# python libraries
+import pathlib
+
+# 3rd party libraries
+import numpy as np
+import pandas as pd
+import pytest
+
+# own libraries
+import pecst
+
+
+def test_file_result_sink_background(tmp_path: pathlib.Path) -> None:
+    """
+    Background writing of csv files, including a later modification of the handed over data frame.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: pathlib.Path
+    """
+    result_df = pd.DataFrame({"volume_total": [1.0, 2.0], "power_loss_total": [3.0, 4.0]})
+    with pecst.FileResultSink(tmp_path / "results") as sink:
+        sink.write("B3271*P", result_df)
+        result_df.loc[0, "volume_total"] = 10.0
+
+    written_df = pd.read_csv(tmp_path / "results" / "results_B3271*P.csv", index_col=0)
+    assert written_df["volume_total"].tolist() == [1.0, 2.0]
+
+
+def test_memory_and_no_result_sink() -> None:
+    """Memory sink keeps the latest result per name, no sink discards it."""
+    memory_sink = pecst.MemoryResultSink()
+    memory_sink.write("batch", pd.DataFrame({"a": [1]}))
+    memory_sink.write("batch", pd.DataFrame({"a": [2]}))
+    assert memory_sink.results["batch"]["a"].tolist() == [2]
+
+    pecst.NoResultSink().write("batch", pd.DataFrame({"a": [1]}))
+
+
+def test_file_result_sink_unknown_format() -> None:
+    """Unknown file formats are rejected."""
+    with pytest.raises(ValueError):
+        pecst.FileResultSink(file_format="xlsx")
+
+
+def test_incomplete_result_sink() -> None:
+    """Result sinks without write() can not be created."""
+    class IncompleteResultSink(pecst.ResultSink):
+        """Result sink without write()."""
+
+    with pytest.raises(TypeError):
+        IncompleteResultSink()  # type: ignore[abstract]
+
+
+def test_selection_writes_files_opt_in(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    The selection writes result files only to a given file result sink.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: pathlib.Path
+    :param monkeypatch: pytest monkeypatch fixture
+    :type monkeypatch: pytest.MonkeyPatch
+    """
+    monkeypatch.chdir(tmp_path)
+    c_requirements = pecst.CapacitorRequirements(
+        maximum_peak_to_peak_voltage_ripple=1, current_waveform_for_op_max_current=np.array([[0, 2.5e-6, 5e-6], [10, -10, 10]]),
+        v_dc_for_op_max_voltage=700, temperature_ambient=80, voltage_safety_margin_percentage=10,
+        capacitor_type_list=[pecst.CapacitorType.FilmCapacitor], maximum_number_series_capacitors=2,
+        capacitor_tolerance_percent=pecst.CapacitanceTolerance.TenPercent, lifetime_h=30_000, results_directory="")
+
+    pecst.select_capacitors(c_requirements)
+    assert not list(tmp_path.iterdir())
+
+    with pecst.FileResultSink(tmp_path / "results") as sink:
+        series_name_list, _ = pecst.select_capacitors(c_requirements, result_sink=sink)
+    assert sorted(path.name for path in (tmp_path / "results").iterdir()) == sorted(f"results_{name}.csv" for name in series_name_list)
+
+
+@pytest.mark.parametrize("background", [True, False])
+def test_file_result_sink_keep_all(tmp_path: pathlib.Path, background: bool) -> None:
+    """
+    A shared file sink overwrites repeated names by default and numbers them with keep_all.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: pathlib.Path
+    :param background: write the files by a background thread
+    :type background: bool
+    """
+    for keep_all, expected_file_dict in [(False, {"results_B3271*P.csv": [2]}),
+                                         (True, {"results_B3271*P.csv": [0], "results_B3271*P_1.csv": [1], "results_B3271*P_2.csv": [2]})]:
+        directory = tmp_path / f"results_{keep_all}"
+        with pecst.FileResultSink(directory, background=background, keep_all=keep_all) as sink:
+            for count in range(3):
+                sink.write("B3271*P", pd.DataFrame({"a": [count]}))
+
+        assert {path.name: pd.read_csv(path, index_col=0)["a"].tolist() for path in directory.iterdir()} == expected_file_dict
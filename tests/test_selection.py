@@ -0,0 +1,450 @@
+"""Unit tests for the capacitor selection."""
+
+# python libraries
+import os
+import pathlib
+import shutil
+
+# 3rd party libraries
+import numpy as np
+import pandas as pd
+import pytest
+
+# own libraries
+import pecst
+import pecst.constants as const
+import pecst.esr_store
+from pecst.selection import get_equivalent_heat_coefficient_vectorized, _interpolate_rows, integrate, _get_memoized, _SeriesCache
+from pecst.catalog import _load_capacitor_series_data, _load_series_values
+
+
+def _c_requirements(**parameter_values: object) -> pecst.CapacitorRequirements:
+    """
+    Get capacitor requirements for the selection tests.
+
+    :param parameter_values: changed requirement values
+    :type parameter_values: object
+    :return: capacitor requirements
+    :rtype: pecst.CapacitorRequirements
+    """
+    c_requirements = pecst.CapacitorRequirements(
+        maximum_peak_to_peak_voltage_ripple=1, current_waveform_for_op_max_current=np.array([[0, 2.5e-6, 5e-6], [10, -10, 10]]),
+        v_dc_for_op_max_voltage=700, temperature_ambient=80, voltage_safety_margin_percentage=10,
+        capacitor_type_list=[pecst.CapacitorType.FilmCapacitor], maximum_number_series_capacitors=3,
+        capacitor_tolerance_percent=pecst.CapacitanceTolerance.TenPercent, lifetime_h=30_000, results_directory="")
+    return pecst.requirements_grid(c_requirements, **{name: [value] for name, value in parameter_values.items()})[0]
+
+
+@pytest.mark.parametrize("capacitor_series_name", const.FOIL_CAPACITOR_SERIES_NAME_LIST)
+def test_vectorized_stages_equal_row_by_row(capacitor_series_name: str) -> None:
+    """
+    Vectorized selection stages must give identical results compared to the row-by-row functions.
+
+    :param capacitor_series_name: capacitor series name
+    :type capacitor_series_name: str
+    """
+    c_db, c_thermal, _, dvdt_df, lt_dto_list = pecst.load_dc_film_capacitors(capacitor_series_name)
+
+    # operating voltage interpolation over temperature
+    for temperature in [80.0, 85.0, 97.3, 105.0, 118.2, 130.0]:
+        voltage_vec = _interpolate_rows(np.array([temperature]), [const.TEMPERATURE_85, const.TEMPERATURE_105, const.TEMPERATURE_125],
+                                        c_db[["V_R_85degree", "V_op_105degree", "V_op_125degree"]].to_numpy(dtype=float))[0]
+        voltage_row = c_db.apply(lambda x, t=temperature: np.interp(t, [const.TEMPERATURE_85, const.TEMPERATURE_105, const.TEMPERATURE_125],
+                                                                    [x["V_R_85degree"], x["V_op_105degree"], x["V_op_125degree"]]), axis=1)
+        np.testing.assert_array_equal(voltage_vec, voltage_row.to_numpy())
+
+    # lifetime derating
+    voltage_lifetime_vec = pecst.voltage_rating_due_to_lifetime_vectorized(30_000, 101.3, c_db["V_R_85degree"].to_numpy(), lt_dto_list)
+    voltage_lifetime_row = [pecst.voltage_rating_due_to_lifetime(30_000, 101.3, voltage_rating, lt_dto_list) for voltage_rating in c_db["V_R_85degree"]]
+    np.testing.assert_array_equal(voltage_lifetime_vec, voltage_lifetime_row)
+
+    # dv/dt
+    calculated_boundaries = pecst.CalculatedRequirementsValues(requirement_c_min=1e-6, i_rms=10, i_max=25)
+    dvdt_vec = pecst.calc_parallel_capacitors_dvdt_vectorized(c_db["capacitance"].to_numpy(), c_db["V_R_85degree"].to_numpy(), 25,
+                                                              dvdt_df, c_db["ordering code"].to_numpy())
+    dvdt_row = c_db.apply(lambda x: pecst.calc_parallel_capacitors_dvdt(x["capacitance"], x["V_R_85degree"], 25, dvdt_df, x["ordering code"],
+                                                                        calculated_boundaries), axis=1)
+    np.testing.assert_array_equal(dvdt_vec, dvdt_row.to_numpy())
+
+    # power loss, also compared to the sum over the harmonics
+    frequency_list = np.array([0, 20e3, 40e3, 60e3])
+    current_amplitude_list = np.array([1.0, 30.0, 5.0, 2.0])
+    esr_matrix, _ = pecst.read_capacitor_frequency_dependent_limits_at_frequencies(list(c_db["ordering code"]), frequency_list)
+    loss_vec = pecst.power_loss_film_capacitor_vectorized(esr_matrix, current_amplitude_list, np.full(len(c_db), 3))
+    loss_row = [pecst.power_loss_film_capacitor(order_number, frequency_list, current_amplitude_list, 3) for order_number in c_db["ordering code"]]
+    np.testing.assert_allclose(loss_vec, loss_row, rtol=1e-14)
+    np.testing.assert_allclose(loss_vec, np.sum(esr_matrix * 0.5 * (current_amplitude_list / 3) ** 2, axis=1), rtol=1e-14)
+
+    # thermal coefficient
+    g_vec = get_equivalent_heat_coefficient_vectorized(c_thermal, c_db["width_in_m"], c_db["length_in_m"], c_db["height_in_m"])
+    g_row = c_db.apply(lambda x: pecst.get_equivalent_heat_coefficient(c_thermal, x["width_in_m"], x["length_in_m"], x["height_in_m"]), axis=1)
+    np.testing.assert_array_equal(g_vec, g_row.to_numpy())
+
+
+@pytest.mark.parametrize("v_dc, temperature_ambient, maximum_number_series_capacitors", [(400, 60, 1), (700, 80, 2), (1100, 95, 3)])
+def test_engines_equal(v_dc: float, temperature_ambient: float, maximum_number_series_capacitors: int) -> None:
+    """
+    Both engines select the same designs, the losses and the self-heating differ by rounding only.
+
+    :param v_dc: DC voltage in V
+    :type v_dc: float
+    :param temperature_ambient: ambient temperature in degree Celsius
+    :type temperature_ambient: float
+    :param maximum_number_series_capacitors: maximum number of series capacitors
+    :type maximum_number_series_capacitors: int
+    """
+    c_requirements = pecst.CapacitorRequirements(
+        maximum_peak_to_peak_voltage_ripple=1, current_waveform_for_op_max_current=np.array([[0, 2.5e-6, 5e-6], [10, -10, 10]]),
+        v_dc_for_op_max_voltage=v_dc, temperature_ambient=temperature_ambient, voltage_safety_margin_percentage=10,
+        capacitor_type_list=[pecst.CapacitorType.FilmCapacitor], maximum_number_series_capacitors=maximum_number_series_capacitors,
+        capacitor_tolerance_percent=pecst.CapacitanceTolerance.TenPercent, lifetime_h=30_000, results_directory="")
+
+    apply_name_list, apply_df_list = pecst.select_capacitors(c_requirements, engine="apply", result_sink=pecst.NoResultSink())
+    vectorized_name_list, vectorized_df_list = pecst.select_capacitors(c_requirements, result_sink=pecst.NoResultSink())
+
+    assert apply_name_list == vectorized_name_list
+    assert sum(len(apply_df) for apply_df in apply_df_list) > 0
+    for apply_df, vectorized_df in zip(apply_df_list, vectorized_df_list, strict=True):
+        # the vectorized engine sums up the losses of the harmonics in a matrix-vector product, in a different order
+        pd.testing.assert_frame_equal(apply_df, vectorized_df, check_exact=False, rtol=1e-12, atol=0)
+
+def test_requirements_grid() -> None:
+    """Full-factorial grid of requirements."""
+    c_requirements = pecst.CapacitorRequirements(
+        maximum_peak_to_peak_voltage_ripple=1, current_waveform_for_op_max_current=np.array([[0, 2.5e-6, 5e-6], [10, -10, 10]]),
+        v_dc_for_op_max_voltage=700, temperature_ambient=90, voltage_safety_margin_percentage=10,
+        capacitor_type_list=[pecst.CapacitorType.FilmCapacitor], maximum_number_series_capacitors=2,
+        capacitor_tolerance_percent=pecst.CapacitanceTolerance.TenPercent, lifetime_h=30_000, results_directory="")
+
+    c_requirements_list = pecst.requirements_grid(c_requirements, v_dc_for_op_max_voltage=[600, 700, 800], temperature_ambient=[70, 90])
+
+    assert len(c_requirements_list) == 6
+    assert [(c.v_dc_for_op_max_voltage, c.temperature_ambient) for c in c_requirements_list] == \
+        [(600, 70), (600, 90), (700, 70), (700, 90), (800, 70), (800, 90)]
+    assert all(c.lifetime_h == 30_000 for c in c_requirements_list)
+
+
+def test_get_memoized() -> None:
+    """Memoized values are calculated once, the least recently used value is dropped first."""
+    memory: dict = {}
+    calculated_keys: list[int] = []
+
+    def calculate(key: int) -> int:
+        calculated_keys.append(key)
+        return key * 2
+
+    def get(key: int) -> int:
+        return int(_get_memoized(memory, (key,), lambda: calculate(key), maximum_size=2))
+
+    assert [get(1), get(2), get(1), get(3), get(1), get(2)] == [2, 4, 2, 6, 2, 4]
+    assert calculated_keys == [1, 2, 3, 2]
+    assert list(memory.keys()) == [(1,), (2,)]
+
+
+def test_series_cache_memoizes_stages() -> None:
+    """Series cache stage results are memoized by their requirement values and equal to the direct calculation."""
+    capacitor_series_name = const.FOIL_CAPACITOR_SERIES_NAME_LIST[0]
+    series_cache = _SeriesCache(_load_capacitor_series_data(capacitor_series_name, _load_series_values()))
+    c_db = series_cache.series_data.c_db
+
+    voltage_lifetime = series_cache.voltage_lifetime(30_000, 101.3)
+    assert series_cache.voltage_lifetime(30_000, 101.3) is voltage_lifetime
+    assert series_cache.voltage_lifetime(20_000, 101.3) is not voltage_lifetime
+    np.testing.assert_array_equal(voltage_lifetime, pecst.voltage_rating_due_to_lifetime_vectorized(
+        30_000, 101.3, c_db["V_R_85degree"].to_numpy(), series_cache.series_data.lt_dto_list))
+
+    np.testing.assert_array_equal(series_cache.parallel_capacitors_dvdt(25), pecst.calc_parallel_capacitors_dvdt_vectorized(
+        c_db["capacitance"].to_numpy(), c_db["V_R_85degree"].to_numpy(), 25, series_cache.series_data.dvdt_df, c_db["ordering code"].to_numpy()))
+
+    assert series_cache.derating_factor(70) == pecst.get_temperature_current_derating_factor(70, series_cache.series_data.c_derating)
+
+
+def test_integrate() -> None:
+    """Cumulative trapezoidal integration with non-uniform time steps and several time series at once."""
+    time = np.array([0.0, 1.0, 3.0, 3.5])
+    data = np.array([[1.0, 1.0, 1.0, 1.0], [0.0, 2.0, np.nan, 4.0]])
+
+    np.testing.assert_allclose(integrate(time, data), [[0.0, 1.0, 3.0, 3.5], [0.0, 1.0, 3.0, 4.0]])
+    np.testing.assert_allclose(integrate(time, data[0]), [0.0, 1.0, 3.0, 3.5])
+    np.testing.assert_allclose(integrate(np.array([time, 2 * time]), data), [[0.0, 1.0, 3.0, 3.5], [0.0, 2.0, 6.0, 8.0]])
+
+
+def test_calculate_from_requirements_c_min() -> None:
+    """Minimum capacitance of a triangular current: ripple = peak-to-peak charge / capacitance."""
+    c_requirements = pecst.CapacitorRequirements(
+        maximum_peak_to_peak_voltage_ripple=2, current_waveform_for_op_max_current=np.array([[0, 5e-6, 10e-6], [-10, 10, -10]]),
+        v_dc_for_op_max_voltage=700, temperature_ambient=90, voltage_safety_margin_percentage=10,
+        capacitor_type_list=[pecst.CapacitorType.FilmCapacitor], maximum_number_series_capacitors=2,
+        capacitor_tolerance_percent=pecst.CapacitanceTolerance.TenPercent, lifetime_h=30_000, results_directory="")
+
+    calculated_requirements = pecst.calculate_from_requirements(c_requirements)
+
+    # charge from the zero crossing at 2.5 us to 7.5 us: 0.5 * 2.5 us * 10 A * 2
+    assert calculated_requirements.requirement_c_min == pytest.approx(25e-6 / 2, rel=1e-6)
+    assert calculated_requirements.i_max == 10
+
+
+def test_coupled_self_heating() -> None:
+    """Coupled designs are evaluated at least at their own capacitor temperature and never need more capacitors than the worst case designs."""
+    c_requirements = pecst.CapacitorRequirements(
+        maximum_peak_to_peak_voltage_ripple=1, current_waveform_for_op_max_current=np.array([[0, 2.5e-6, 5e-6], [10, -10, 10]]),
+        v_dc_for_op_max_voltage=700, temperature_ambient=80, voltage_safety_margin_percentage=10,
+        capacitor_type_list=[pecst.CapacitorType.FilmCapacitor], maximum_number_series_capacitors=2,
+        capacitor_tolerance_percent=pecst.CapacitanceTolerance.TenPercent, lifetime_h=30_000, results_directory="")
+
+    _, worst_case_df_list = pecst.select_capacitors(c_requirements, result_sink=pecst.NoResultSink())
+    _, coupled_df_list = pecst.select_capacitors(c_requirements, result_sink=pecst.NoResultSink(), self_heating="coupled")
+
+    for worst_case_df, coupled_df in zip(worst_case_df_list, coupled_df_list, strict=True):
+        assert set(worst_case_df.index) <= set(coupled_df.index)
+        assert np.all(coupled_df["delta_temperature"] <= coupled_df["capacitor_temperature"] - c_requirements.temperature_ambient + 1e-9)
+        assert np.all(coupled_df.loc[worst_case_df.index, "in_series_needed"] <= worst_case_df["in_series_needed"])
+        assert np.all(coupled_df.loc[worst_case_df.index, "volume_total"] <= worst_case_df["volume_total"])
+
+
+@pytest.mark.parametrize("self_heating", ["worst_case", "coupled"])
+def test_achievable_lifetime_filter(self_heating: str) -> None:
+    """
+    Filtering by the achievable lifetime gives the designs of a selection with a longer lifetime and the same series capacitors.
+
+    :param self_heating: self-heating model
+    :type self_heating: str
+    """
+    c_requirements = pecst.CapacitorRequirements(
+        maximum_peak_to_peak_voltage_ripple=1, current_waveform_for_op_max_current=np.array([[0, 2.5e-6, 5e-6], [10, -10, 10]]),
+        v_dc_for_op_max_voltage=700, temperature_ambient=80, voltage_safety_margin_percentage=10,
+        capacitor_type_list=[pecst.CapacitorType.FilmCapacitor], maximum_number_series_capacitors=2,
+        capacitor_tolerance_percent=pecst.CapacitanceTolerance.TenPercent, lifetime_h=5_000, results_directory="")
+    c_requirements_list = pecst.requirements_grid(c_requirements, lifetime_h=[5_000, 100_000, 200_000])
+
+    result_df = pecst.select_capacitors_batch(c_requirements_list, self_heating=self_heating, achievable_lifetime=True)
+    pd.testing.assert_frame_equal(result_df.drop(columns="lifetime_achievable"), pecst.select_capacitors_batch(c_requirements_list, self_heating=self_heating))
+
+    shortest_df = result_df.loc[0].set_index(["series", "ordering code"])
+    assert np.all(shortest_df["lifetime_achievable"] >= 5_000)
+    for requirement_id in [1, 2]:
+        longer_df = result_df.loc[requirement_id].set_index(["series", "ordering code"])
+        is_same_series = longer_df["in_series_needed"] == shortest_df["in_series_needed"].reindex(longer_df.index)
+        filtered_df = shortest_df[shortest_df["lifetime_achievable"] >= c_requirements_list[requirement_id].lifetime_h]
+        assert set(filtered_df.index) == set(longer_df.index[is_same_series])
+
+
+def test_batch_spectra_equal_single_selection() -> None:
+    """The batch selection takes the spectra of all current waveforms from one harmonic table, the designs equal select_capacitors()."""
+    c_requirements = pecst.CapacitorRequirements(
+        maximum_peak_to_peak_voltage_ripple=1, current_waveform_for_op_max_current=np.array([[0, 2.5e-6, 5e-6], [10, -10, 10]]),
+        v_dc_for_op_max_voltage=700, temperature_ambient=80, voltage_safety_margin_percentage=10,
+        capacitor_type_list=[pecst.CapacitorType.FilmCapacitor], maximum_number_series_capacitors=2,
+        capacitor_tolerance_percent=pecst.CapacitanceTolerance.TenPercent, lifetime_h=30_000, results_directory="")
+    current_waveform_list = [np.array([[0, 2.5e-6, 5e-6], [10, -10, 10]]), np.array([[0, 1e-6, 20e-6], [-15, 15, -15]]),
+                             np.array([[0, 3e-6, 10e-6], [5, -25, 5]])]
+    c_requirements_list = pecst.requirements_grid(c_requirements, current_waveform_for_op_max_current=current_waveform_list,
+                                                  v_dc_for_op_max_voltage=[400, 700])
+
+    result_df = pecst.select_capacitors_batch(c_requirements_list)
+
+    for requirement_id, single_requirements in enumerate(c_requirements_list):
+        requirement_df = result_df.loc[[requirement_id]]
+        for capacitor_series_name, c_db in zip(*pecst.select_capacitors(single_requirements), strict=True):
+            series_df = requirement_df[requirement_df["series"] == capacitor_series_name].reset_index(drop=True)
+            pd.testing.assert_frame_equal(series_df[c_db.columns], c_db.reset_index(drop=True))
+
+
+def test_keyed_table_lookups() -> None:
+    """dv/dt and thermal coefficient lookups join on series prefix and integer micrometres, keys without a unique entry give NaN."""
+    dvdt_df = pd.DataFrame({"series": ["B32714P", "B32716P", "B32716P", "B3271"], "rated_voltage": [600, 600, 600, 700],
+                            "dv/dt": [40e6, 25e6, 30e6, 60e6]})
+    dvdt_max = pecst.get_dvdt_max_vectorized(np.array([600, 600, 700, 675]), dvdt_df,
+                                             np.array(["B32714P6255K000", "B32716P6255K000", "B32718P7305K000", "B32714P6255K000"]))
+    np.testing.assert_array_equal(dvdt_max, [40e6, np.nan, 60e6, np.nan])
+
+    c_thermal = pd.DataFrame({"width_in_m": [0.011, 0.011, 0.0125, 0.0125], "height_in_m": [0.019, 0.021, 0.0215, 0.0215],
+                              "length_in_m": [0.0315, 0.0315, 0.0315, 0.0315], "g_in_W_degreeCelsius": [0.024, 0.028, 0.030, 0.031]})
+    thermal_coefficient = get_equivalent_heat_coefficient_vectorized(c_thermal, np.array([0.011 + 1e-12, 0.011, 0.0125, 0.011, np.nan]),
+                                                                     np.array([0.0315 - 1e-12, 0.0315, 0.0315, 0.0315, 0.0315]),
+                                                                     np.array([0.019, 0.021, 0.0215, 0.020, 0.019]))
+    np.testing.assert_array_equal(thermal_coefficient, [0.024, 0.028, np.nan, np.nan, np.nan])
+
+
+def test_selection_reads_changed_esr_files(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    ESR files changed between two selection calls are read again by both engines.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: pathlib.Path
+    :param monkeypatch: pytest monkeypatch fixture
+    :type monkeypatch: pytest.MonkeyPatch
+    """
+    esr_directory = tmp_path / "esr_downloads"
+    shutil.copytree(pathlib.Path(pecst.__file__).parent / const.ESR_OVER_FREQUENCY_DIRECTORY, esr_directory,
+                    ignore=shutil.ignore_patterns(const.ESR_DATABASE_FILE))
+    monkeypatch.setattr(pecst.esr_store, "_esr_store", pecst.EsrStore(esr_directory))
+    c_requirements = pecst.CapacitorRequirements(
+        maximum_peak_to_peak_voltage_ripple=1, current_waveform_for_op_max_current=np.array([[0, 2.5e-6, 5e-6], [10, -10, 10]]),
+        v_dc_for_op_max_voltage=700, temperature_ambient=80, voltage_safety_margin_percentage=10,
+        capacitor_type_list=[pecst.CapacitorType.FilmCapacitor], maximum_number_series_capacitors=2,
+        capacitor_tolerance_percent=pecst.CapacitanceTolerance.TenPercent, lifetime_h=30_000, results_directory="")
+    _, c_db_list = pecst.select_capacitors(c_requirements)
+
+    # halve the ESR of the first selected capacitor
+    esr_file = esr_directory / f"{pecst.normalize_order_number(c_db_list[0]['ordering code'].iloc[0])}.csv"
+    esr_df = pd.read_csv(esr_file)
+    esr_df["ESR_FINAL"] /= 2
+    modification_time = esr_file.stat().st_mtime_ns + 1_000_000_000
+    esr_df.to_csv(esr_file, index=False)
+    os.utime(esr_file, ns=(modification_time, modification_time))
+
+    _, changed_c_db_list = pecst.select_capacitors(c_requirements)
+    assert changed_c_db_list[0]["power_loss_per_capacitor"].iloc[0] == pytest.approx(c_db_list[0]["power_loss_per_capacitor"].iloc[0] / 2, rel=1e-12)
+    _, apply_c_db_list = pecst.select_capacitors(c_requirements, engine="apply")
+    for changed_c_db, apply_c_db in zip(changed_c_db_list, apply_c_db_list, strict=True):
+        pd.testing.assert_frame_equal(changed_c_db, apply_c_db, check_exact=False, rtol=1e-12, atol=0)
+
+
+@pytest.mark.parametrize("v_dc, temperature_ambient, lifetime_h", [(400, 60, 10_000), (700, 80, 30_000), (1100, 95, 30_000)])
+def test_worst_case_single_operating_point(v_dc: float, temperature_ambient: float, lifetime_h: float) -> None:
+    """
+    The worst case of a single operating point equals select_capacitors(), also through a session.
+
+    :param v_dc: DC voltage in V
+    :type v_dc: float
+    :param temperature_ambient: ambient temperature in degree Celsius
+    :type temperature_ambient: float
+    :param lifetime_h: lifetime in hours
+    :type lifetime_h: float
+    """
+    c_requirements = _c_requirements(v_dc_for_op_max_voltage=v_dc, temperature_ambient=temperature_ambient, lifetime_h=lifetime_h)
+
+    series_name_list, c_db_list = pecst.select_capacitors(c_requirements)
+    for worst_case_series_name_list, worst_case_c_db_list in [pecst.select_capacitors_worst_case([c_requirements]),
+                                                              pecst.SelectionSession().select_capacitors_worst_case([c_requirements])]:
+        assert worst_case_series_name_list == series_name_list
+        for worst_case_c_db, c_db in zip(worst_case_c_db_list, c_db_list, strict=True):
+            pd.testing.assert_frame_equal(worst_case_c_db, c_db)
+
+
+def test_worst_case_dominated_operating_point() -> None:
+    """An operating point with lower voltage, temperature and lifetime than another one does not change the worst case."""
+    dominated_requirements = _c_requirements(v_dc_for_op_max_voltage=500, temperature_ambient=70, lifetime_h=10_000)
+    dominating_requirements = _c_requirements(v_dc_for_op_max_voltage=900, temperature_ambient=85, lifetime_h=50_000)
+
+    _, worst_case_c_db_list = pecst.select_capacitors_worst_case([dominated_requirements, dominating_requirements])
+
+    _, dominated_c_db_list = pecst.select_capacitors(dominated_requirements)
+    _, dominating_c_db_list = pecst.select_capacitors(dominating_requirements)
+    for worst_case_c_db, dominated_c_db, dominating_c_db in zip(worst_case_c_db_list, dominated_c_db_list, dominating_c_db_list, strict=True):
+        pd.testing.assert_frame_equal(worst_case_c_db, dominating_c_db)
+        # the maximum number of series capacitors is used
+        assert np.all(dominated_c_db["in_series_needed"].reindex(worst_case_c_db.index) <= worst_case_c_db["in_series_needed"])
+    assert any(np.any(dominated_c_db["in_series_needed"].reindex(worst_case_c_db.index) < worst_case_c_db["in_series_needed"])
+               for worst_case_c_db, dominated_c_db in zip(worst_case_c_db_list, dominated_c_db_list, strict=True))
+
+
+def test_worst_case_current_waveforms() -> None:
+    """With several current waveforms, each design uses the maximum number of parallel capacitors and passes the checks of all waveforms."""
+    c_requirements_list = [_c_requirements(current_waveform_for_op_max_current=np.array([[0, 2.5e-6, 5e-6], [10, -10, 10]])),
+                           _c_requirements(current_waveform_for_op_max_current=np.array([[0, 1e-6, 20e-6], [-25, 25, -25]]))]
+
+    _, worst_case_c_db_list = pecst.select_capacitors_worst_case(c_requirements_list)
+
+    point_c_db_list_list = [pecst.select_capacitors(c_requirements)[1] for c_requirements in c_requirements_list]
+    for count_series, worst_case_c_db in enumerate(worst_case_c_db_list):
+        point_c_db_list = [point_c_db_list[count_series] for point_c_db_list in point_c_db_list_list]
+        # designs of all single operating points, with the same series connection due to the same voltage
+        index = point_c_db_list[0].index.intersection(point_c_db_list[1].index)
+        assert set(index) <= set(worst_case_c_db.index)
+        worst_case_c_db = worst_case_c_db.loc[index]
+        for point_c_db in point_c_db_list:
+            np.testing.assert_array_equal(worst_case_c_db["in_series_needed"], point_c_db.loc[index, "in_series_needed"])
+        in_parallel_needed = np.maximum(*[point_c_db.loc[index, "in_parallel_needed"] for point_c_db in point_c_db_list])
+        np.testing.assert_array_equal(worst_case_c_db["in_parallel_needed"], in_parallel_needed)
+
+        # the current is shared by more parallel capacitors: the loss per capacitor scales with 1 / n², the total loss and self-heating with 1 / n
+        parallel_ratio_list = [point_c_db.loc[index, "in_parallel_needed"] / in_parallel_needed for point_c_db in point_c_db_list]
+        for column, exponent in [("power_loss_per_capacitor", 2), ("power_loss_total", 1), ("delta_temperature", 1)]:
+            point_value_list = [point_c_db.loc[index, column] * parallel_ratio ** exponent
+                                for point_c_db, parallel_ratio in zip(point_c_db_list, parallel_ratio_list, strict=True)]
+            np.testing.assert_allclose(worst_case_c_db[column], np.maximum(*point_value_list), rtol=1e-12)
+    assert sum(len(worst_case_c_db) for worst_case_c_db in worst_case_c_db_list) > 0
+
+
+def test_worst_case_without_operating_points() -> None:
+    """At least one operating point is needed."""
+    with pytest.raises(ValueError):
+        pecst.select_capacitors_worst_case([])
+    with pytest.raises(ValueError):
+        pecst.SelectionSession().select_capacitors_worst_case([])
+
+
+def test_parallel_selection_equals_serial() -> None:
+    """Process pool and chunks give the same results in the same order as the serial selection."""
+    c_requirements = _c_requirements()
+    series_name_list, c_db_list = pecst.select_capacitors(c_requirements)
+    parallel_series_name_list, parallel_c_db_list = pecst.select_capacitors(c_requirements, number_of_workers=2)
+    assert parallel_series_name_list == series_name_list
+    for parallel_c_db, c_db in zip(parallel_c_db_list, c_db_list, strict=True):
+        pd.testing.assert_frame_equal(parallel_c_db, c_db)
+
+    c_requirements_list = pecst.requirements_grid(c_requirements, temperature_ambient=[70, 80, 90], lifetime_h=[10_000, 30_000],
+                                                  current_waveform_for_op_max_current=[np.array([[0, 2.5e-6, 5e-6], [10, -10, 10]]),
+                                                                                       np.array([[0, 1e-6, 20e-6], [-15, 15, -15]])])
+    result_df = pecst.select_capacitors_batch(c_requirements_list)
+    pd.testing.assert_frame_equal(pecst.select_capacitors_batch(c_requirements_list, number_of_workers=2, chunk_size=2), result_df)
+    pd.testing.assert_frame_equal(pecst.select_capacitors_batch(c_requirements_list, chunk_size=1), result_df)
+
+    with pytest.raises(ValueError):
+        pecst.select_capacitors(c_requirements, number_of_workers=0)
+    with pytest.raises(ValueError):
+        pecst.select_capacitors_batch(c_requirements_list, number_of_workers=0)
+    with pytest.raises(ValueError):
+        pecst.select_capacitors_batch(c_requirements_list, chunk_size=0)
+
+
+def _is_within_limits(result_df: pd.DataFrame, constraints: pecst.SelectionConstraints) -> pd.Series:
+    """
+    Check the selected designs against the constraints, independent of the selection.
+
+    :param result_df: selected designs
+    :type result_df: pd.DataFrame
+    :param constraints: user constraints
+    :type constraints: pecst.SelectionConstraints
+    :return: True for each design within all limits
+    :rtype: pd.Series
+    """
+    is_within = pd.Series(True, index=result_df.index)
+    for column_values, maximum_value in [(result_df["volume_total"], constraints.maximum_volume), (result_df["cost"], constraints.maximum_cost),
+                                         (result_df["area_total"], constraints.maximum_area),
+                                         (result_df["in_parallel_needed"] * result_df["in_series_needed"], constraints.maximum_number_capacitors)]:
+        if maximum_value is not None:
+            is_within &= ~(column_values > maximum_value)
+    return is_within
+
+
+@pytest.mark.parametrize("constraint_name_list", [["maximum_volume"], ["maximum_cost"], ["maximum_area"], ["maximum_number_capacitors"],
+                                                  ["maximum_volume", "maximum_cost", "maximum_area", "maximum_number_capacitors"]])
+def test_constraints_equal_post_filter(constraint_name_list: list[str]) -> None:
+    """
+    The early pruning by the constraints gives the unconstrained designs filtered by all limits.
+
+    :param constraint_name_list: names of the constraints to set
+    :type constraint_name_list: list[str]
+    """
+    c_requirements_list = pecst.requirements_grid(_c_requirements(), v_dc_for_op_max_voltage=[400, 1100], temperature_ambient=[60, 90])
+    result_df = pecst.select_capacitors_batch(c_requirements_list)
+    # limits within the range of the designs, so each limit sorts out designs
+    column_dict = {"maximum_volume": result_df["volume_total"], "maximum_cost": result_df["cost"], "maximum_area": result_df["area_total"],
+                   "maximum_number_capacitors": result_df["in_parallel_needed"] * result_df["in_series_needed"]}
+    limit_dict = {name: float(column_dict[name].quantile(0.3)) for name in constraint_name_list}
+    maximum_number_capacitors = int(limit_dict["maximum_number_capacitors"]) if "maximum_number_capacitors" in limit_dict else None
+    constraints = pecst.SelectionConstraints(maximum_volume=limit_dict.get("maximum_volume"), maximum_cost=limit_dict.get("maximum_cost"),
+                                             maximum_area=limit_dict.get("maximum_area"), maximum_number_capacitors=maximum_number_capacitors)
+    assert 0 < np.count_nonzero(_is_within_limits(result_df, constraints)) < len(result_df)
+
+    pd.testing.assert_frame_equal(pecst.select_capacitors_batch(c_requirements_list, constraints=constraints),
+                                  result_df[_is_within_limits(result_df, constraints)])
+    for selection_function in [lambda constraints: pecst.select_capacitors(c_requirements_list[0], constraints=constraints),
+                               lambda constraints: pecst.select_capacitors_worst_case(c_requirements_list, constraints=constraints)]:
+        for constrained_c_db, c_db in zip(selection_function(constraints)[1], selection_function(None)[1], strict=True):
+            if len(c_db) > 0:
+                c_db = c_db[_is_within_limits(c_db, constraints)]
+            pd.testing.assert_frame_equal(constrained_c_db, c_db)
@@ -0,0 +1,140 @@
+"""Unit tests for the selection session."""
+
+# python libraries
+import collections
+import os
+import pathlib
+import shutil
+from collections.abc import Callable
+
+# 3rd party libraries
+import numpy as np
+import pandas as pd
+import pytest
+
+# own libraries
+import pecst
+import pecst.constants as const
+import pecst.esr_store
+import pecst.selection
+
+
+def _c_requirements(**parameter_values: object) -> pecst.CapacitorRequirements:
+    """
+    Get capacitor requirements for the session tests.
+
+    :param parameter_values: changed requirement values
+    :type parameter_values: object
+    :return: capacitor requirements
+    :rtype: pecst.CapacitorRequirements
+    """
+    c_requirements = pecst.CapacitorRequirements(
+        maximum_peak_to_peak_voltage_ripple=1, current_waveform_for_op_max_current=np.array([[0, 2.5e-6, 5e-6], [10, -10, 10]]),
+        v_dc_for_op_max_voltage=700, temperature_ambient=80, voltage_safety_margin_percentage=10,
+        capacitor_type_list=[pecst.CapacitorType.FilmCapacitor], maximum_number_series_capacitors=2,
+        capacitor_tolerance_percent=pecst.CapacitanceTolerance.TenPercent, lifetime_h=30_000, results_directory="")
+    return pecst.requirements_grid(c_requirements, **{name: [value] for name, value in parameter_values.items()})[0]
+
+
+def _count_calls(monkeypatch: pytest.MonkeyPatch, call_counter: collections.Counter, function_name_list: list[str]) -> None:
+    """
+    Count the calls of functions of the selection module.
+
+    :param monkeypatch: pytest monkeypatch fixture
+    :type monkeypatch: pytest.MonkeyPatch
+    :param call_counter: number of calls by function name
+    :type call_counter: collections.Counter
+    :param function_name_list: names of the functions to count
+    :type function_name_list: list[str]
+    """
+    for function_name in function_name_list:
+        function: Callable[..., object] = getattr(pecst.selection, function_name)
+
+        def counted_function(*arguments: object, function_name: str = function_name, function: Callable[..., object] = function,
+                             **keyword_arguments: object) -> object:
+            call_counter[function_name] += 1
+            return function(*arguments, **keyword_arguments)
+
+        monkeypatch.setattr(pecst.selection, function_name, counted_function)
+
+
+def test_session_equals_select_capacitors(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    A session gives the results of select_capacitors() for changed requirements and only recalculates the affected stages.
+
+    :param monkeypatch: pytest monkeypatch fixture
+    :type monkeypatch: pytest.MonkeyPatch
+    """
+    session = pecst.SelectionSession()
+    call_counter: collections.Counter = collections.Counter()
+    _count_calls(monkeypatch, call_counter, ["_calculate_spectra", "calculate_from_requirements", "get_temperature_current_derating_factor",
+                                             "read_capacitor_frequency_dependent_limits_at_frequencies", "current_capability_film_capacitor_vectorized"])
+
+    # requirement values changed between the calls, the function names are the recalculated stages
+    for parameter_values, recalculated_set in [
+            ({}, {"_calculate_spectra", "calculate_from_requirements", "get_temperature_current_derating_factor",
+                  "read_capacitor_frequency_dependent_limits_at_frequencies", "current_capability_film_capacitor_vectorized"}),
+            ({}, set()),
+            ({"lifetime_h": 20_000}, set()),
+            ({"lifetime_h": 20_000, "temperature_ambient": 70}, {"get_temperature_current_derating_factor", "current_capability_film_capacitor_vectorized"}),
+            ({"temperature_ambient": 70}, set())]:
+        c_requirements = _c_requirements(**parameter_values)
+        call_counter.clear()
+        series_name_list, c_db_list = session.select_capacitors(c_requirements)
+        assert set(call_counter) == recalculated_set
+
+        expected_series_name_list, expected_c_db_list = pecst.select_capacitors(c_requirements)
+        assert series_name_list == expected_series_name_list
+        for c_db, expected_c_db in zip(c_db_list, expected_c_db_list, strict=True):
+            pd.testing.assert_frame_equal(c_db, expected_c_db)
+
+
+def test_session_clear_reads_changed_esr_files(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    The session keeps the ESR values until clear() is called.
+
+    :param tmp_path: temporary directory
+    :type tmp_path: pathlib.Path
+    :param monkeypatch: pytest monkeypatch fixture
+    :type monkeypatch: pytest.MonkeyPatch
+    """
+    esr_directory = tmp_path / "esr_downloads"
+    shutil.copytree(pathlib.Path(pecst.__file__).parent / const.ESR_OVER_FREQUENCY_DIRECTORY, esr_directory,
+                    ignore=shutil.ignore_patterns(const.ESR_DATABASE_FILE))
+    monkeypatch.setattr(pecst.esr_store, "_esr_store", pecst.EsrStore(esr_directory))
+    c_requirements = _c_requirements()
+    session = pecst.SelectionSession()
+    _, c_db_list = session.select_capacitors(c_requirements)
+
+    # halve the ESR of the first selected capacitor
+    esr_file = esr_directory / f"{pecst.normalize_order_number(c_db_list[0]['ordering code'].iloc[0])}.csv"
+    esr_df = pd.read_csv(esr_file)
+    esr_df["ESR_FINAL"] /= 2
+    modification_time = esr_file.stat().st_mtime_ns + 1_000_000_000
+    esr_df.to_csv(esr_file, index=False)
+    os.utime(esr_file, ns=(modification_time, modification_time))
+
+    _, kept_c_db_list = session.select_capacitors(c_requirements)
+    pd.testing.assert_frame_equal(kept_c_db_list[0], c_db_list[0])
+
+    session.clear()
+    _, changed_c_db_list = session.select_capacitors(c_requirements)
+    assert changed_c_db_list[0]["power_loss_per_capacitor"].iloc[0] == pytest.approx(c_db_list[0]["power_loss_per_capacitor"].iloc[0] / 2, rel=1e-12)
+    for changed_c_db, expected_c_db in zip(changed_c_db_list, pecst.select_capacitors(c_requirements)[1], strict=True):
+        pd.testing.assert_frame_equal(changed_c_db, expected_c_db)
+
+
+def test_session_batch_and_banks() -> None:
+    """A session gives the results of select_capacitors_batch() and select_mixed_capacitor_banks()."""
+    session = pecst.SelectionSession()
+
+    c_requirements_list = pecst.requirements_grid(_c_requirements(), temperature_ambient=[70, 80], lifetime_h=[10_000, 30_000],
+                                                  current_waveform_for_op_max_current=[np.array([[0, 2.5e-6, 5e-6], [10, -10, 10]]),
+                                                                                       np.array([[0, 1e-6, 20e-6], [-15, 15, -15]])])
+    pd.testing.assert_frame_equal(session.select_capacitors_batch(c_requirements_list), pecst.select_capacitors_batch(c_requirements_list))
+
+    c_requirements = _c_requirements(current_waveform_for_op_max_current=np.array([[0, 25e-6, 50e-6], [20, -20, 20]]), v_dc_for_op_max_voltage=100,
+                                     maximum_number_series_capacitors=1)
+    bank_df = session.select_mixed_capacitor_banks(c_requirements, number_of_results=3)
+    assert len(bank_df) > 0
+    pd.testing.assert_frame_equal(bank_df, pecst.select_mixed_capacitor_banks(c_requirements, number_of_results=3))